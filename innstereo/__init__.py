@@ -3,10 +3,20 @@
 """
 This module imports the main program.
 
-The __init__ module just imports the main program module (main_ui).
-The main program is then available as a package.
+The __init__ module provides the startup-function of the main program module
+(main_ui). The main program module is only imported when the program is
+started, so the headless renderer (render-module) can be used without Gtk.
 """
 
 import os.path
-from .main_ui import startup
 
+
+def startup(testing=False):
+    """
+    Imports the main program module and starts the program.
+
+    The testing argument is passed on to the startup-function of main_ui.
+    Returns the MainWindow instance in testing mode.
+    """
+    from .main_ui import startup as main_startup
+    return main_startup(testing)
@@ -7,7 +7,8 @@ This module contains classes that control the appearance and behaviour of
 the ListStores that are shown in the lower left side of the GUI. The
 DataTreeView-class inherits from Gtk.TreeView and is a superclass of all other
 classes in this module. The other classes are PlaneDataView, FaultPlaneDataView,
-LineDataView, and SmallCircleDataView.
+LineDataView, and SmallCircleDataView. The DataStore-class is the model of
+these views and keeps the columnar LayerData of each layer in sync.
 Sources:
 on_key_pressed:
 http://stackoverflow.com/questions/15497766/python-pygoobject-treeview-
@@ -15,10 +16,158 @@ confirm-edit-after-move-between-cells-with-tab-key
 """
 
 from gi.repository import Gtk, Gdk, GLib
+import numpy as np
+from .layer_data import LayerData
 from .i18n import i18n
 
 _ = i18n().language().gettext
 
+
+def row_ranges(mask):
+    """
+    Returns the ranges of consecutive rows where a boolean mask is True.
+
+    Returns a list of (first row, last row) tuples.
+    """
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], mask.astype(np.int8),
+                                                   [0]])))
+    return [(int(start), int(end) - 1)
+            for start, end in zip(edges[::2], edges[1::2])]
+
+
+class DataStore(Gtk.ListStore):
+
+    """
+    A ListStore that mirrors its rows into a columnar LayerData-object.
+
+    The LayerData-object is the source of truth for plotting and statistics.
+    The ListStore is the model that is shown in the data-view. All methods
+    that change rows are overridden so both stay in sync. Rows can be edited
+    as before, e.g. store[path][0] = 120.
+    """
+
+    def __init__(self, *column_types):
+        """
+        Initializes the ListStore and the LayerData with the column types.
+
+        Expects the column types in the same way as a Gtk.ListStore (e.g.
+        float, float, str).
+        """
+        Gtk.ListStore.__init__(self, *column_types)
+        self.layer_data = LayerData(*column_types)
+        self.pending_columns = None
+        self.rows_pending = False
+
+    def set_pending_columns(self, columns):
+        """
+        Sets the columns of a layer that is loaded lazily.
+
+        Expects a list with one array per column (e.g. the memory-mapped
+        columns of a project file). The columns are passed to the LayerData
+        the first time the data is requested, and the rows of the ListStore
+        are only added when the store or its view are requested (see
+        load_rows).
+        """
+        self.pending_columns = columns
+
+    def get_data(self):
+        """
+        Returns the LayerData-object that holds the columns of this store.
+
+        Pending columns are moved into the LayerData first.
+        """
+        if self.pending_columns is not None:
+            self.layer_data.set_columns(self.pending_columns)
+            self.pending_columns = None
+            self.rows_pending = True
+        return self.layer_data
+
+    def has_pending_rows(self):
+        """
+        Returns True if rows of lazily loaded columns are not in the ListStore.
+        """
+        return self.pending_columns is not None or self.rows_pending == True
+
+    def load_rows(self):
+        """
+        Adds the rows of lazily loaded columns to the ListStore.
+
+        Called before the store is changed or shown, so the ListStore and the
+        LayerData hold the same rows.
+        """
+        layer_data = self.get_data()
+        if self.rows_pending == False:
+            return
+        self.rows_pending = False
+        columns = [layer_data.get_column(i).tolist()
+                   for i in range(layer_data.get_n_columns())]
+        for row in zip(*columns):
+            Gtk.ListStore.append(self, list(row))
+
+    def get_index(self, treeiter):
+        """
+        Returns the row number of a TreeIter.
+        """
+        return self.get_path(treeiter).get_indices()[0]
+
+    def append(self, row=None):
+        """
+        Appends a row to the LayerData and the ListStore.
+        """
+        self.load_rows()
+        self.layer_data.append(row)
+        return Gtk.ListStore.append(self, row)
+
+    def extend(self, columns):
+        """
+        Appends many rows to the LayerData and the ListStore.
+
+        Expects a list with one array or list per column (see
+        LayerData.extend). The LayerData receives the columns in one bulk
+        insert. The rows of the ListStore are appended afterwards. The view
+        of the store should be detached while this runs.
+        """
+        self.load_rows()
+        start = self.layer_data.extend(columns)
+        new_columns = [self.layer_data.get_column(i)[start:].tolist()
+                       for i in range(self.layer_data.get_n_columns())]
+        for row in zip(*new_columns):
+            Gtk.ListStore.append(self, list(row))
+
+    def insert(self, position, row=None):
+        """
+        Inserts a row at the position into the LayerData and the ListStore.
+        """
+        self.load_rows()
+        self.layer_data.insert(position, row)
+        return Gtk.ListStore.insert(self, position, row)
+
+    def set_value(self, treeiter, column, value):
+        """
+        Sets the value of a cell in the LayerData and the ListStore.
+        """
+        self.load_rows()
+        self.layer_data.set_value(self.get_index(treeiter), column, value)
+        Gtk.ListStore.set_value(self, treeiter, column, value)
+
+    def remove(self, treeiter):
+        """
+        Removes a row from the LayerData and the ListStore.
+        """
+        self.load_rows()
+        self.layer_data.remove(self.get_index(treeiter))
+        return Gtk.ListStore.remove(self, treeiter)
+
+    def clear(self):
+        """
+        Removes all rows from the LayerData and the ListStore.
+        """
+        self.pending_columns = None
+        self.rows_pending = False
+        self.layer_data.clear()
+        Gtk.ListStore.clear(self)
+
+
 class DataTreeView(Gtk.TreeView):
 
     """
@@ -43,7 +192,8 @@ class DataTreeView(Gtk.TreeView):
         self.select = self.get_selection()
         self.select.set_mode(Gtk.SelectionMode.MULTIPLE)
         self.connect("key-press-event", self.on_key_pressed)
-        self.select.connect("changed", self.data_selection_changed)
+        self.select_handler = self.select.connect("changed",
+                                                  self.data_selection_changed)
 
     def truncate(self, number):
         """
@@ -103,15 +253,58 @@ class DataTreeView(Gtk.TreeView):
             elif keyname == "Escape":
                 pass
 
+    def get_selected_mask(self):
+        """
+        Returns a boolean array that is True for the selected rows.
+
+        The mask has one entry per row of the LayerData, so it can be passed
+        to the plotting functions as a subset (see LayerData.get_column).
+        """
+        model, row_list = self.select.get_selected_rows()
+        mask = np.zeros(len(self.store.get_data()), dtype=bool)
+        mask[[row.get_indices()[0] for row in row_list]] = True
+        return mask
+
+    def select_mask(self, mask):
+        """
+        Selects the rows where a boolean mask is True.
+
+        Used by the lasso and box selection of the stereonet. The rows are
+        selected in ranges of consecutive rows. If that needs fewer ranges,
+        all rows are selected and the ranges of unselected rows are
+        unselected. The changed signal is blocked meanwhile, so the plot is
+        only redrawn once.
+        """
+        selected = row_ranges(mask)
+        unselected = row_ranges(~mask)
+
+        self.select.handler_block(self.select_handler)
+        if len(unselected) < len(selected):
+            self.select.select_all()
+            for start, end in unselected:
+                self.select.unselect_range(
+                                Gtk.TreePath.new_from_indices([start]),
+                                Gtk.TreePath.new_from_indices([end]))
+        else:
+            self.select.unselect_all()
+            for start, end in selected:
+                self.select.select_range(
+                                Gtk.TreePath.new_from_indices([start]),
+                                Gtk.TreePath.new_from_indices([end]))
+        self.select.handler_unblock(self.select_handler)
+        self.data_selection_changed(self.select)
+
     def data_selection_changed(self, selection):
         """
-        If the data selection is changed in highlight mode the plot is redrawn.
+        If the data selection is changed in highlight mode the highlighted
+        rows are redrawn.
 
         Checks whether the highlight mode is turned on in the settings. If that
-        is True, each change in selection triggers the plot to be redrawn.
+        is True, each change in selection triggers a redraw of the highlight
+        overlay, without drawing the layers again.
         """
         if self.settings.get_highlight() is True:
-            self.redraw()
+            self.redraw(highlight_only=True)
 
     def validate_numeric_input(self, inp, inp_type):
         """
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+
+"""
+This module contains the DensityCache-class that stores density grids.
+
+Calculating the density grid of a layer is the most expensive part of drawing
+contours. The grids are therefore stored in a cache and reused as long as the
+measurements and the contour settings of the layer do not change. The cache
+is bounded by the memory used by the grids. The least recently used grids are
+removed first.
+"""
+
+from collections import OrderedDict
+import hashlib
+import numpy as np
+from mplstereonet import density_grid
+
+
+def compute_grid(dipdir, dips, measurement, method, sigma, gridsize):
+    """
+    Calculates the density grid of measurements.
+
+    Returns the longitudes, latitudes and densities of the grid. The function
+    does not use the cache, so it can be run in a worker thread. The result
+    is added to the cache afterwards (see DensityCache.add_grid).
+    """
+    return density_grid(dipdir, dips, measurement=measurement, method=method,
+                        sigma=sigma, gridsize=gridsize)
+
+
+class DensityCache(object):
+
+    """
+    Stores density grids by the measurements and contour settings.
+
+    The key of a grid is a hash of the measurements together with the
+    measurement type, contouring method, sigma and gridsize. Grids are
+    evicted in least-recently-used order when the stored grids use more
+    than max_bytes.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        """
+        Initializes an empty cache.
+
+        Expects the maximum number of bytes the stored grids are allowed to
+        use. The default is 32 MB.
+        """
+        self.max_bytes = max_bytes
+        self.grids = OrderedDict()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, dipdir, dips, measurement, method, sigma, gridsize):
+        """
+        Returns the key for a set of measurements and contour settings.
+
+        The measurements are hashed, so the key stays small, even for large
+        layers.
+        """
+        digest = hashlib.sha1()
+        for column in (dipdir, dips):
+            column = np.ascontiguousarray(column, dtype=np.float64)
+            digest.update(str(column.shape).encode("ascii"))
+            digest.update(column.tobytes())
+        return (digest.hexdigest(), measurement, method, float(sigma),
+                int(gridsize))
+
+    def get_grid(self, dipdir, dips, measurement, method, sigma, gridsize):
+        """
+        Returns the density grid for the measurements and contour settings.
+
+        Expects the two columns of measurements in the order mplstereonet
+        expects them for the measurement type ("poles" or "lines"), the
+        contouring method, sigma and gridsize. Returns the longitudes,
+        latitudes and densities of the grid. A stored grid is returned if
+        there is one, otherwise the grid is calculated and stored.
+        """
+        key = self.make_key(dipdir, dips, measurement, method, sigma,
+                            gridsize)
+        grid = self.get_cached_grid(key)
+        if grid is None:
+            grid = compute_grid(dipdir, dips, measurement, method, sigma,
+                                gridsize)
+            self.add_grid(key, grid)
+        return grid
+
+    def get_cached_grid(self, key):
+        """
+        Returns the stored grid for a key (see make_key) or None.
+
+        A returned grid becomes the most recently used grid.
+        """
+        if key in self.grids:
+            self.hits += 1
+            self.grids.move_to_end(key)
+            return self.grids[key]
+        self.misses += 1
+        return None
+
+    def add_grid(self, key, grid):
+        """
+        Stores a grid and removes the least recently used grids if the
+        cache grows larger than max_bytes. The newest grid is always kept.
+        """
+        self.grids[key] = grid
+        self.n_bytes += self.grid_bytes(grid)
+        while self.n_bytes > self.max_bytes and len(self.grids) > 1:
+            old_key, old_grid = self.grids.popitem(last=False)
+            self.n_bytes -= self.grid_bytes(old_grid)
+
+    def grid_bytes(self, grid):
+        """
+        Returns the number of bytes used by the arrays of a grid.
+        """
+        return sum(array.nbytes for array in grid)
+
+    def clear(self):
+        """
+        Removes all grids from the cache.
+        """
+        self.grids.clear()
+        self.n_bytes = 0
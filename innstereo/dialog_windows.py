@@ -557,10 +557,10 @@ class FileChooserSave(object):
     to save the project.
     """
 
-    def __init__(self, main_window, data):
+    def __init__(self, main_window, write_project):
         self.builder = Gtk.Builder()
         self.builder.set_translation_domain(i18n().get_ts_domain())
-        self.data = data
+        self.write_project = write_project
         script_dir = os.path.dirname(__file__)
         rel_path = "gui_layout.glade"
         abs_path = os.path.join(script_dir, rel_path)
@@ -627,8 +627,8 @@ class FileChooserSave(object):
         If the file already exists a dialog will confirm the overwrite.
         """
         self.filename = self.dialog.get_filename()
-        if self.filename[-5:] != ".json":
-            self.filename = self.filename + ".json"
+        if self.filename[-10:] != ".innstereo":
+            self.filename = self.filename + ".innstereo"
         if os.path.exists(self.filename) == True:
             overwrite = OverwriteDialog(self.write_data, self.dialog)
             overwrite.run()
@@ -638,12 +638,12 @@ class FileChooserSave(object):
 
     def write_data(self):
         """
-        Writes the data to the file.
+        Writes the project to the file.
 
-        Opens the file the user has inputted and writes the data to that file.
+        Passes the file the user has inputted to the write_project method of
+        the MainWindow, which writes the project archive.
         """
-        with open(self.filename, "w") as new_file:
-            new_file.write(self.data)
+        self.write_project(self.filename)
         self.dialog.hide()
 
 
@@ -666,6 +666,10 @@ class FileChooserOpen(object):
             ("filechooserdialog_open", ""))
         self.dialog = self.builder.get_object("filechooserdialog_open")
         self.dialog.set_transient_for(main_window)
+        filter_project = Gtk.FileFilter()
+        filter_project.add_pattern("*.innstereo")
+        filter_project.set_name(_("InnStereo project"))
+        self.dialog.add_filter(filter_project)
         filter_json = Gtk.FileFilter()
         filter_json.add_pattern("*.json")
         filter_json.set_name("JSON")
@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+
+"""
+This module contains the FeatureIndex-class that finds plotted features.
+
+The index is a KD-tree over the projected coordinates of the poles and
+linears that are drawn in the stereonet. It is built once per redraw, so
+each motion event of the mouse only needs one nearest-neighbour query to
+find the measurement under the cursor.
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class FeatureIndex(object):
+
+    """
+    Finds the layer and row of the plotted point nearest to a position.
+
+    The points are given in the coordinates of the stereonet projection
+    (see LayerPlotter.get_projected_points). The index does not change when
+    the window is resized, because the pick radius is converted into the
+    same coordinates for each query.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty index.
+        """
+        self.tree = None
+        self.layers = []
+        self.entries = np.empty(0, dtype=np.intp)
+        self.rows = np.empty(0, dtype=np.intp)
+
+    def build(self, entries):
+        """
+        Builds the index from the points of the drawn layers.
+
+        Expects a list of (layer object, points) tuples, where points is an
+        (N, 2) array with one point for each row of the layer. A layer can
+        appear more than once, e.g. with the poles and the linears of
+        faultplanes.
+        """
+        self.layers = [lyr_obj for lyr_obj, points in entries]
+        counts = [len(points) for lyr_obj, points in entries]
+        if sum(counts) == 0:
+            self.clear()
+            return
+
+        self.tree = cKDTree(np.concatenate([points for lyr_obj, points
+                                            in entries if len(points) > 0]))
+        self.entries = np.repeat(np.arange(len(entries)), counts)
+        self.rows = np.concatenate([np.arange(count) for count in counts])
+
+    def clear(self):
+        """
+        Removes all points from the index.
+        """
+        self.tree = None
+        self.layers = []
+        self.entries = np.empty(0, dtype=np.intp)
+        self.rows = np.empty(0, dtype=np.intp)
+
+    def query(self, x, y, max_distance):
+        """
+        Returns the layer and row of the point that is nearest to x and y.
+
+        Only points within max_distance are found. Returns a tuple of the
+        layer object and the row number, or None if there is no point
+        within that distance.
+        """
+        if self.tree is None:
+            return None
+
+        distance, index = self.tree.query((x, y),
+                                          distance_upper_bound=max_distance)
+        if np.isinf(distance):
+            return None
+        return self.layers[self.entries[index]], int(self.rows[index])
@@ -8,8 +8,10 @@ loads the GUI from the glade file and connects all the GUI signals.
 """
 
 from gi.repository import Gtk
-import re
 import os
+import numpy as np
+from .line_index import LineIndex, split_line, read_columns
+from .stereo_math import normalize_columns
 
 
 class FileParseDialog(object):
@@ -23,8 +25,7 @@ class FileParseDialog(object):
     defined in Glade and are connected to this class.
     """
 
-    def __init__(self, text_file, layer_obj, redraw_plot,
-                 append_plane, append_line, append_faultplane, main_window):
+    def __init__(self, text_file, layer_obj, redraw_plot, main_window):
         """
         Initializes the file parser dialog and connects the signals.
 
@@ -33,7 +34,8 @@ class FileParseDialog(object):
         assigned. Then the treestore and treeview are set up. A few buttons
         are hidden, depending on the layer that was chosen for the import. Then
         the signals are connected and the dialog does the first parsing of the
-        file.
+        file. The preview only shows preview_size lines, which are read with
+        a LineIndex of the file.
         """
         self.builder = Gtk.Builder()
         script_dir = os.path.dirname(__file__)
@@ -48,10 +50,10 @@ class FileParseDialog(object):
         self.dialog.set_transient_for(main_window)
         self.redraw_plot = redraw_plot
         self.layer_obj = layer_obj
-        self.append_plane = append_plane
-        self.append_line = append_plane
-        self.append_faultplane = append_faultplane
         self.file = text_file
+        self.line_index = LineIndex(text_file)
+        self.preview_size = 500
+        self.start_line = 0
         self.load_gui_elements()
         self.create_treeview()
         self.hide_buttons()
@@ -135,19 +137,17 @@ class FileParseDialog(object):
         """
         Parses the file according to the settings and updates the TreeView.
 
-        The old parsing result are cleared from the TreeStore. Then each
-        row of the file is re-iterated and all rows before the starting
-        row are omitted. The rows are passed to the append_data-method.
+        The old parsing result are cleared from the TreeStore. The preview
+        shows a window of preview_size rows that begins with the starting
+        row. The rows are read with the line index, which seeks to the
+        starting row instead of reading the file from the beginning. The
+        rows are passed to the append_data-method.
         """
+        self.start_line = int(start_line)
         self.store.clear()
-        parse_file = open(self.file, "r")
-        for key, line in enumerate(parse_file):
-            if key < start_line:
-                continue
-            else:
-                line = line.rstrip()
-                string_list = re.split(r"[;,]", line)
-                self.append_data(string_list)
+        for line in self.line_index.get_lines(self.start_line,
+                                              self.preview_size):
+            self.append_data(split_line(line))
 
     def on_spinbutton_start_line_value_changed(self, spinbutton):
         """
@@ -156,6 +156,7 @@ class FileParseDialog(object):
         If the user changes the starting line for the parsing, the new
         starting line will be passes to the parse_file method. This will
         result in all the lines, before the starting line, to be omitted.
+        Only the preview window is read again.
         """
         start_line = spinbutton.get_value()
         self.parse_file(start_line)
@@ -210,7 +211,12 @@ class FileParseDialog(object):
         numbers from the dialog. The column-numbers match the parsed-column
         with the internal column for the data (e.g. plane dip-direction is in
         the 3rd column in the parsed file, but needs to go into the 1st column
-        of a plane-layer).
+        of a plane-layer). The selected columns are read from the file, from
+        the starting row on, in chunks into arrays (see read_columns).
+        Missing columns are filled with defaults. The angles of planes and
+        lines are moved into the normal range like the add-feature methods of
+        the MainWindow do. The rows are added to the layer in one bulk insert
+        while the data-view is detached from its model.
         """
         cb_pl_dipdir = self.combobox_plane_dipdir.get_active()
         cb_pl_dip = self.combobox_plane_dip.get_active()
@@ -219,106 +225,36 @@ class FileParseDialog(object):
         cb_ln_dip = self.combobox_line_dip.get_active()
         cb_ln_sense = self.combobox_line_sense.get_active()
         layer_store = self.layer_obj.get_data_treestore()
+        layer_view = self.layer_obj.get_data_treeview()
         layer_type = self.layer_obj.get_layer_type()
         self.checkbutton_tectonicsfpl = \
                             self.builder.get_object("checkbutton_tectonicsfpl")
         self.use_tfpl = self.checkbutton_tectonicsfpl.get_active()
 
-        def iterate_over_planes(m, p, i):
-            """
-            Iterates over all parsed rows and adds them to a plane-layer.
-
-            Replaces the values with a default so there is no IndexError.
-            Calls the add_planar_feature function from the MainWindow class.
-            """
-            #m = model, p = path, i = itr
-            if cb_pl_dipdir == -1:
-                dipdir = 0
-            else:
-                dipdir = float(m[p][cb_pl_dipdir])
-            if cb_pl_dip == -1:
-                dip = 0
-            else:
-                dip = float(m[p][cb_pl_dip])
-            if cb_pl_strat == -1:
-                strat = ""
-            else:
-                strat = str(m[p][cb_pl_strat])
-            self.append_plane(layer_store, dipdir, dip, strat)
-
-        def iterate_over_lines(m, p, i):
-            """
-            Iterates over all parsed rows and adds them to a line-layer.
-
-            Replaces the values with a default so there is no IndexError.
-            Calls the add_linear_feature function from the MainWindow class.
-            """
-            #m = model, p = path, i = itr
-            if cb_ln_dipdir == -1:
-                dipdir = 0
-            else:
-                dipdir = float(m[p][cb_ln_dipdir])
-
-            if cb_ln_dip == -1:
-                dip = 0
-            else:
-                dip = float(m[p][cb_ln_dip])
-
-            if cb_ln_sense == -1:
-                sense = ""
-            else:
-                if self.use_tfpl is True:
-                    sense = self.tfpl_dic[m[p][cb_ln_sense][0:1]]
-                else:
-                    sense = str(m[p][cb_ln_sense])
-
-            self.append_line(layer_store, dipdir, dip, sense)
-
-        def iterate_over_faultplanes(m, p, i):
-            """
-            Iterates over all parsed rows and adds them to a faultplane-layer.
-
-            Replaces the values with a default so there is no IndexError.
-            Calls the add_faultplane_feature function from the MainWindow class.
-            """
-            #m = model, p = path, i = itr
-            if cb_pl_dipdir == -1:
-                pl_dipdir = 0
-            else:
-                pl_dipdir = float(m[p][cb_pl_dipdir])
-
-            if cb_pl_dip == -1:
-                pl_dip = 0
-            else:
-                pl_dip = float(m[p][cb_pl_dip])
-
-            if cb_ln_dipdir == -1:
-                ln_dipdir = 0
-            else:
-                ln_dipdir = float(m[p][cb_ln_dipdir])
-
-            if cb_ln_dip == -1:
-                ln_dip = 0
-            else:
-                ln_dip = float(m[p][cb_ln_dip])
-
-            if cb_ln_sense == -1:
-                ln_sense = ""
-            else:
-                if self.use_tfpl is True:
-                    ln_sense = self.tfpl_dic[m[p][cb_ln_sense][0:1]]
-                else:
-                    ln_sense = str(m[p][cb_ln_sense])
-
-            self.append_faultplane(layer_store, pl_dipdir, pl_dip, ln_dipdir,
-                                   ln_dip, ln_sense)
-
         if layer_type == "plane":
-            self.store.foreach(iterate_over_planes)
+            columns = [(cb_pl_dipdir, float), (cb_pl_dip, float),
+                       (cb_pl_strat, str)]
         elif layer_type == "line":
-            self.store.foreach(iterate_over_lines)
+            columns = [(cb_ln_dipdir, float), (cb_ln_dip, float),
+                       (cb_ln_sense, str)]
         elif layer_type == "faultplane":
-            self.store.foreach(iterate_over_faultplanes)
+            columns = [(cb_pl_dipdir, float), (cb_pl_dip, float),
+                       (cb_ln_dipdir, float), (cb_ln_dip, float),
+                       (cb_ln_sense, str)]
+        else:
+            self.dialog.hide()
+            return
+
+        data = read_columns(self.line_index, self.start_line, columns)
+        data = normalize_columns(layer_type, data)
+
+        if layer_type != "plane" and cb_ln_sense != -1 and self.use_tfpl is True:
+            data[-1] = np.array([self.tfpl_dic[sense[0:1]]
+                                 for sense in data[-1]], dtype=object)
+
+        layer_view.set_model(None)
+        layer_store.extend(data)
+        layer_view.set_model(layer_store)
         self.redraw_plot()
         self.dialog.hide()
 
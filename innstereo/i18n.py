@@ -26,7 +26,6 @@ import os, sys
 import locale
 import gettext
 from os.path import join, abspath
-from gi.repository import Gtk
 
 class i18n:
     app_name = ""
@@ -95,6 +94,7 @@ class i18n:
 _ = i18n().language().gettext
   
 def translate_gui(builder):
+    from gi.repository import Gtk
     for obj in builder.get_objects():
         if (not isinstance(obj, Gtk.SeparatorMenuItem)) and hasattr(obj, "get_label"):
             label = obj.get_label()
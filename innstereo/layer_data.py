@@ -0,0 +1,335 @@
+#!/usr/bin/python3
+
+"""
+This module contains the LayerData-class, the columnar data store of a layer.
+
+Each data layer keeps its features in a LayerData-object. The columns are
+stored as contiguous NumPy arrays (float64 for numeric columns and object
+arrays for text columns). The arrays are allocated with spare capacity, so
+appending rows does not reallocate on every call. The plotting and statistics
+functions of the MainWindow receive views of these arrays, which avoids
+copying the data into Python lists on every redraw. The ListStore that is
+shown in the data-view is kept in sync by the DataStore-class in the
+dataview_classes-module.
+"""
+
+import os
+import numpy as np
+
+
+def select_rows(array, subset=None):
+    """
+    Returns the rows of an array that are in a subset.
+
+    A subset can be a list or array of row indices, or a boolean mask with
+    one entry per row. Without a subset the array is returned unchanged.
+    """
+    if subset is None:
+        return array
+    subset = np.asarray(subset)
+    if subset.dtype != bool:
+        subset = subset.astype(np.intp)
+    return array[subset]
+
+
+def is_mapped(array, file_name):
+    """
+    Returns True if an array is memory-mapped from a file.
+
+    Follows the bases of views and converted arrays, so an array that
+    was created with np.asarray from a np.memmap is found as well.
+    """
+    file_name = os.path.abspath(file_name)
+    while array is not None:
+        if isinstance(array, np.memmap) and array.filename == file_name:
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+class LayerData(object):
+
+    """
+    Stores the data of a layer as one NumPy array per column.
+
+    The class is initialized with the Python types of the columns (e.g.
+    float, float, str). Every change to the data increments the version
+    counter, which can be used to find out whether data derived from the
+    layer has to be recomputed.
+    """
+
+    def __init__(self, *column_types):
+        """
+        Initializes the empty columns.
+
+        Expects the Python types of the columns in the same order as the
+        columns of the ListStore (e.g. float, float, str).
+        """
+        self.column_types = column_types
+        self.n_rows = 0
+        self.version = 0
+        self.columns = [self.empty_column(col_type, 16)
+                        for col_type in column_types]
+        self.tensor = None
+
+    def empty_column(self, col_type, capacity):
+        """
+        Returns an empty array for a column type.
+
+        Float columns are stored as float64 and all other types as object
+        arrays.
+        """
+        if col_type is float:
+            return np.zeros(capacity, dtype=np.float64)
+        else:
+            column = np.empty(capacity, dtype=object)
+            column[:] = ""
+            return column
+
+    def default_value(self, col_type):
+        """
+        Returns the value of an empty cell for the column type.
+
+        The defaults correspond to the values of an empty Gtk.ListStore row.
+        """
+        if col_type is float:
+            return 0.0
+        else:
+            return ""
+
+    def convert_value(self, col_type, value):
+        """
+        Converts a value to the type of the column.
+        """
+        if col_type is float:
+            return float(value)
+        else:
+            return value
+
+    def reserve(self, n_rows):
+        """
+        Makes sure that the columns can hold at least n_rows rows.
+
+        The capacity is doubled until the rows fit. Existing data is copied
+        into the new arrays.
+        """
+        capacity = len(self.columns[0]) if len(self.columns) > 0 else 0
+        if n_rows <= capacity:
+            return
+        while capacity < n_rows:
+            capacity = max(16, capacity * 2)
+        for i, col_type in enumerate(self.column_types):
+            new_column = self.empty_column(col_type, capacity)
+            new_column[:self.n_rows] = self.columns[i][:self.n_rows]
+            self.columns[i] = new_column
+
+    def changed(self):
+        """
+        Increments the version counter. Called after each change of data.
+        """
+        self.version += 1
+
+    def set_orientation_tensor(self, tensor):
+        """
+        Sets the OrientationTensor that is kept up to date with the data.
+
+        The sums of the tensor are calculated from all rows once. After
+        that, each change of the data only adds or subtracts the rows that
+        changed (see update_tensor).
+        """
+        self.tensor = tensor
+        tensor.reset()
+        self.update_tensor(0, self.n_rows)
+
+    def get_orientation_tensor(self):
+        """
+        Returns the OrientationTensor of the data, or None if none was set.
+        """
+        return self.tensor
+
+    def update_tensor(self, start, stop, sign=1):
+        """
+        Adds (sign=1) or subtracts (sign=-1) rows from the OrientationTensor.
+        """
+        if self.tensor is not None:
+            self.tensor.update(self, start, stop, sign)
+
+    def get_version(self):
+        """
+        Returns the current version of the data.
+
+        The version is incremented each time the data changes.
+        """
+        return self.version
+
+    def get_n_columns(self):
+        """
+        Returns the number of columns.
+        """
+        return len(self.column_types)
+
+    def __len__(self):
+        """
+        Returns the number of rows.
+        """
+        return self.n_rows
+
+    def get_column(self, column, subset=None):
+        """
+        Returns a column as an array.
+
+        Without a subset the returned array is a view of the stored data and
+        should not be modified. A subset can be a list or array of row
+        indices, or a boolean mask with one entry per row. Subsets return a
+        copy of the selected rows.
+        """
+        return select_rows(self.columns[column][:self.n_rows], subset)
+
+    def get_columns(self, subset=None):
+        """
+        Returns a list of all columns. See get_column.
+        """
+        return [self.get_column(i, subset)
+                for i in range(len(self.column_types))]
+
+    def get_row(self, index):
+        """
+        Returns the row at the index as a list of Python values.
+        """
+        return [col[index].item() if isinstance(col[index], np.generic)
+                else col[index] for col in self.columns]
+
+    def append(self, row=None):
+        """
+        Appends a row. Returns the index of the new row.
+
+        The row is a list or tuple with one value per column. If no row is
+        passed, an empty row is appended.
+        """
+        return self.insert(self.n_rows, row)
+
+    def insert(self, index, row=None):
+        """
+        Inserts a row at the index. Returns the index of the new row.
+
+        A negative index or an index larger than the number of rows appends
+        the row at the end.
+        """
+        if index < 0 or index > self.n_rows:
+            index = self.n_rows
+        self.reserve(self.n_rows + 1)
+        for i, col_type in enumerate(self.column_types):
+            column = self.columns[i]
+            if index < self.n_rows:
+                column[index + 1:self.n_rows + 1] = column[index:self.n_rows]
+            if row is None:
+                column[index] = self.default_value(col_type)
+            else:
+                column[index] = self.convert_value(col_type, row[i])
+        self.n_rows += 1
+        self.update_tensor(index, index + 1)
+        self.changed()
+        return index
+
+    def extend(self, columns):
+        """
+        Appends many rows at once.
+
+        Expects a list with one array or list per column. All columns need
+        to have the same length. Returns the index of the first new row.
+        """
+        columns = [np.asarray(col) for col in columns]
+        n_new = len(columns[0]) if len(columns) > 0 else 0
+        start = self.n_rows
+        self.reserve(self.n_rows + n_new)
+        for i, col_type in enumerate(self.column_types):
+            if col_type is float:
+                self.columns[i][start:start + n_new] = \
+                    columns[i].astype(np.float64)
+            else:
+                self.columns[i][start:start + n_new] = columns[i]
+        self.n_rows += n_new
+        self.update_tensor(start, start + n_new)
+        self.changed()
+        return start
+
+    def set_columns(self, columns):
+        """
+        Replaces the data with whole columns.
+
+        Expects a list with one array or list per column. Float arrays are
+        used as the storage of the columns without copying them (e.g. the
+        memory-mapped columns of a project file), so the data is only read
+        when it is used. The arrays are copied when rows are appended.
+        """
+        n_rows = len(columns[0]) if len(columns) > 0 else 0
+        new_columns = []
+        for i, col_type in enumerate(self.column_types):
+            if n_rows == 0:
+                new_columns.append(self.empty_column(col_type, 16))
+            elif col_type is float:
+                new_columns.append(np.asarray(columns[i], dtype=np.float64))
+            else:
+                new_columns.append(np.asarray(columns[i]).astype(object))
+        self.columns = new_columns
+        self.n_rows = n_rows
+        if self.tensor is not None:
+            self.tensor.reset()
+            self.update_tensor(0, n_rows)
+        self.changed()
+
+    def release_mapping(self, file_name):
+        """
+        Copies columns that are memory-mapped from a file into memory.
+
+        Called before a project is saved to the file that it was opened
+        from. A file that is still mapped cannot be replaced on Windows.
+        The data does not change, so the version is not incremented.
+        """
+        for i, column in enumerate(self.columns):
+            if is_mapped(column, file_name):
+                self.columns[i] = np.array(column)
+
+    def set_value(self, index, column, value):
+        """
+        Sets the value of a cell.
+        """
+        col_type = self.column_types[column]
+        self.update_tensor(index, index + 1, -1)
+        self.columns[column][index] = self.convert_value(col_type, value)
+        self.update_tensor(index, index + 1)
+        self.changed()
+
+    def remove(self, index):
+        """
+        Removes the row at the index.
+        """
+        self.update_tensor(index, index + 1, -1)
+        for column in self.columns:
+            column[index:self.n_rows - 1] = column[index + 1:self.n_rows]
+        self.n_rows -= 1
+        for i, col_type in enumerate(self.column_types):
+            self.columns[i][self.n_rows] = self.default_value(col_type)
+        self.changed()
+
+    def clear(self):
+        """
+        Removes all rows.
+        """
+        self.n_rows = 0
+        self.columns = [self.empty_column(col_type, 16)
+                        for col_type in self.column_types]
+        if self.tensor is not None:
+            self.tensor.reset()
+        self.changed()
+
+    def tolist(self):
+        """
+        Returns the data as a list of rows.
+
+        Numeric values are returned as Python floats. This is used to
+        serialize the layer.
+        """
+        lists = [self.get_column(i).tolist()
+                 for i in range(len(self.column_types))]
+        return [list(row) for row in zip(*lists)]
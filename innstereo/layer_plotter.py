@@ -0,0 +1,915 @@
+#!/usr/bin/python3
+
+"""
+This module contains the LayerPlotter-class that draws layers into the plot.
+
+The LayerPlotter parses the data of a layer and draws it into the stereonet
+and rose diagram axes with the styling of the layer. It does not depend on
+Gtk. The MainWindow inherits the drawing methods for the plot in the GUI and
+the headless renderer of the render-module uses them to draw project files
+into a figure without a window.
+"""
+
+import mplstereonet
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.transforms import Affine2D
+
+from .stereo_math import (lp_planes, great_circles, small_circles,
+                          hoeppener_arrows)
+from .density_cache import compute_grid
+from .layer_data import select_rows
+
+
+def great_circle_collection(ax, strikes, dips, segments=100, **kwargs):
+    """
+    Draws great circles into a stereonet axis as a single LineCollection.
+
+    Expects arrays of strikes and dips and the number of vertices of a
+    horizontal circle. The vertices of all circles are calculated by
+    great_circles and projected in one array, so the collection only needs
+    the affine part of the data transform and matplotlib does not project
+    each path when drawing. The keyword arguments are passed to the
+    LineCollection. Returns the collection, or None if there are no circles.
+    """
+    if len(strikes) == 0:
+        return None
+
+    vertices, counts = great_circles(strikes, dips, segments)
+    xy = ax.transProjection.transform(vertices)
+    collection = LineCollection(np.split(xy, np.cumsum(counts)[:-1]),
+                                transform=ax.transAffine + ax.transAxes,
+                                **kwargs)
+    ax.add_collection(collection, autolim=False)
+    return collection
+
+
+def small_circle_collection(ax, plunges, bearings, angles, segments=100,
+                            **kwargs):
+    """
+    Draws small circles into a stereonet axis as a single LineCollection.
+
+    Expects arrays (or single values) of the plunges and bearings of the
+    axes and of the opening angles. Like mplstereonet's cone, each circle is
+    drawn together with its antipode, so circles that cross the primitive
+    continue on the opposite side. The vertices of all circles are
+    calculated by small_circles and projected in one array. The keyword
+    arguments are passed to the LineCollection. Returns the collection, or
+    None if there are no circles.
+    """
+    plunges, bearings, angles = np.broadcast_arrays(np.atleast_1d(plunges),
+                                    np.atleast_1d(bearings),
+                                    np.atleast_1d(angles))
+    if len(plunges) == 0:
+        return None
+
+    lon, lat = small_circles(np.concatenate([plunges, -plunges]),
+                             np.concatenate([bearings, bearings + 180]),
+                             np.concatenate([angles, angles]), segments)
+    xy = ax.transProjection.transform(np.column_stack([lon.ravel(),
+                                                       lat.ravel()]))
+    collection = LineCollection(xy.reshape(-1, segments, 2),
+                                transform=ax.transAffine + ax.transAxes,
+                                **kwargs)
+    ax.add_collection(collection, autolim=False)
+    return collection
+
+
+class LayerPlotter(object):
+
+    """
+    The LayerPlotter-class draws layers and the stereonet decorations.
+
+    Subclasses have to provide the axes (ax_stereo, ax_rose, ax_drose and
+    ax_cbar), the figure (fig), the PlotSettings (settings) and a
+    DensityCache (density_cache). The list cbar collects the contour fills
+    of a redraw and styled_artists collects (style, artists) tuples of the
+    artists that follow the style properties of a layer (see
+    restyle_artists).
+    """
+
+    def parse_planes(self, layer_data, subset=None):
+        """
+        Parses planes and returns arrays of strikes, dipdirs and dips.
+
+        Expects the LayerData of a layer and optionally a subset of rows (an
+        array of row indices or a boolean mask, see LayerData.get_column).
+        Parsing converts from dip direction to strikes. The dipdir and dip
+        arrays are views of the layer data if no subset is passed.
+        """
+        dipdir, dip, strat = layer_data.get_columns(subset)
+        strike = dipdir - 90
+        return strike, dipdir, dip
+
+    def parse_faultplanes(self, layer_data, subset=None):
+        """
+        Parses a faultplane layer. Converts planes from dip-direction to
+        strikes so they can be plotted.
+        #lp_plane = linear-pole_plane (The great circles that connect the
+        lineation with the pole of the faultplane. Used for Hoeppener-Plots.
+        """
+        plane_dir, plane_dip, line_dir, line_dip, sense = \
+            layer_data.get_columns(subset)
+        strike = plane_dir - 90
+
+        up = sense == "up"
+        has_sense = up | (sense == "dn")
+        line_sense_dir = np.where(up, line_dir + 180, line_dir)[has_sense]
+        line_sense_dip = np.where(up, 90 - line_dip, line_dip)[has_sense]
+
+        lp_plane_dir, lp_plane_dip = lp_planes(plane_dir, plane_dip,
+                                               line_dir, line_dip)
+        return strike, plane_dir, plane_dip, line_dir, line_dip, sense, \
+               line_sense_dir, line_sense_dip, lp_plane_dir, lp_plane_dip
+
+    def parse_lines(self, layer_data, subset=None):
+        """
+        Parses linear data with the 3 columns dip direction, dip and sense.
+        Returns an array for each column.
+        """
+        line_dir, line_dip, sense = layer_data.get_columns(subset)
+        return line_dir, line_dip, sense
+
+    def parse_eigenvectors(self, layer_data, subset=None):
+        """
+        Parses a eigenvector layer and returns an array of each column
+
+        This method expect the LayerData that stores the data of a layer. It
+        returns 3 arrays for line_dir, line_dip (the eigenvector) and values
+        (the eigenvalue)
+        """
+        line_dir, line_dip, values = layer_data.get_columns(subset)
+        return line_dir, line_dip, values
+
+    def parse_smallcircles(self, layer_data, subset=None):
+        """
+        Parses small circle data. Data has 3 columns: Dip direction, dip and
+        opening angle.
+        """
+        line_dir, line_dip, angle = layer_data.get_columns(subset)
+        return line_dir, line_dip, angle
+
+    def get_circle_segments(self):
+        """
+        Returns the number of vertices of a horizontal great circle.
+
+        A horizontal great circle is half of the primitive circle, so its
+        length in pixels depends on the size of the stereonet and the pixel
+        density of the figure. One vertex is used for every 4 pixels, at
+        least 8 and at most the 100 vertices that mplstereonet uses.
+        """
+        bbox = self.ax_stereo.bbox
+        length = np.pi / 2 * min(bbox.width, bbox.height)
+        return int(np.clip(length / 4, 8, 100))
+
+    def draw_great_circles(self, strikes, dips, **kwargs):
+        """
+        Draws great circles into the stereonet as a single LineCollection.
+
+        The number of vertices is taken from get_circle_segments. See
+        great_circle_collection.
+        """
+        return great_circle_collection(self.ax_stereo, strikes, dips,
+                                       self.get_circle_segments(), **kwargs)
+
+    def draw_small_circles(self, plunges, bearings, angles, **kwargs):
+        """
+        Draws small circles into the stereonet as a single LineCollection.
+
+        The number of vertices is taken from get_circle_segments. See
+        small_circle_collection.
+        """
+        return small_circle_collection(self.ax_stereo, plunges, bearings,
+                                       angles, self.get_circle_segments(),
+                                       **kwargs)
+
+    def get_projected_points(self, lyr_obj, kind, subset=None):
+        """
+        Returns the projected coordinates of the poles or linears of a layer.
+
+        Expects the layer object, the kind of points ("poles" or "linears")
+        and optionally a subset of rows. The points of all rows are projected
+        once and cached in the layer for the version of its data and the
+        projection of the stereonet (see PlaneLayer.get_cached_points).
+        Redraws and highlights of an unchanged layer only select the rows
+        from the cached array. Returns an (N, 2) array in the coordinates of
+        the projection (see draw_points).
+        """
+        projection = self.ax_stereo.name
+        points = lyr_obj.get_cached_points(kind, projection)
+        if points is None:
+            points = self.project_points(lyr_obj, kind)
+            lyr_obj.set_cached_points(kind, projection, points)
+        return select_rows(points, subset)
+
+    def project_points(self, lyr_obj, kind):
+        """
+        Projects the poles or linears of all rows of a layer.
+
+        Poles are calculated from the dip-direction and dip of planes and
+        faultplanes. Linears are taken from the first two columns of line
+        and eigenvector layers and from the linear columns of faultplanes.
+        The longitudes and latitudes are projected in one call of the
+        projection transform.
+        """
+        layer_data = lyr_obj.get_data()
+        if kind == "poles":
+            dip = np.array(layer_data.get_column(1), dtype=float)
+            lon, lat = mplstereonet.pole(layer_data.get_column(0) - 90, dip)
+        else:
+            column = 2 if lyr_obj.get_layer_type() == "faultplane" else 0
+            lon, lat = mplstereonet.line(layer_data.get_column(column + 1),
+                                         layer_data.get_column(column))
+        return self.ax_stereo.transProjection.transform(
+                                            np.column_stack([lon, lat]))
+
+    def get_visible_points(self, lyr_obj):
+        """
+        Returns the projected points of a layer that are drawn as markers.
+
+        Returns a list with the poles and linears of the layer that are
+        switched on in its properties. Each array holds the points of all
+        rows (see get_projected_points).
+        """
+        lyr_type = lyr_obj.get_layer_type()
+        points = []
+        if lyr_type in ("plane", "faultplane"):
+            if lyr_obj.get_draw_poles() == True:
+                points.append(self.get_projected_points(lyr_obj, "poles"))
+        if lyr_type in ("line", "faultplane", "eigenvector"):
+            if lyr_obj.get_draw_linears() == True:
+                points.append(self.get_projected_points(lyr_obj, "linears"))
+        return points
+
+    def draw_points(self, points, **kwargs):
+        """
+        Draws projected points into the stereonet as a single Line2D.
+
+        Expects an (N, 2) array of get_projected_points. The points are
+        already projected, so only the affine part of the data transform is
+        used. The keyword arguments are passed to plot. Returns a list with
+        the line, or an empty list if there are no points.
+        """
+        if len(points) == 0:
+            return []
+        return self.ax_stereo.plot(points[:, 0], points[:, 1], linestyle="",
+                    transform=self.ax_stereo.transAffine +
+                              self.ax_stereo.transAxes, **kwargs)
+
+    def draw_plane(self, lyr_obj, dipdir, dip, highlight=False):
+        """
+        Function draws a great circle in the stereonet. It calls the formatting
+        from the layer object.
+
+        All great circles of the layer are drawn as one LineCollection.
+        """
+        num_data = len(dipdir)
+        lbl = "{} ({})".format(lyr_obj.get_label(), num_data)
+
+        if highlight is False:
+            circles = self.draw_great_circles(dipdir, dip,
+                    colors=lyr_obj.get_line_color(),
+                    label=lbl,
+                    linewidths=lyr_obj.get_line_width(),
+                    linestyles=lyr_obj.get_line_style(),
+                    capstyle=lyr_obj.get_capstyle(),
+                    alpha=lyr_obj.get_line_alpha(), clip_on=False)
+            self.add_styled_artists("circles", circles)
+        else:
+            self.draw_great_circles(dipdir, dip,
+                    colors=lyr_obj.get_line_color(),
+                    linewidths=lyr_obj.get_line_width() + 2,
+                    linestyles=lyr_obj.get_line_style(),
+                    capstyle=lyr_obj.get_capstyle(),
+                    alpha=lyr_obj.get_line_alpha(), clip_on=False)
+
+    def draw_line(self, lyr_obj, points, highlight=False):
+        """
+        Function draws a linear element in the stereonet. It calls the
+        formatting from the layer object.
+
+        Expects the projected points of the linears (see
+        get_projected_points).
+        """
+        num_data = len(points)
+        lbl = "{} ({})".format(lyr_obj.get_label(), num_data)
+
+        if highlight is False:
+            lines = self.draw_points(points,
+                    marker=lyr_obj.get_marker_style(),
+                    markersize=lyr_obj.get_marker_size(),
+                    color=lyr_obj.get_marker_fill(),
+                    label=lbl,
+                    markeredgewidth=lyr_obj.get_marker_edge_width(),
+                    markeredgecolor=lyr_obj.get_marker_edge_color(),
+                    alpha=lyr_obj.get_marker_alpha(), clip_on=False)
+            self.add_styled_artists("linears", lines)
+        else:
+            self.draw_points(points, marker=lyr_obj.get_marker_style(),
+                    markersize=lyr_obj.get_marker_size(),
+                    color=lyr_obj.get_marker_fill(),
+                    markeredgewidth=lyr_obj.get_marker_edge_width() + 2,
+                    markeredgecolor=lyr_obj.get_marker_edge_color(),
+                    alpha=lyr_obj.get_marker_alpha(), clip_on=False)
+
+    def draw_eigenvector(self, lyr_obj, points, dipdir, dip, values,
+                         highlight=False):
+        """
+        Draws the eigenvectors as lines and adds the eigenvalues to the legend.
+
+        This method is called from the redraw_plot method to draw a eigenvector
+        layer. It expects a layer object, the projected points of the
+        eigenvectors (see get_projected_points) and arrays for dip-direction,
+        dips and values. The arrays are rounded and converted to strings for
+        the legend.
+        """
+        dipdir = np.round(dipdir, 1).tolist()
+        dip = np.round(dip, 1).tolist()
+        values = np.round(values, 2).tolist()
+
+        dipdir_str = []
+        dip_str = []
+        values_str = []
+
+        for x in dipdir:
+            dipdir_str.append(str(x).rjust(5, "0"))
+
+        for y in dip:
+            dip_str.append(str(y).rjust(4, "0"))
+
+        for v in values:
+            values_str.append(str(v))
+
+        lbl = "{}   \n".format(lyr_obj.get_label())
+
+        for key, value in enumerate(dipdir):
+            lbl += "  {}/{}, {}\n".format(dipdir_str[key], dip_str[key],
+                                          values_str[key])
+
+        if highlight is False:
+            lines = self.draw_points(points,
+                    marker=lyr_obj.get_marker_style(),
+                    markersize=lyr_obj.get_marker_size(),
+                    color=lyr_obj.get_marker_fill(),
+                    label=lbl,
+                    markeredgewidth=lyr_obj.get_marker_edge_width(),
+                    markeredgecolor=lyr_obj.get_marker_edge_color(),
+                    alpha=lyr_obj.get_marker_alpha(), clip_on=False)
+            self.add_styled_artists("linears", lines)
+        else:
+            self.draw_points(points, marker=lyr_obj.get_marker_style(),
+                    markersize=lyr_obj.get_marker_size() + 2,
+                    color=lyr_obj.get_marker_fill(),
+                    markeredgewidth=lyr_obj.get_marker_edge_width(),
+                    markeredgecolor=lyr_obj.get_marker_edge_color(),
+                    alpha=lyr_obj.get_marker_alpha(), clip_on=False)
+
+    def draw_smallcircles(self, lyr_obj, dipdir, dip, angle, highlight=False):
+        """
+        Function draws small circles in the stereonet. It calls the formatting
+        from the layer object.
+
+        All small circles of the layer are drawn as one LineCollection, which
+        is also the entry of the layer in the legend.
+        """
+        num_data = len(dipdir)
+        lbl = "{} ({})".format(lyr_obj.get_label(), num_data)
+
+        if highlight is False:
+            circles = self.draw_small_circles(dip, dipdir, angle,
+                    colors=lyr_obj.get_line_color(),
+                    label=lbl,
+                    linewidths=lyr_obj.get_line_width(),
+                    linestyles=lyr_obj.get_line_style(),
+                    capstyle=lyr_obj.get_capstyle(),
+                    alpha=lyr_obj.get_line_alpha())
+            self.add_styled_artists("circles", circles)
+        else:
+            self.draw_small_circles(dip, dipdir, angle,
+                    colors=lyr_obj.get_line_color(),
+                    linewidths=lyr_obj.get_line_width() + 2,
+                    linestyles=lyr_obj.get_line_style(),
+                    capstyle=lyr_obj.get_capstyle(),
+                    alpha=lyr_obj.get_line_alpha())
+
+    def draw_mean_vector(self, lyr_obj, dipdir, dip, highlight=False,
+                         subset=None):
+        """
+        Draws the mean vector of the current linear layer.
+
+        The mean vector of the whole layer is taken from its orientation
+        tensor. The dipdir and dip arrays are only used for a subset of rows.
+        """
+        if len(dipdir) == 0:
+            return
+
+        if subset is None:
+            vector, r_value = lyr_obj.get_orientation_tensor().mean_vector()
+        else:
+            vector, r_value = mplstereonet.find_mean_vector(dip, dipdir)
+        self.ax_stereo.line(vector[0], vector[1], marker="d",
+            markersize=8,
+            color="#ff0000",
+            markeredgewidth=1,
+            markeredgecolor="#000000",
+            clip_on=False)
+
+    def draw_fisher_smallcircle(self, lyr_obj, dipdir, dip, highlight=False):
+        """
+        Draws the confidence small circle of the current linear layer.
+        """
+        if len(dipdir) == 0:
+            return
+
+        confidence = lyr_obj.get_fisher_conf()
+        vector, stats = mplstereonet.find_fisher_stats(dip, dipdir, conf=confidence)
+        circle = self.draw_small_circles(vector[0], vector[1], stats[1],
+                    colors=lyr_obj.get_line_color(),
+                    linewidths=lyr_obj.get_line_width(),
+                    label=lyr_obj.get_label(),
+                    linestyles=lyr_obj.get_line_style())
+        self.add_styled_artists("fisher", circle)
+
+    def draw_poles(self, lyr_obj, points, highlight=False):
+        """
+        Function draws a plane pole in the stereonet. It calls the formatting
+        from the layer object.
+
+        Expects the projected points of the poles (see get_projected_points).
+        """
+        num_data = len(points)
+        lbl = "Poles of {} ({})".format(lyr_obj.get_label(), num_data)
+
+        if highlight is False:
+            poles = self.draw_points(points,
+                    marker=lyr_obj.get_pole_style(),
+                    markersize=lyr_obj.get_pole_size(),
+                    color=lyr_obj.get_pole_fill(),
+                    label=lbl,
+                    markeredgewidth=lyr_obj.get_pole_edge_width(),
+                    markeredgecolor=lyr_obj.get_pole_edge_color(),
+                    alpha=lyr_obj.get_pole_alpha(), clip_on=False)
+            self.add_styled_artists("poles", poles)
+        else:
+            self.draw_points(points, marker=lyr_obj.get_pole_style(),
+                    markersize=lyr_obj.get_pole_size() + 2,
+                    color=lyr_obj.get_pole_fill(),
+                    markeredgewidth=lyr_obj.get_pole_edge_width(),
+                    markeredgecolor=lyr_obj.get_pole_edge_color(),
+                    alpha=lyr_obj.get_pole_alpha(), clip_on=False)
+
+    def draw_contours(self, lyr_obj, dipdir, dips, measure_type,
+                      highlight=False):
+        """
+        MplStereonet accepts measurements as "poles" for planes and
+        "lines" for linear measurements.
+
+        The density grid is taken from the density cache, so fills, lines
+        and labels use one grid, and the grid is only calculated again if
+        the measurements or contour settings have changed. Grids that are
+        not in the cache are calculated by get_density_grid. If it returns
+        None the contours are not drawn now.
+        """
+        if len(dipdir) == 0:
+            return None
+
+        if lyr_obj.get_manual_range() == True:
+            lower = lyr_obj.get_lower_limit()
+            upper = lyr_obj.get_upper_limit()
+            steps = lyr_obj.get_steps()
+            cont_interval = np.linspace(lower, upper, num=steps)
+        else:
+            cont_interval = None
+
+        draw_fills = lyr_obj.get_draw_contour_fills()
+        draw_lines = lyr_obj.get_draw_contour_lines()
+        if draw_fills == True or draw_lines == True:
+            grid_args = (dipdir, dips, measure_type,
+                         lyr_obj.get_contour_method(),
+                         lyr_obj.get_contour_sigma(),
+                         lyr_obj.get_contour_resolution())
+            key = self.density_cache.make_key(*grid_args)
+            grid = self.density_cache.get_cached_grid(key)
+            if grid is None:
+                grid = self.get_density_grid(lyr_obj, highlight, key,
+                                             grid_args)
+                if grid is None:
+                    return None
+            lon, lat, totals = grid
+
+        #Implement hatches = (['-', '+', 'x', '\\', '*', 'o', 'O', '.'])
+        if draw_fills == True:
+            cbar = self.ax_stereo.contourf(lon, lat, totals,
+                              cmap=lyr_obj.get_colormap(),
+                              levels=cont_interval)
+        else:
+            cbar = None
+
+        clines = None
+        if draw_lines == True:
+            if lyr_obj.get_use_line_color() == True:
+                clines = self.ax_stereo.contour(lon, lat, totals,
+                                colors = lyr_obj.get_contour_line_color(),
+                                linewidths = lyr_obj.get_contour_line_width(),
+                                linestyles = lyr_obj.get_contour_line_style(),
+                                levels=cont_interval)
+            else:
+                clines = self.ax_stereo.contour(lon, lat, totals,
+                                cmap = lyr_obj.get_colormap(),
+                                linewidths = lyr_obj.get_contour_line_width(),
+                                linestyles = lyr_obj.get_contour_line_style(),
+                                levels=cont_interval)
+
+        if lyr_obj.get_draw_contour_labels() == True:
+            if clines is not None:
+                self.ax_stereo.clabel(clines,
+                                fontsize = lyr_obj.get_contour_label_size())
+
+        self.cbar.append(cbar)
+
+    def get_density_grid(self, lyr_obj, highlight, key, grid_args):
+        """
+        Calculates a density grid that is not in the cache.
+
+        The grid is calculated right away and added to the cache. The
+        MainWindow overrides this method to calculate the grid in a worker
+        thread instead.
+        """
+        grid = compute_grid(*grid_args)
+        self.density_cache.add_grid(key, grid)
+        return grid
+
+    def draw_lp_planes(self, lyr_obj, lp_plane_dir, lp_plane_dip,
+                       highlight=False):
+        """
+        Draws the pole-linear-planes of a faultplane layer.
+
+        Receives arrays of the strikes and dips of the planes that connect
+        the pole of each faultplane with its linear. The planes are drawn as
+        dotted great circles in one LineCollection.
+        """
+        if highlight is False:
+            linewidth = 1
+        else:
+            linewidth = 3
+        self.draw_great_circles(lp_plane_dir, lp_plane_dip,
+                                linestyles="dotted", colors="#000000",
+                                linewidths=linewidth)
+
+    def draw_angelier(self, lyr_obj, line_dir, line_dip, sense):
+        """
+        Draws the Angelier arrows for a fault plane layer.
+
+        Receives the layer object and arrays of the linear dip-direction, dip
+        and sense. The arrow positions and unit directions are calculated for
+        all linears at once. Arrows point towards the center for "up" and
+        away from it for "dn". Each of the two senses is drawn with one
+        quiver. Other senses have no arrow.
+        """
+        lon, lat = mplstereonet.line(line_dip, line_dir)
+        mag = np.hypot(lon, lat)
+        u, v = lon / mag, lat / mag
+
+        for sns, direction in (("up", -1), ("dn", 1)):
+            rows = sense == sns
+            if np.any(rows) == False:
+                continue
+            arrows = self.ax_stereo.quiver(lon[rows], lat[rows],
+                                  direction * u[rows], direction * v[rows],
+                                  width=1.5, headwidth=4, units="dots",
+                                  pivot="middle",
+                                  color=lyr_obj.get_arrow_color())
+            self.add_styled_artists("arrows", arrows)
+
+        return None
+
+    def draw_hoeppener(self, lyr_obj, plane_dir, plane_dip, line_dir,
+                        line_dip, lp_plane_dir, lp_plane_dip, sense):
+        """
+        Receives data from a faultplane and draws Hoeppener arrows.
+
+        Triggered by the redraw_plot function.
+        Receives planes (direction and dip), linears (direction and dip), and
+        the planes that connect them to each other (direction and dip). The
+        start and end of all arrows are calculated at once by
+        hoeppener_arrows: Each arrow lies on the pole-linear-plane, is
+        centered on the pole and points in the direction of the shear sense.
+        If the datapoint has no shear sense no arrow is drawn. Unknown shear
+        sense ("uk") is just a line. The shafts of all arrows are drawn as
+        one LineCollection in projected coordinates. The open heads are a
+        second LineCollection whose vertices are given in points and placed
+        at the tips, so they have the same size for every arrow (the size of
+        the "->" arrowstyle of Matplotlib: 4 points long, 2 points to each
+        side).
+        """
+        if len(line_dir) == 0:
+            return
+
+        lon_start, lat_start, lon_end, lat_end = hoeppener_arrows(
+                plane_dir, plane_dip, lp_plane_dir, lp_plane_dip, sense)
+        rows = (sense != "") & np.isfinite(lon_start)
+        if np.any(rows) == False:
+            return
+
+        projection = self.ax_stereo.transProjection
+        start = projection.transform(np.column_stack([lon_start[rows],
+                                                      lat_start[rows]]))
+        end = projection.transform(np.column_stack([lon_end[rows],
+                                                    lat_end[rows]]))
+        trans = self.ax_stereo.transAffine + self.ax_stereo.transAxes
+        shafts = LineCollection(np.stack([start, end], axis=1),
+                                colors="#000000", linewidths=1,
+                                transform=trans)
+        self.ax_stereo.add_collection(shafts, autolim=False)
+
+        head = sense[rows] != "uk"
+        if np.any(head) == False:
+            return
+        tip = end[head]
+        shaft = tip - start[head]
+        length = np.hypot(shaft[:, 0], shaft[:, 1])[:, np.newaxis]
+        direction = shaft / np.where(length > 0, length, 1)
+        normal = np.column_stack([-direction[:, 1], direction[:, 0]])
+        heads = np.stack([-4 * direction + 2 * normal, np.zeros_like(tip),
+                          -4 * direction - 2 * normal], axis=1)
+        points = Affine2D().scale(1 / 72) + self.fig.dpi_scale_trans
+        arrow_heads = LineCollection(heads, colors="#000000", linewidths=1,
+                                     offsets=tip, offset_transform=trans,
+                                     transform=points)
+        self.ax_stereo.add_collection(arrow_heads, autolim=False)
+
+    def add_styled_artists(self, style, artists):
+        """
+        Remembers artists whose style follows the properties of the layer.
+
+        Expects the name of the style (see restyle_artists) and an artist,
+        a list or container of artists, or None if nothing was drawn.
+        """
+        if artists is None:
+            return
+        if isinstance(artists, (list, tuple)) == False:
+            artists = [artists]
+        self.styled_artists.append((style, list(artists)))
+
+    def restyle_artists(self, lyr_obj, styled_artists):
+        """
+        Applies the current style properties of a layer to its artists.
+
+        Expects the layer object and a list of (style, artists) tuples (see
+        add_styled_artists). The artists are changed in place with the same
+        properties the drawing methods use, so the layer does not have to be
+        parsed and drawn again when only a color or line style changed.
+        """
+        for style, artists in styled_artists:
+            for artist in artists:
+                if style == "circles":
+                    artist.set_color(lyr_obj.get_line_color())
+                    artist.set_linewidth(lyr_obj.get_line_width())
+                    artist.set_linestyle(lyr_obj.get_line_style())
+                    artist.set_capstyle(lyr_obj.get_capstyle())
+                    artist.set_alpha(lyr_obj.get_line_alpha())
+                elif style == "fisher":
+                    artist.set_color(lyr_obj.get_line_color())
+                    artist.set_linewidth(lyr_obj.get_line_width())
+                    artist.set_linestyle(lyr_obj.get_line_style())
+                elif style == "linears":
+                    artist.set_marker(lyr_obj.get_marker_style())
+                    artist.set_markersize(lyr_obj.get_marker_size())
+                    artist.set_color(lyr_obj.get_marker_fill())
+                    artist.set_markeredgewidth(
+                                        lyr_obj.get_marker_edge_width())
+                    artist.set_markeredgecolor(
+                                        lyr_obj.get_marker_edge_color())
+                    artist.set_alpha(lyr_obj.get_marker_alpha())
+                elif style == "poles":
+                    artist.set_marker(lyr_obj.get_pole_style())
+                    artist.set_markersize(lyr_obj.get_pole_size())
+                    artist.set_color(lyr_obj.get_pole_fill())
+                    artist.set_markeredgewidth(lyr_obj.get_pole_edge_width())
+                    artist.set_markeredgecolor(lyr_obj.get_pole_edge_color())
+                    artist.set_alpha(lyr_obj.get_pole_alpha())
+                elif style == "arrows":
+                    artist.set_color(lyr_obj.get_arrow_color())
+                elif style == "plane_rose":
+                    artist.set_facecolor(lyr_obj.get_line_color())
+                    artist.set_edgecolor(lyr_obj.get_pole_edge_color())
+                elif style == "line_rose":
+                    artist.set_facecolor(lyr_obj.get_marker_fill())
+                    artist.set_edgecolor(lyr_obj.get_marker_edge_color())
+
+    def plot_layer(self, lyr_obj, subset=None, highlight=False):
+        """
+        Plots a certain layer or subset of layer.
+
+        The method expect a layer-object which should be plotted. If only a
+        subset should be plotted, an array of row numbers or a boolean mask
+        of the rows has to be passed additionally. If the layer or subset should be
+        highlighted the method additionally expect a boolean keyword argument:
+        highlight = True. Each layer and subset is parsed and then passed to
+        the respective drawing functions.
+        """
+        if lyr_obj == None:
+            lyr_type = "group"
+        else:
+            lyr_type = lyr_obj.get_layer_type()
+            layer_data = lyr_obj.get_data()
+
+        if lyr_type == "plane":
+            strike, dipdir, dip = self.parse_planes(layer_data, subset)
+
+            if lyr_obj.get_draw_gcircles() == True:
+                self.draw_plane(lyr_obj, strike, dip, highlight=highlight)
+
+            if lyr_obj.get_draw_poles() == True:
+                self.draw_poles(lyr_obj,
+                        self.get_projected_points(lyr_obj, "poles", subset),
+                        highlight=highlight)
+
+            self.draw_contours(lyr_obj, strike, dip, "poles",
+                               highlight=highlight)
+
+            if self.ax_rose is not None:
+                num_bins = int(round(360 / lyr_obj.get_rose_spacing()))
+                bin_width = 2 * np.pi / num_bins
+                dipdir = np.radians(dipdir)
+                values, bin_edges = np.histogram(dipdir, num_bins,
+                                                 range = (0, 2 * np.pi))
+                bars = self.ax_rose.bar(bin_edges[:-1], values, align="edge",
+                                     width = bin_width, alpha=0.5,
+                                     color = lyr_obj.get_line_color(),
+                                     edgecolor = lyr_obj.get_pole_edge_color(),
+                                     bottom = lyr_obj.get_rose_bottom())
+                self.add_styled_artists("plane_rose", bars)
+
+            if self.ax_drose is not None:
+                num_bins = int(round(90 / lyr_obj.get_dip_rose_spacing()))
+                bin_width = (np.pi / 2) / num_bins
+                dip = np.radians(dip)
+                values, bin_edges = np.histogram(dip, num_bins,
+                                                 range = (0, np.pi / 2))
+                bars = self.ax_drose.bar(bin_edges[:-1], values, align="edge",
+                                     width = bin_width, alpha=0.5,
+                                     color = lyr_obj.get_line_color(),
+                                     edgecolor = lyr_obj.get_pole_edge_color(),
+                                     bottom = lyr_obj.get_rose_bottom())
+                self.add_styled_artists("plane_rose", bars)
+
+        elif lyr_type == "line":
+            dipdir, dip, sense = self.parse_lines(layer_data, subset)
+
+            if lyr_obj.get_draw_linears() == True:
+                self.draw_line(lyr_obj,
+                        self.get_projected_points(lyr_obj, "linears", subset),
+                        highlight=highlight)
+
+            self.draw_contours(lyr_obj, dip, dipdir, "lines",
+                               highlight=highlight)
+
+            if self.ax_rose is not None:
+                num_bins = int(round(360 / lyr_obj.get_rose_spacing()))
+                bin_width = 2 * np.pi / num_bins
+                dipdir = np.radians(dipdir)
+                values, bin_edges = np.histogram(dipdir, num_bins,
+                                                 range = (0, 2 * np.pi))
+
+                bars = self.ax_rose.bar(bin_edges[:-1], values, align="edge",
+                                     width = bin_width, alpha=0.5,
+                                     color = lyr_obj.get_marker_fill(),
+                                     edgecolor = lyr_obj.get_marker_edge_color(),
+                                     bottom = lyr_obj.get_rose_bottom())
+                self.add_styled_artists("line_rose", bars)
+
+            if self.ax_drose is not None:
+                num_bins = int(round(90 / lyr_obj.get_dip_rose_spacing()))
+                bin_width = (np.pi / 2) / num_bins
+                dip = np.radians(dip)
+                values, bin_edges = np.histogram(dip, num_bins,
+                                                 range = (0, np.pi / 2))
+                bars = self.ax_drose.bar(bin_edges[:-1], values, align="edge",
+                                     width = bin_width, alpha=0.5,
+                                     color = lyr_obj.get_marker_fill(),
+                                     edgecolor = lyr_obj.get_marker_edge_color(),
+                                     bottom = lyr_obj.get_rose_bottom())
+                self.add_styled_artists("line_rose", bars)
+
+            if lyr_obj.get_draw_mean_vector() == True:
+                self.draw_mean_vector(lyr_obj, dipdir, dip, subset=subset)
+
+            if lyr_obj.get_draw_fisher_sc() == True:
+                self.draw_fisher_smallcircle(lyr_obj, dipdir, dip)
+
+        elif lyr_type == "faultplane":
+            strike, plane_dir, plane_dip, line_dir, line_dip, \
+                sense, line_sense_dir, line_sense_dip, \
+                lp_plane_dir, lp_plane_dip = (
+                self.parse_faultplanes(layer_data, subset))
+
+            if lyr_obj.get_draw_gcircles() == True:
+                self.draw_plane(lyr_obj, strike, plane_dip, highlight=highlight)
+            if lyr_obj.get_draw_poles() == True:
+                self.draw_poles(lyr_obj,
+                        self.get_projected_points(lyr_obj, "poles", subset),
+                        highlight=highlight)
+            if lyr_obj.get_draw_linears() == True:
+                self.draw_line(lyr_obj,
+                        self.get_projected_points(lyr_obj, "linears", subset),
+                        highlight=highlight)
+            if lyr_obj.get_draw_lp_plane() == True:
+                self.draw_lp_planes(lyr_obj, lp_plane_dir, lp_plane_dip,
+                                    highlight=highlight)
+            if lyr_obj.get_draw_hoeppener() == True:
+               self.draw_hoeppener(lyr_obj, plane_dir, plane_dip,
+                                   line_dir, line_dip, lp_plane_dir,
+                                   lp_plane_dip, sense)
+
+            if lyr_obj.get_draw_angelier() == True:
+               self.draw_angelier(lyr_obj, line_dir, line_dip, sense)
+
+
+        elif lyr_type == "smallcircle":
+            dipdir, dip, angle = self.parse_smallcircles(layer_data, subset)
+            self.draw_smallcircles(lyr_obj, dipdir, dip, angle,
+                                   highlight=highlight)
+
+        elif lyr_type == "eigenvector":
+            dipdir, dip, values = self.parse_lines(layer_data, subset)
+            if lyr_obj.get_draw_linears() == True:
+                self.draw_eigenvector(lyr_obj,
+                        self.get_projected_points(lyr_obj, "linears", subset),
+                        dipdir, dip, values, highlight=highlight)
+
+            self.draw_contours(lyr_obj, dip, dipdir, "lines",
+                               highlight=highlight)
+
+
+    def draw_stereonet_decorations(self):
+        """
+        Draws the grid, the center cross and the north label of the stereonet.
+
+        Which of them are drawn is taken from the PlotSettings. Called after
+        the stereonet axis was cleared.
+        """
+        if self.settings.get_draw_grid_state() == True:
+            self.ax_stereo.grid(linestyle = self.settings.get_grid_linestyle(),
+                                color = self.settings.get_grid_color(),
+                                linewidth = self.settings.get_grid_width())
+
+        if self.settings.get_show_cross() == True:
+            self.ax_stereo.annotate("", xy = (-0.03, 0),
+                                    xytext = (0.03, 0),
+                                    xycoords = "data",
+                                    arrowprops = dict(arrowstyle = "-",
+                                                      connectionstyle = "arc3"))
+            self.ax_stereo.annotate("", xy = (0, -0.03),
+                                    xytext = (0, 0.03),
+                                    xycoords = "data",
+                                    arrowprops = dict(arrowstyle = "-",
+                                                      connectionstyle = "arc3"))
+
+        if self.settings.get_show_north() == True:
+            self.ax_stereo.set_azimuth_ticks([0], labels=['N'])
+
+    def draw_colorbar(self):
+        """
+        Draws the colorbar of the first contour fill of the current redraw.
+
+        If no layer has drawn contour fills, the colorbar axis is cleared
+        and hidden.
+        """
+        for cbar in self.cbar:
+            if cbar is not None:
+                self.ax_cbar.axis("on")
+                self.fig.colorbar(cbar, cax=self.ax_cbar)
+                return
+
+        self.ax_cbar.cla()
+        self.ax_cbar.axis("off")
+
+    def draw_legend(self, layers):
+        """
+        Draws the legend of the stereonet.
+
+        Expects the drawn layer objects in the order of the layer view. The
+        legend follows the order of the layers and not the order in which the
+        artists were added to the axis. Labels that appear more than once are
+        only added once. Artists of hidden layers are skipped.
+        """
+        layer_position = {}
+        for position, lyr_obj in enumerate(layers):
+            for artist in lyr_obj.get_artists():
+                layer_position[id(artist)] = position
+        handles, labels = self.ax_stereo.get_legend_handles_labels()
+        order = sorted(range(len(handles)), key=lambda i:
+                       layer_position.get(id(handles[i]), len(layers)))
+        newLabels, newHandles = [], []
+        for i in order:
+            if handles[i].get_visible() == False:
+                continue
+            if labels[i] not in newLabels:
+                newLabels.append(labels[i])
+                newHandles.append(handles[i])
+
+        if len(newHandles) != 0:
+            self.ax_stereo.legend(newHandles, newLabels,
+                                  bbox_to_anchor=(1.5, 1.1), borderpad=1,
+                                  numpoints=1)
@@ -12,12 +12,27 @@ the layer properties dialog is opened. Changes in the layer properties dialog
 are stored in these classes.
 """
 
-from gi.repository import Gdk, GdkPixbuf
+try:
+    from gi.repository import Gdk, GdkPixbuf
+except ImportError:
+    #The headless renderer (see render-module) does not need Gtk.
+    Gdk = GdkPixbuf = None
 from collections import OrderedDict
 from .i18n import i18n
+from .orientation_tensor import OrientationTensor
 
 _ = i18n().language().gettext
 
+#Properties that only change the style of the drawn artists (or nothing, like
+#the last page of the properties dialog). Changing them restyles the artists
+#of a layer instead of drawing the layer again.
+STYLE_PROPERTIES = ("page", "line_color", "line_width", "line_style",
+                    "line_alpha", "capstyle", "pole_style", "pole_size",
+                    "pole_fill", "pole_edge_color", "pole_edge_width",
+                    "pole_alpha", "marker_style", "marker_size",
+                    "marker_fill", "marker_edge_color", "marker_edge_width",
+                    "marker_alpha", "arrow_color")
+
 
 class PlaneLayer(object):
 
@@ -99,6 +114,18 @@ class PlaneLayer(object):
                       }.items()))
         self.props["label"] = _("Plane Layer")
 
+        #Matplotlib artists that were created when the layer was last drawn
+        self.artists = []
+        self.artist_zorders = []
+        self.artist_key = None
+        self.artist_style_key = None
+        self.mappables = []
+        self.styled_artists = []
+
+        #Projected coordinates of the poles and linears (see get_cached_points)
+        self.cached_points = {}
+        self.cached_points_key = None
+
     def get_page(self):
         """
         Returns the current page
@@ -213,20 +240,48 @@ class PlaneLayer(object):
         Returns the data TreeStore that holds the data for this layer.
 
         This method returns the TreeStore that stores the data of this layer.
-        The TreeStore contains all the individual features as rows.
+        The TreeStore contains all the individual features as rows. The rows
+        of a lazily loaded layer are added first (see load_rows).
         """
+        self.load_rows()
         return self.data_treestore
 
+    def get_data(self):
+        """
+        Returns the LayerData-object that holds the data of this layer.
+
+        The LayerData stores each column as a NumPy array and is the source
+        of truth for plotting and calculations. It is kept in sync with the
+        TreeStore that is shown in the data-view.
+        """
+        return self.data_treestore.get_data()
+
     def get_data_treeview(self):
         """
         Returns the data TreeView that is associated with this layer.
 
         Each layer stores a TreeView that is linked to the layers' TreeStore.
         This method is called when the selection in the main windows' layer
-        view is changed.
+        view is changed. The rows of a lazily loaded layer are added first
+        (see load_rows).
         """
+        self.load_rows()
         return self.data_treeview
 
+    def load_rows(self):
+        """
+        Adds the rows of a lazily loaded layer to its TreeStore.
+
+        The data of a layer that was opened from a project is only added to
+        the TreeStore when it is shown or changed. The TreeView is detached
+        while the rows are added.
+        """
+        if self.data_treestore.has_pending_rows() == False:
+            return
+        self.data_treeview.set_model(None)
+        self.data_treestore.load_rows()
+        self.data_treeview.set_model(self.data_treestore)
+
     def get_layer_type(self):
         """
         Returns the layer type of this object.
@@ -947,16 +1002,9 @@ class PlaneLayer(object):
         """
         Returns the data in stored for this layer as a list.
 
-        Iterates over the treestore associated with this layer and copies all
-        data into a list of rows. Returns the list.
+        Copies all data of the layer into a list of rows. Returns the list.
         """
-        store_data = []
-        def iterate_over_data(model, path, itr):
-            row = model[path]
-            store_data.append([row[0], row[1], row[2]])
-
-        self.data_treestore.foreach(iterate_over_data)
-        return store_data
+        return self.get_data().tolist()
 
     def get_properties(self):
         """
@@ -980,6 +1028,176 @@ class PlaneLayer(object):
         for key in props:
             self.props[key] = props[key]
 
+    def get_artist_key(self):
+        """
+        Returns the key of the artists that are currently drawn.
+
+        The key is set by the MainWindow when the layer is drawn. It is
+        compared with the key for the current data and properties to decide
+        whether the layer has to be drawn again. Returns None if the layer
+        has not been drawn.
+        """
+        return self.artist_key
+
+    def get_plot_key(self):
+        """
+        Returns a key that changes whenever the drawing of the layer changes.
+
+        The key consists of the version of the layer data and the values of
+        all properties that are not style properties (see STYLE_PROPERTIES).
+        Any edit of a row or change of such a property results in a new key.
+        """
+        return (self.get_data().get_version(),
+                tuple(value for key, value in self.props.items()
+                      if key not in STYLE_PROPERTIES))
+
+    def get_style_key(self):
+        """
+        Returns a key that changes whenever a style property changes.
+        """
+        return tuple(self.props.get(key) for key in STYLE_PROPERTIES)
+
+    def get_artist_style_key(self):
+        """
+        Returns the style key of the artists that are currently drawn.
+        """
+        return self.artist_style_key
+
+    def set_artist_style_key(self, style_key):
+        """
+        Sets the style key after the artists were restyled.
+        """
+        self.artist_style_key = style_key
+
+    def set_artists(self, artists, key, mappables, styled_artists):
+        """
+        Stores the artists that were created when the layer was drawn.
+
+        Expects a list of matplotlib artists, the key they were drawn with,
+        a list of mappables for the colorbar and a list of (style, artists)
+        tuples of the artists that follow the style properties. The current
+        style key is stored with them. The initial z-orders are stored, so
+        the drawing order can be adjusted later (see set_artist_order).
+        """
+        self.artists = artists
+        self.artist_zorders = [artist.get_zorder() for artist in artists]
+        self.artist_key = key
+        self.artist_style_key = self.get_style_key()
+        self.mappables = mappables
+        self.styled_artists = styled_artists
+
+    def get_artists(self):
+        """
+        Returns the list of artists of the layer.
+        """
+        return self.artists
+
+    def get_mappables(self):
+        """
+        Returns the mappables (contour fills) that can be used for a colorbar.
+        """
+        return self.mappables
+
+    def get_styled_artists(self):
+        """
+        Returns the (style, artists) tuples of the layer (see set_artists).
+        """
+        return self.styled_artists
+
+    def set_artists_visible(self, visible):
+        """
+        Shows or hides the artists of the layer without removing them.
+
+        Hidden layers keep their artists, so they can be shown again without
+        being drawn again.
+        """
+        for artist in self.artists:
+            artist.set_visible(visible)
+
+    def set_artist_order(self, position):
+        """
+        Sets the drawing order of the artists according to the layer position.
+
+        Matplotlib draws artists with the same z-order in the order they
+        were added. Layers that are drawn again would therefore move to the
+        top. A small offset for the position of the layer in the layer-view
+        is added to the initial z-order of each artist, which keeps the
+        layers in order without changing the order of the artist types.
+        """
+        for artist, zorder in zip(self.artists, self.artist_zorders):
+            artist.set_zorder(zorder + position * 1e-4)
+
+    def remove_artists(self):
+        """
+        Removes the artists of the layer from the figure.
+
+        Artists that were already removed (e.g. the labels of a contour
+        set, which are removed together with the contour set) are skipped.
+        """
+        for artist in self.artists:
+            if artist.axes is not None:
+                artist.remove()
+        self.clear_artists()
+
+    def clear_artists(self):
+        """
+        Forgets the artists of the layer without removing them.
+
+        Called when the axes were cleared or replaced, so the layer is drawn
+        again during the next redraw.
+        """
+        self.artists = []
+        self.artist_zorders = []
+        self.artist_key = None
+        self.artist_style_key = None
+        self.mappables = []
+        self.styled_artists = []
+
+    def get_cached_points(self, kind, projection):
+        """
+        Returns the cached projected coordinates of the poles or linears.
+
+        Expects the kind of points ("poles" or "linears") and the name of the
+        projection of the stereonet. Returns an (N, 2) array with the x and y
+        coordinates of all rows, or None if the points were not projected
+        for the current version of the data and this projection.
+        """
+        if self.cached_points_key != (self.get_data().get_version(),
+                                      projection):
+            return None
+        return self.cached_points.get(kind)
+
+    def set_cached_points(self, kind, projection, points):
+        """
+        Caches the projected coordinates of the poles or linears.
+
+        The cache is kept until the data of the layer changes or the points
+        are projected with another projection (see get_cached_points).
+        """
+        key = (self.get_data().get_version(), projection)
+        if self.cached_points_key != key:
+            self.cached_points = {}
+            self.cached_points_key = key
+        self.cached_points[kind] = points
+
+    def get_orientation_tensor(self):
+        """
+        Returns the OrientationTensor of the layer.
+
+        The tensor is created when it is first needed and then kept up to
+        date by the LayerData of the layer. Planes and faultplanes are
+        summed up as poles, all other layers as lines.
+        """
+        layer_data = self.get_data()
+        tensor = layer_data.get_orientation_tensor()
+        if tensor is None:
+            if self.get_layer_type() in ("plane", "faultplane"):
+                tensor = OrientationTensor("poles")
+            else:
+                tensor = OrientationTensor("lines")
+            layer_data.set_orientation_tensor(tensor)
+        return tensor
+
     def get_draw_mean_vector(self):
         """
         Returns if the mean vector should be drawn.
@@ -1088,22 +1306,6 @@ class FaultPlaneLayer(PlaneLayer):
         self.props["line_color"] = "#000000"
         self.props["marker_fill"] = "#ffffff"
 
-    def return_data(self):
-        """
-        Returns the data stored in a fautplane layer
-
-        Overrides the defualt 'return_data' method. Iterates over the
-        treestore associated with this layer and copies all
-        data into a list of rows. Returns the list.
-        """
-        store_data = []
-        def iterate_over_data(model, path, itr):
-            row = model[path]
-            store_data.append([row[0], row[1], row[2], row[3], row[4]])
-
-        self.data_treestore.foreach(iterate_over_data)
-        return store_data
-
 
 class LineLayer(PlaneLayer):
 
@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+
+"""
+This module contains the LineIndex-class that gives random access to lines.
+
+Text files that are imported can have millions of lines. The LineIndex stores
+the byte offset of every n-th line, so a window of lines can be read by
+seeking close to the first line instead of reading the file from the start.
+The index is built lazily, only as far into the file as lines are requested.
+The read_columns-function reads selected columns of all lines into arrays.
+"""
+
+import locale
+import re
+import numpy as np
+
+
+class LineIndex(object):
+
+    """
+    Stores the byte offsets of every n-th line of a text file.
+
+    The offsets are found the first time a line beyond the indexed part of
+    the file is requested. The file is opened for each request, so the
+    index does not keep a file handle open.
+    """
+
+    def __init__(self, file_name, stride=1024):
+        """
+        Initializes the index with the offset of the first line.
+
+        The stride is the number of lines between two stored offsets. At most
+        stride - 1 lines have to be skipped to reach any line.
+        """
+        self.file_name = file_name
+        self.stride = stride
+        self.encoding = locale.getpreferredencoding(False)
+        self.offsets = [0]
+        self.n_lines = None
+
+    def is_complete(self):
+        """
+        Returns True if the index has reached the end of the file.
+        """
+        return self.n_lines is not None
+
+    def get_n_lines(self):
+        """
+        Returns the number of lines of the file.
+
+        This indexes the whole file if it was not indexed yet.
+        """
+        with open(self.file_name, "rb") as text_file:
+            while self.n_lines is None:
+                self.extend_index(text_file)
+        return self.n_lines
+
+    def extend_index(self, text_file):
+        """
+        Reads the lines after the last stored offset and stores the next one.
+
+        If the end of the file is reached instead, the number of lines is
+        stored.
+        """
+        text_file.seek(self.offsets[-1])
+        count = 0
+        while count < self.stride:
+            if text_file.readline() == b"":
+                break
+            count += 1
+        if count == self.stride:
+            self.offsets.append(text_file.tell())
+        else:
+            self.n_lines = (len(self.offsets) - 1) * self.stride + count
+
+    def seek_line(self, text_file, line):
+        """
+        Moves a binary file object to the start of a line.
+
+        Seeks to the closest stored offset before the line and skips the
+        remaining lines. Returns False if the file has fewer lines.
+        """
+        block = line // self.stride
+        while block >= len(self.offsets) and self.n_lines is None:
+            self.extend_index(text_file)
+        if block >= len(self.offsets):
+            return False
+
+        text_file.seek(self.offsets[block])
+        for k in range(line - block * self.stride):
+            if text_file.readline() == b"":
+                return False
+        return True
+
+    def decode(self, line):
+        """
+        Decodes a line and removes the trailing whitespace and line break.
+        """
+        return line.decode(self.encoding, errors="replace").rstrip()
+
+    def get_lines(self, start_line, count):
+        """
+        Returns a list of up to count lines, beginning with the start line.
+        """
+        lines = []
+        with open(self.file_name, "rb") as text_file:
+            if self.seek_line(text_file, start_line) == False:
+                return lines
+            while len(lines) < count:
+                line = text_file.readline()
+                if line == b"":
+                    break
+                lines.append(self.decode(line))
+        return lines
+
+    def iter_lines(self, start_line=0):
+        """
+        Iterates over all lines from the start line to the end of the file.
+        """
+        with open(self.file_name, "rb") as text_file:
+            if self.seek_line(text_file, start_line) == False:
+                return
+            for line in text_file:
+                yield self.decode(line)
+
+
+def split_line(line):
+    """
+    Splits a line of a delimited file at semicolons and commas.
+    """
+    return re.split(r"[;,]", line)
+
+
+def read_columns(line_index, start_line, columns, chunk_size=65536):
+    """
+    Reads columns of a delimited text file into arrays.
+
+    Expects the LineIndex of the file, the first line that is read and a
+    list of (column number, type) pairs. The type is float or str. The lines
+    are read and converted in chunks of chunk_size lines, so only the
+    selected columns of the whole file are kept in memory. Columns with the
+    number -1 are not read from the file, and are filled with 0 or an empty
+    string. Returns a list with one array per column. Raises a ValueError if
+    a float column contains a value that is not a number.
+    """
+    chunks = [[] for col in columns]
+
+    def convert_chunk(lines):
+        rows = [split_line(line) for line in lines]
+        for k, (number, col_type) in enumerate(columns):
+            if number == -1 and col_type is float:
+                chunks[k].append(np.zeros(len(rows)))
+            elif number == -1:
+                chunks[k].append(np.full(len(rows), "", dtype=object))
+            else:
+                values = [row[number] if number < len(row) else ""
+                          for row in rows]
+                if col_type is float:
+                    chunks[k].append(np.array(values).astype(np.float64))
+                else:
+                    chunks[k].append(np.array(values, dtype=object))
+
+    lines = []
+    for line in line_index.iter_lines(start_line):
+        lines.append(line)
+        if len(lines) == chunk_size:
+            convert_chunk(lines)
+            lines = []
+    convert_chunk(lines)
+    return [np.concatenate(chunk) for chunk in chunks]
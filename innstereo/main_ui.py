@@ -12,24 +12,26 @@ import gi
 
 gi.require_version('Gtk', '3.0')
 
-from gi.repository import Gtk, Gdk, GdkPixbuf
-from matplotlib.backends.backend_gtk3cairo import (FigureCanvasGTK3Cairo
-                                                   as FigureCanvas)
+from gi.repository import Gtk, Gdk, GdkPixbuf, GLib
+from matplotlib.backends.backend_gtk3agg import (FigureCanvasGTK3Agg
+                                                 as FigureCanvas)
 from matplotlib.backends.backend_gtk3 import (NavigationToolbar2GTK3 
                                               as NavigationToolbar)
 from matplotlib.cm import register_cmap
+from matplotlib.lines import Line2D
+from matplotlib.path import Path
+from matplotlib.transforms import IdentityTransform
 import mplstereonet
 import numpy as np
-import scipy.spatial as spatial
 import webbrowser
 import os, sys
 import csv
-from matplotlib.lines import Line2D
 import json
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 #Internal imports
-from .dataview_classes import (PlaneDataView, LineDataView,
+from .dataview_classes import (DataStore, PlaneDataView, LineDataView,
                               FaultPlaneDataView, SmallCircleDataView,
                               EigenVectorView)
 from .layer_view import LayerTreeView
@@ -40,17 +42,23 @@ from .dialog_windows import (AboutDialog, StereonetProperties,
                             FileChooserSave, FileChooserOpen)
 from .layer_properties import LayerProperties
 from .plot_control import PlotSettings
+from .layer_plotter import LayerPlotter
 from .polar_axes import NorthPolarAxes
 from .file_parser import FileParseDialog
 from .rotation_dialog import RotationDialog
 from .viridis import viridis
+from .stereo_math import (lp_planes, rotate_lines, normalize_columns,
+                          xy_to_dirdip)
+from .density_cache import DensityCache, compute_grid
+from .feature_index import FeatureIndex
+from .project_file import write_project, read_project
 from .settings import AppSettings
 
 from .i18n import i18n, translate_gui
 
 _ = i18n().language().gettext
 
-class MainWindow(object):
+class MainWindow(LayerPlotter):
 
     """
     The MainWindow-class handles the properties and signals of the GUI.
@@ -88,6 +96,7 @@ class MainWindow(object):
         self.clipboard = Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD)
 
         #Set up default options class
+        self.testing = testing
         self.settings = PlotSettings(testing)
         self.change_night_mode()
 
@@ -104,6 +113,12 @@ class MainWindow(object):
         self.select = self.layer_view.get_selection()
         self.select.connect("changed", self.layer_selection_changed)
         self.draw_features = False
+        self.select_mode = None
+        self.select_start = None
+        self.select_verts = []
+        self.select_line = None
+        self.motion_event = None
+        self.statusbar_scheduled = False
         self.layer_view.connect("drag-begin", self.drag_begin)
         self.layer_view.connect("drag-data-get", self.drag_data_get)
         self.layer_view.connect("drag-drop", self.drag_drop)
@@ -115,22 +130,41 @@ class MainWindow(object):
         self.fig = self.settings.get_fig()
         self.canvas = FigureCanvas(self.fig)
         self.sw_plot.add_with_viewport(self.canvas)
+        #The highlight is blitted if the canvas can copy its background.
+        self.use_blit = hasattr(self.canvas, "copy_from_bbox")
         self.ax_stereo, self.ax_cbar = self.settings.get_stereonet()
         self.cbar = None
-        self.inv = self.settings.get_inverse_transform()
+        self.styled_artists = []
         self.inv_rose = NorthPolarAxes.InvertedNorthPolarTransform()
-        self.trans = self.settings.get_transform()
         self.view_mode = "stereonet"
         self.view_changed = False
         self.ax_rose = None
         self.ax_drose = None
+        self.plot_axes_key = None
+        self.circle_segments = None
+        self.redraw_scheduled = False
+        self.full_redraw_scheduled = False
+        self.redraw_requests = 0
+        self.scheduled_redraws = 0
+        self.density_cache = DensityCache()
+        self.feature_index = FeatureIndex()
+        self.density_executor = ThreadPoolExecutor(max_workers=1)
+        self.density_jobs = {}
+        self.drawn_layers = []
+        self.highlight_artists = []
+        self.background = None
+        self.deselected = []
 
         #Set up event-handlers
         self.set_up_fisher_menu()
+        self.canvas.mpl_connect("draw_event", self.on_canvas_draw)
+        self.canvas.mpl_connect("resize_event", self.on_canvas_resize)
         self.canvas.mpl_connect('motion_notify_event', 
             self.mpl_motion_event)
         self.canvas.mpl_connect('button_press_event',
             self.mpl_canvas_clicked)
+        self.canvas.mpl_connect('button_release_event',
+            self.mpl_canvas_released)
         self.redraw_plot()
         if sys.platform == "win32":
             translate_gui(builder)
@@ -184,11 +218,11 @@ class MainWindow(object):
             total_dip = []
             for row in row_list:
                 lyr_obj = model[row][3]
-                store = lyr_obj.get_data_treestore()
-                dipdir, dip, sense = self.parse_lines(store)
-                for x, y in zip(dipdir, dip):
-                    total_dipdir.append(x)
-                    total_dip.append(y)
+                dipdir, dip, sense = self.parse_lines(lyr_obj.get_data())
+                total_dipdir.append(dipdir)
+                total_dip.append(dip)
+            total_dipdir = np.concatenate(total_dipdir)
+            total_dip = np.concatenate(total_dip)
 
             vector, stats = mplstereonet.find_fisher_stats(total_dip, total_dipdir, conf=confidence)
             new_store, new_lyr_obj = self.add_layer_dataset("smallcircle")
@@ -286,7 +320,9 @@ class MainWindow(object):
         Inserts layers into a TreeStore.
 
         This method can be used for inserting data at a certain location
-        or appending it and the end.
+        or appending it and the end. The rows of each layer are added at once
+        (see add_features). Appended layers are drawn with one redraw after
+        all layers were added.
         """
         def drop_layer(lyr_obj_new, lyr_dict, drop_iter, drop_position):
             if lyr_obj_new == None:
@@ -371,15 +407,12 @@ class MainWindow(object):
                 itr = insert_layer(lyr_obj_new, lyr_dict, ins_itr)
                 iter_dict[path_len] = itr
 
-            for f in lyr_data:
-                if lyr_dict["type"] == "faultplane":
-                    #Passing a list or tuple to the add feature function would be better.
-                    self.add_feature(lyr_dict["type"], lyr_store, f[0], f[1], f[2], f[3], f[4])
-                else:
-                    self.add_feature(lyr_dict["type"], lyr_store, f[0], f[1], f[2])
+            if lyr_obj_new is not None:
+                self.add_features(lyr_obj_new,
+                                  [list(col) for col in zip(*lyr_data)])
 
-            if insert_rows == False:
-                self.redraw_plot()
+        if insert_rows == False:
+            self.redraw_plot()
 
     def drag_begin(self, treeview, context):
         """
@@ -429,9 +462,9 @@ class MainWindow(object):
 
     def drag_end(self, treeview, context):
         """
-        Signal when drag of a layer is complete. Redraws the plot.
+        Signal when drag of a layer is complete. Schedules a redraw.
         """
-        self.redraw_plot()
+        self.schedule_redraw()
 
     def drag_data_delete(self, treeview, context):
         """
@@ -604,47 +637,19 @@ class MainWindow(object):
             self.statbar.push(1, ("Please select only layers of the same type!"))
             return
 
-        def evaluate_planes():
-            total_strike = []
-            total_dip = []
-            for row in row_list:
-                lyr_obj = model[row][3]
-                strike, dipdir, dip = self.parse_planes(
-                                                    lyr_obj.get_data_treestore())
-                for x in strike:
-                    total_strike.append(x)
-                for y in dip:
-                    total_dip.append(y)
-
-            dip, dipdir, values = mplstereonet.eigenvectors(total_strike, total_dip)
-            return dip, dipdir, values
-
-        def evaluate_lines():
-            total_dipdir = []
-            total_dip = []
-            for row in row_list:
-                lyr_obj = model[row][3]
-                dipdir, dip, sense = \
-                                self.parse_lines(lyr_obj.get_data_treestore())
-                for x in dipdir:
-                    total_dipdir.append(x)
-                for y in dip:
-                    total_dip.append(y)
-
-            dip, dipdir, values = mplstereonet.eigenvectors(total_dip,
-                                                            total_dipdir,
-                                                            measurement="lines")
-            return dip, dipdir, values
-
         #Check how data should be interpreted:
         if layer_list[0] == "plane":
-            dip, dipdir, values = evaluate_planes()
+            tensor = self.combine_orientation_tensors(model, row_list, "poles")
         elif layer_list[0] == "line":
-            dip, dipdir, values = evaluate_lines()
+            tensor = self.combine_orientation_tensors(model, row_list, "lines")
         else:
             self.statbar.push(1, ("Please select only plane or line layers!"))
             return
 
+        if tensor is None:
+            return
+        dip, dipdir, values = tensor.eigenvectors()
+
         #Normalize to 1
         values = values/np.sum(values)
 
@@ -753,9 +758,22 @@ class MainWindow(object):
         """
         Triggered from the GUI. Saves the project.
 
-        Iterates over all layers and stores the data in a dictionary. Passes
-        the dictionary to the FileChooserSave dialog, which handles writing
-        the file to the harddisk.
+        Runs the FileChooserSave dialog, which passes the chosen file to the
+        save_project method. In testing mode the project is returned as a
+        JSON string instead (see get_project_json).
+        """
+        if testing == True:
+            return self.get_project_json()
+        dlg = FileChooserSave(self.main_window, self.save_project)
+        dlg.run()
+
+    def get_project_json(self):
+        """
+        Returns the project as a JSON string.
+
+        Iterates over all layers and stores the data in a dictionary. The
+        dictionary is returned as a JSON string in the format of the older
+        project files, which can still be opened.
         """
         copy = {}
         copy["filetype"] = "InnStereo data file 1.0"
@@ -798,11 +816,35 @@ class MainWindow(object):
         self.layer_store.foreach(iterate_over_store)
         copy = OrderedDict(sorted(copy.items()))
         dump = json.dumps(copy)
-        if testing == False:
-            dlg = FileChooserSave(self.main_window, dump)
-            dlg.run()
         return dump
 
+    def save_project(self, project_file):
+        """
+        Saves the project to a project archive.
+
+        Iterates over all layers and collects the path, properties and the
+        columns of each layer. Folders have no columns. The layers are
+        written by write_project, which stores the columns as NumPy arrays.
+        Columns that are still memory-mapped from the project file are copied
+        into memory first, so the file can be replaced.
+        """
+        layers = []
+
+        def iterate_over_store(model, path, itr):
+            lyr_obj = model[itr][3]
+            if lyr_obj is None:
+                folder_props = {"type": "folder", "label": model[itr][2]}
+                folder_props = OrderedDict(sorted(folder_props.items()))
+                layers.append([str(path), folder_props, []])
+            else:
+                layer_data = lyr_obj.get_data()
+                layer_data.release_mapping(project_file)
+                layers.append([str(path), lyr_obj.get_properties(),
+                               layer_data.get_columns()])
+
+        self.layer_store.foreach(iterate_over_store)
+        write_project(project_file, self.settings.get_properties(), layers)
+
     def on_toolbutton_open_clicked(self, toolbutton):
         # pylint: disable=unused-argument
         """
@@ -819,17 +861,20 @@ class MainWindow(object):
         Opens a saved project. Adds all the saved layers to the current window
 
         The opened file is passed from the FileChooserOpen dialog. The file
-        is read and then the json is parsed. The function then checks if
-        the file is valid. Then each layer is added to the project. For each
-        layer the saved properties are set and all the data rows are loaded.
+        is read with read_project, which checks if the file is valid. Then
+        each layer is added to the project and the saved properties are set.
+        The columns of project archives are memory-mapped. They are passed to
+        the store of the layer, which only reads them when the layer is drawn
+        or shown. The rows of older JSON files are added at once (see
+        add_features).
         """
-        with open(project_file, "r") as prj_file:
-            read_data = prj_file.read()
-        parse = json.loads(read_data)
-        if parse["filetype"] != "InnStereo data file 1.0":
-            print("Not a valid InnStereo data file")
+        try:
+            settings, layers = read_project(project_file)
+        except ValueError as error:
+            print(error)
+            return
 
-        self.settings.set_properties(parse["settings"])
+        self.settings.set_properties(settings)
 
         def insert_layer(lyr_obj_new, lyr_dict, ins_iter):
             if lyr_obj_new == None:
@@ -849,28 +894,29 @@ class MainWindow(object):
             ins_itr = insert_layer(lyr_obj_new, lyr_dict, ins_itr)
             if lyr_obj_new is not None:
                 lyr_obj_new.set_properties(lyr_dict)
-            return ins_itr, lyr_store
+            return ins_itr, lyr_obj_new, lyr_store
 
         iter_dict = {0: None}
-        for layer in parse["layers"]:
+        for layer in layers:
             split_path = layer[0].split(":")
             path_len = len(split_path)
             lyr_dict = layer[1]
-            features = layer[2]
+            columns = layer[2]
             #The last path length is assigned to the dictionary
             #If the next layer has a longer path it will use the
             #previous entry as parent. It is not overwritten, which
             #produces a depth-first iteration.
             ins_itr = iter_dict[path_len-1]
-            itr, lyr_store = create_and_insert(ins_itr, lyr_dict)
+            itr, lyr_obj_new, lyr_store = create_and_insert(ins_itr, lyr_dict)
             iter_dict[path_len] = itr
 
-            for f in features:
-                if lyr_dict["type"] == "faultplane":
-                #Passing a list or tuple to the add feature function would be better.
-                    self.add_feature(lyr_dict["type"], lyr_store, f[0], f[1], f[2], f[3], f[4])
-                else:
-                    self.add_feature(lyr_dict["type"], lyr_store, f[0], f[1], f[2])
+            if lyr_obj_new is None:
+                continue
+            #The columns of older JSON files are lists.
+            if len(columns) > 0 and not isinstance(columns[0], list):
+                lyr_store.set_pending_columns(columns)
+            else:
+                self.add_features(lyr_obj_new, columns)
 
         self.redraw_plot()
 
@@ -963,6 +1009,152 @@ class MainWindow(object):
             self.draw_features = False
         self.update_statusbar()
 
+    def on_toolbutton_lasso_select_toggled(self, widget):
+        """
+        Toggles the lasso selection on the stereonet.
+
+        When it is turned on, dragging on the stereonet draws a lasso and
+        the poles and linears of the selected layer inside the lasso are
+        selected in the data-view (see select_points).
+        """
+        self.set_select_mode("lasso", widget.get_active())
+
+    def on_toolbutton_box_select_toggled(self, widget):
+        """
+        Toggles the box selection on the stereonet.
+
+        When it is turned on, dragging on the stereonet draws a rectangle
+        and the poles and linears of the selected layer inside the rectangle
+        are selected in the data-view (see select_points).
+        """
+        self.set_select_mode("box", widget.get_active())
+
+    def set_select_mode(self, mode, active):
+        """
+        Turns the lasso ("lasso") or box ("box") selection on or off.
+
+        Only one of them can be active, so turning one on turns the
+        toolbutton of the other one off.
+        """
+        buttons = {"lasso": "toolbutton_lasso_select",
+                   "box": "toolbutton_box_select"}
+        if active == True:
+            self.select_mode = mode
+            for other_mode, button in buttons.items():
+                if other_mode != mode:
+                    self.builder.get_object(button).set_active(False)
+        elif self.select_mode == mode:
+            self.select_mode = None
+
+    def start_selection(self, event):
+        """
+        Starts a lasso or box selection at the position of a click.
+
+        The outline is a line in pixel coordinates. It is animated and
+        blitted onto the background while the mouse is dragged, if the
+        canvas supports blitting (see blit_highlight).
+        """
+        self.select_start = (event.x, event.y)
+        self.select_verts = [self.select_start]
+        self.select_line = Line2D([event.x], [event.y], color="#000000",
+                                  linestyle="--", linewidth=1,
+                                  transform=IdentityTransform(),
+                                  animated=self.use_blit,
+                                  visible=not self.use_blit)
+        self.ax_stereo.add_line(self.select_line)
+
+    def update_selection(self, event):
+        """
+        Extends the lasso or resizes the box to the position of the cursor.
+        """
+        if self.select_mode == "lasso":
+            self.select_verts.append((event.x, event.y))
+        else:
+            x0, y0 = self.select_start
+            self.select_verts = [(x0, y0), (event.x, y0), (event.x, event.y),
+                                 (x0, event.y)]
+        verts = np.array(self.select_verts + [self.select_verts[0]])
+        self.select_line.set_data(verts[:, 0], verts[:, 1])
+        self.blit_highlight()
+
+    def finish_selection(self):
+        """
+        Ends a lasso or box selection when the mouse button is released.
+
+        The outline is removed and the rows of the selected layer inside it
+        are selected (see select_points).
+        """
+        verts = self.select_verts
+        self.select_line.remove()
+        self.select_line = None
+        self.select_start = None
+        self.select_verts = []
+        self.blit_highlight()
+        if len(verts) < 3:
+            return
+
+        selection = self.layer_view.get_selection()
+        model, row_list = selection.get_selected_rows()
+        if len(row_list) != 1 or model[row_list[0]][3] is None:
+            self.statbar.push(1, ("Select the layer that you want to "
+                                  "select features from."))
+            return
+        self.select_points(model[row_list[0]][3], Path(verts))
+
+    def select_points(self, lyr_obj, path):
+        """
+        Selects the rows of a layer whose points lie inside a path.
+
+        Expects the layer object and a matplotlib Path in pixel
+        coordinates. The projected poles and linears of the layer that are
+        shown in the stereonet are tested in one call of contains_points
+        each. The resulting mask is passed to the data-view in one update
+        (see DataTreeView.select_mask).
+        """
+        trans = self.ax_stereo.transAffine + self.ax_stereo.transAxes
+        mask = np.zeros(len(lyr_obj.get_data()), dtype=bool)
+        for points in self.get_visible_points(lyr_obj):
+            mask |= path.contains_points(trans.transform(points))
+        lyr_obj.get_data_treeview().select_mask(mask)
+
+    def combine_orientation_tensors(self, model, row_list, measurement):
+        """
+        Adds up the orientation tensors of the selected layers.
+
+        Expects the model and selected rows of the layer view and the kind
+        of measurement the calculation needs ("poles" or "lines"). Each layer
+        keeps its own tensor up to date (see PlaneLayer.get_orientation_tensor),
+        so only the 3x3 sums of the layers are added. Folders and layers that
+        hold the other kind of measurement are skipped, which is shown in the
+        statusbar. Returns None and shows a message if no measurements are
+        left.
+        """
+        names = {"poles": "planes", "lines": "linears"}
+        tensors = []
+        skipped = 0
+        for row in row_list:
+            lyr_obj = model[row][3]
+            if lyr_obj is None:
+                continue
+            tensor = lyr_obj.get_orientation_tensor()
+            if tensor.measurement != measurement:
+                skipped += 1
+                continue
+            tensors.append(tensor)
+
+        if len(tensors) == 0:
+            total = None
+        else:
+            total = tensors[0].combine(tensors[1:])
+        if total is None or total.get_count() == 0:
+            self.statbar.push(1, ("The selected layers contain no {}."
+                                  .format(names[measurement])))
+            return None
+        if skipped > 0:
+            self.statbar.push(1, ("Skipped {} layer(s) that do not contain {}."
+                                  .format(skipped, names[measurement])))
+        return total
+
     def on_toolbutton_best_plane_clicked(self, widget):
         # pylint: disable=unused-argument
         """
@@ -984,19 +1176,10 @@ class MainWindow(object):
         if only_linears is False:
             return
 
-        total_dipdir = []
-        total_dip = []
-        for row in row_list:
-            lyr_obj = model[row][3]
-            dipdir, dip, sense = self.parse_lines(
-                                            lyr_obj.get_data_treestore())
-            for x in dipdir:
-                total_dipdir.append(x)
-            for y in dip:
-                total_dip.append(y)
-
-        fit_strike, fit_dip = mplstereonet.fit_girdle(total_dip, total_dipdir,
-                                measurement="lines")
+        tensor = self.combine_orientation_tensors(model, row_list, "lines")
+        if tensor is None:
+            return
+        fit_strike, fit_dip = tensor.fit_girdle()
 
         store, new_lyr_obj = self.add_layer_dataset("plane")
         self.add_planar_feature(store, fit_strike + 90, fit_dip)
@@ -1027,22 +1210,10 @@ class MainWindow(object):
         if only_planes is False:
             return
 
-        total_dipdir = []
-        total_dip = []
-
-        #Iterate over layers and rows, gather poles
-        for row in row_list:
-            lyr_obj = model[row][3]
-            strike, dipdir, dip = self.parse_planes(
-                                            lyr_obj.get_data_treestore())
-            for x in strike:
-                total_dipdir.append(270 + x)
-            for y in dip:
-                total_dip.append(90 - y)
-        
-        self.ax_stereo.line(total_dip, total_dipdir)
-        fit_strike, fit_dip = mplstereonet.fit_girdle(total_dip, total_dipdir,
-                                measurement="lines")
+        tensor = self.combine_orientation_tensors(model, row_list, "poles")
+        if tensor is None:
+            return
+        fit_strike, fit_dip = tensor.fit_girdle()
 
         store, new_lyr_obj = self.add_layer_dataset("line")
         self.add_linear_feature(store, fit_strike + 270, 90 - fit_dip)
@@ -1080,7 +1251,7 @@ class MainWindow(object):
         for row in row_list:
             lyr_obj = model[row][3]
             strike, dipdir, sense = self.parse_lines(
-                                            lyr_obj.get_data_treestore())
+                                            lyr_obj.get_data())
             for strike, dipdir in zip(strike, dipdir):
                 self.add_linear_feature(store, strike + 180, 90 - dipdir)
 
@@ -1111,17 +1282,10 @@ class MainWindow(object):
         if only_lines is False:
             return
 
-        total_dipdir = []
-        total_dip = []
-        for row in row_list:
-            lyr_obj = model[row][3]
-            store = lyr_obj.get_data_treestore()
-            dipdir, dip, sense = self.parse_lines(store)
-            for x, y in zip(dipdir, dip):
-                total_dipdir.append(x)
-                total_dip.append(y)
-
-        vector, r_value = mplstereonet.find_mean_vector(dip, dipdir)
+        tensor = self.combine_orientation_tensors(model, row_list, "lines")
+        if tensor is None:
+            return
+        vector, r_value = tensor.mean_vector()
         new_store, new_lyr_obj = self.add_layer_dataset("eigenvector")
         new_lyr_obj.set_label("Mean Vector")
         self.add_linear_feature(new_store, vector[1], vector[0], r_value)
@@ -1131,91 +1295,36 @@ class MainWindow(object):
         """
         Converts lat-lon data to dip-direction and dip.
 
-        Expects a longitude and a latitude value. The measurment is forward
-        transformed into stereonet-space. Then the azimut (dip-direction) and
-        diping angle are calculated. Returns two values: dip-direction and dip.
-        """
-        #The longitude and latitude have to be forward-transformed to get
-        #the corect azimuth angle
-        xy = np.array([[lon, lat]])
-        xy_trans = self.trans.transform(xy)
-        x = float(xy_trans[0,0:1])
-        y = float(xy_trans[0,1:2])
-        alpha = np.arctan2(x, y)
-        alpha_deg = np.degrees(alpha)
-        if alpha_deg < 0:
-            alpha_deg += 360
-
-        #Longitude and Latitude don't need to be converted for rotation.
-        #The correct dip is the array[1] value once the vector has been
-        #rotated in north-south position.
-        array = mplstereonet.stereonet_math._rotate(np.degrees(lon),
-                                                    np.degrees(lat),
-                                                    alpha_deg * (-1))
-        gamma = float(array[1])
-        gamma_deg = 90 - np.degrees(gamma)
-
-        #If the longitude is larger or small than pi/2 the measurment lies
-        #on the upper hemisphere and needs to be corrected.
-        if lon > (np.pi / 2) or lon < (-np.pi / 2):
-            alpha_deg = alpha_deg + 180
-
-        return alpha_deg, gamma_deg
+        Expects longitude and latitude values or arrays. The measurements
+        are converted into direction cosines and returned as dip-direction
+        and dip. Measurements on the upper hemisphere are flipped to the
+        lower hemisphere.
+        """
+        dip, dipdir = mplstereonet.geographic2plunge_bearing(lon, lat)
+        if np.ndim(lon) == 0:
+            return float(dipdir[0]), float(dip[0])
+        return dipdir, dip
 
     def rotate_data(self, raxis, raxis_angle, dipdir, dip):
         """
-        Rotates a measurment around a rotation axis a set number of degrees.
+        Rotates measurements around a rotation axis a set number of degrees.
 
-        Expects a rotation-axis, a rotation-angle, a dip-direction and a
-        dip angle. The measurement is converted to latlot and then passed
-        to the mplstereonet rotate function.
+        Expects a rotation-axis, a rotation-angle, and a dip-direction and
+        dip angle (single values or arrays). All measurements are rotated
+        with one rotation matrix (see stereo_math.rotate_lines). Returns
+        the rotated dip-direction and dip.
         """
-        lonlat = mplstereonet.line(dip, dipdir)
-
-        #Rotation around x-axis until rotation-axis azimuth is east-west
-        rot1 = (90 - raxis[0])
-        lon1 = np.degrees(lonlat[0])
-        lat1 = np.degrees(lonlat[1])
-        lon_rot1, lat_rot1 = mplstereonet.stereonet_math._rotate(lon1, lat1,
-                                                      theta=rot1, axis="x")
-
-        #Rotation around z-axis until rotation-axis dip is east-west
-        rot2 = -(90 - raxis[1])
-        lon2 = np.degrees(lon_rot1)
-        lat2 = np.degrees(lat_rot1)
-        lon_rot2, lat_rot2 = mplstereonet.stereonet_math._rotate(lon2, lat2,
-                                                           theta=rot2, axis="z")
-            
-        #Rotate around the x-axis for the specified rotation:
-        rot3 = raxis_angle
-        lon3 = np.degrees(lon_rot2)
-        lat3 = np.degrees(lat_rot2)
-        lon_rot3, lat_rot3 = mplstereonet.stereonet_math._rotate(lon3, lat3,
-                                                           theta=rot3, axis="x")
-
-        #Undo the z-axis rotation
-        rot4 = -rot2
-        lon4 = np.degrees(lon_rot3)
-        lat4 = np.degrees(lat_rot3)
-        lon_rot4, lat_rot4 = mplstereonet.stereonet_math._rotate(lon4, lat4,
-                                                           theta=rot4, axis="z")
-
-        #Undo the x-axis rotation
-        rot5 = -rot1
-        lon5 = np.degrees(lon_rot4)
-        lat5 = np.degrees(lat_rot4)
-        lon_rot5, lat_rot5 = mplstereonet.stereonet_math._rotate(lon5, lat5,
-                                                           theta=rot5, axis="x")
-        dipdir5, dip5 = self.convert_lonlat_to_dipdir(lon_rot5, lat_rot5)
-        return dipdir5, dip5
+        dipdir_rot, dip_rot = rotate_lines(raxis, raxis_angle, dipdir, dip)
+        if np.ndim(dipdir) == 0:
+            return float(dipdir_rot[0]), float(dip_rot[0])
+        return dipdir_rot, dip_rot
 
     def on_toolbutton_ptaxis_clicked(self, toolbutton):
         """
         Calculates the PT-Axis of a faultplane, and add adds them to the project
 
         Triggered from the toolbar. One faultplane layer has to be selected.
-        Iterates over the rows and calculates the p-, t, and b-axis for each
-        of them.
+        Calculates the p-, t, and b-axis for all rows at once.
         """
         selection = self.layer_view.get_selection()
         model, row_list = selection.get_selected_rows()
@@ -1233,48 +1342,6 @@ class MainWindow(object):
         if lyr_type != "faultplane":
             return
 
-        def iterate_over_data(model, path, itr, pbt_store):
-            """
-            Iterates over the faultplane and adds the pt-axis for each row.
-
-            For each row the pole-linear-layer is calculated. The pole of
-            that layer is the rotation axis and the b-axis. The linear is
-            then rotated for the p-axis and t-axis.
-            """
-            drow = model[path]
-            p_store = pbt_store[0]
-            b_store = pbt_store[1]
-            t_store = pbt_store[2]
-
-            fit_strike, fit_dip = mplstereonet.fit_girdle(
-                                    [float(drow[3]), 90 - float(drow[1])],
-                                    [float(drow[2]), float(drow[0]) + 180],
-                                    measurement="lines")
-            #Plane between pole and linear
-            self.ax_stereo.plane(fit_strike, fit_dip)
-
-            #Rotation axis is pole of pole-linear-plane
-            raxis = [fit_strike - 90, 90 - fit_dip]
-
-            #B-Axis is rotation axis
-            self.add_linear_feature(b_store, raxis[0], raxis[1])
-
-            #Rotate 30° to P-axis
-            if drow[4] == "dn" or drow[4] == "dex":
-                rot = 30
-            else:
-                rot = -30
-            p_dipdir, p_dip = self.rotate_data(raxis, rot, drow[2], drow[3])
-            self.add_linear_feature(p_store, p_dipdir, p_dip)
-
-            #Rotate 30°+120=150 to T-axis
-            if drow[4] == "dn" or drow[4] == "dex":
-                rot = -60
-            else:
-                rot = 60
-            t_dipdir, t_dip = self.rotate_data(raxis, rot, drow[2], drow[3])
-            self.add_linear_feature(t_store, t_dipdir, t_dip)
-
         p_store, p_lyr_obj = self.add_layer_dataset("line")
         p_lyr_obj.set_marker_fill("#ff0000")
         p_lyr_obj.set_marker_fill("#ff0000")
@@ -1290,10 +1357,26 @@ class MainWindow(object):
         t_lyr_obj.set_marker_style("^")
         t_lyr_obj.set_label("T-Axis")
 
-        pbt_store = [p_store, b_store, t_store]
-
-        lyr_store = lyr_obj.get_data_treestore()
-        lyr_store.foreach(iterate_over_data, pbt_store)
+        #For each row the pole-linear-plane is calculated. The pole of
+        #that plane is the rotation axis and the b-axis. The linear is
+        #then rotated for the p-axis and t-axis.
+        plane_dir, plane_dip, line_dir, line_dip, sense = \
+            lyr_obj.get_data().get_columns()
+        fit_strike, fit_dip = lp_planes(plane_dir, plane_dip,
+                                        line_dir, line_dip)
+        raxis = [fit_strike - 90, 90 - fit_dip]
+
+        #Rotate 30° to P-axis and 30°+120=150 to T-axis
+        normal = (sense == "dn") | (sense == "dex")
+        p_rot = np.where(normal, 30, -30)
+        t_rot = np.where(normal, -60, 60)
+        p_dipdir, p_dip = rotate_lines(raxis, p_rot, line_dir, line_dip)
+        t_dipdir, t_dip = rotate_lines(raxis, t_rot, line_dir, line_dip)
+
+        for k in range(len(plane_dir)):
+            self.add_linear_feature(b_store, raxis[0][k], raxis[1][k])
+            self.add_linear_feature(p_store, p_dipdir[k], p_dip[k])
+            self.add_linear_feature(t_store, t_dipdir[k], t_dip[k])
         self.redraw_plot()
 
     def layer_row_activated(self, treeview, path, column):
@@ -1373,7 +1456,7 @@ class MainWindow(object):
             self.main_window.show_all()
 
         if self.settings.get_highlight() is True:
-            self.redraw_plot()
+            self.schedule_redraw(highlight_only=True)
 
     def on_layer_toggled(self, widget, path):
         # pylint: disable=unused-argument
@@ -1381,10 +1464,10 @@ class MainWindow(object):
         Toggles the layer and redraws the plot.
 
         If the layer is toggled the bool field is switched between
-        True (visible) and False (invisible). Then the plot is redrawn.
+        True (visible) and False (invisible). Then a redraw is scheduled.
         """
         self.layer_store[path][0] = not self.layer_store[path][0]
-        self.redraw_plot()
+        self.schedule_redraw()
 
     def create_layer(self, lyr_type):
         """
@@ -1395,28 +1478,28 @@ class MainWindow(object):
         layer object, a TreeStore and a TreeView.
         """
         if lyr_type == "plane":
-            store = Gtk.ListStore(float, float, str)
-            view = PlaneDataView(store, self.redraw_plot, self.add_feature,
+            store = DataStore(float, float, str)
+            view = PlaneDataView(store, self.schedule_redraw, self.add_feature,
                                  self.settings)
             lyr_obj_new = PlaneLayer(store, view)
         elif lyr_type == "faultplane":
-            store = Gtk.ListStore(float, float, float, float, str)
-            view = FaultPlaneDataView(store, self.redraw_plot, self.add_feature,
+            store = DataStore(float, float, float, float, str)
+            view = FaultPlaneDataView(store, self.schedule_redraw, self.add_feature,
                                       self.settings)
             lyr_obj_new = FaultPlaneLayer(store, view)
         elif lyr_type == "line":
-            store = Gtk.ListStore(float, float, str)
-            view = LineDataView(store, self.redraw_plot, self.add_feature,
+            store = DataStore(float, float, str)
+            view = LineDataView(store, self.schedule_redraw, self.add_feature,
                                 self.settings)
             lyr_obj_new = LineLayer(store, view)
         elif lyr_type == "smallcircle":
-            store = Gtk.ListStore(float, float, float)
-            view = SmallCircleDataView(store, self.redraw_plot, self.add_feature,
+            store = DataStore(float, float, float)
+            view = SmallCircleDataView(store, self.schedule_redraw, self.add_feature,
                                        self.settings)
             lyr_obj_new = SmallCircleLayer(store, view)
         elif lyr_type == "eigenvector":
-            store = Gtk.ListStore(float, float, float)
-            view = EigenVectorView(store, self.redraw_plot, self.add_feature,
+            store = DataStore(float, float, float)
+            view = EigenVectorView(store, self.schedule_redraw, self.add_feature,
                                    self.settings)
             lyr_obj_new = EigenVectorLayer(store, view)
         elif lyr_type == "folder":
@@ -1501,645 +1584,77 @@ class MainWindow(object):
         store, lyr_obj_new = self.add_layer_dataset("smallcircle")
         return store, lyr_obj_new
 
-    def parse_planes(self, treestore, subset=None):
-        """
-        Parses planes and returns a list of strikes, dipdirs and dips.
-
-        Parsing converts from dip direction to strikes.
-        """
-        strike = []
-        dipdir = []
-        dip = []
-        for key, row in enumerate(treestore):
-            if subset is not None and key not in subset:
-                continue
-            strike.append(float(row[0]) - 90)
-            dipdir.append(float(row[0]))
-            dip.append(float(row[1]))
-        return strike, dipdir, dip
-
-    def parse_faultplanes(self, treestore, subset=None):
-        """
-        Parses a faultplane treestore. Converts planes from dip-direction to
-        strikes so they can be plotted.
-        #lp_plane = linear-pole_plane (The great circles that connect the
-        lineation with the pole of the faultplane. Used for Hoeppener-Plots.
-        """
-        strike = []
-        plane_dir = []
-        plane_dip = []
-        line_dir = []
-        line_dip = []
-        sense = []
-        line_sense_dir = []
-        line_sense_dip = []
-        lp_plane_dir = []
-        lp_plane_dip = []
-        for key, row in enumerate(treestore):
-            if subset is not None and key not in subset:
-                continue
-            strike.append(float(row[0] - 90))
-            plane_dir.append(float(row[0]))
-            plane_dip.append(float(row[1]))
-            line_dir.append(float(row[2]))
-            line_dip.append(float(row[3]))
-            sense.append(row[4])
-            if row[4] == "up":
-                line_sense_dir.append(float(row[2]) + 180)
-                line_sense_dip.append(90 - float(row[3]))
-            elif row[4] == "dn":
-                line_sense_dir.append(float(row[2]))
-                line_sense_dip.append(float(row[3]))
-            fit_strike, fit_dip = mplstereonet.fit_girdle(
-                                [float(row[3]), 90 - float(row[1])],
-                                [float(row[2]), float(row[0]) + 180],
-                                measurement="lines")
-            lp_plane_dir.append(fit_strike)
-            lp_plane_dip.append(fit_dip)
-        return strike, plane_dir, plane_dip, line_dir, line_dip, sense, \
-               line_sense_dir, line_sense_dip, lp_plane_dir, lp_plane_dip
-
-    def parse_lines(self, treestore, subset=None):
-        """
-        Parses linear data with the 3 columns dip direction, dip and sense.
-        Returns a python-list for each column.
-        """
-        line_dir = []
-        line_dip = []
-        sense = []
-        for key, row in enumerate(treestore):
-            if subset is not None and key not in subset:
-                continue
-            line_dir.append(float(row[0]))
-            line_dip.append(float(row[1]))
-            sense.append(row[2])
-        return line_dir, line_dip, sense
-
-    def parse_eigenvectors(self, treestore, subset=None):
-        """
-        Parses a eigenvector layer and returns a list of each column
-
-        This method expect a TreeStore that stores the data of a layer. It
-        iterates over the rows and adds each column to a list. It returns 3
-        lists for line_dir, line_dip (the eigenvector) and values (the
-        eigenvalue)
-        """
-        line_dir = []
-        line_dip = []
-        values = []
-        for key, row in enumerate(treestore):
-            if subset is not None and key not in subset:
-                continue
-            line_dir.append(float(row[0]))
-            line_dip.append(float(row[1]))
-            values.append(float(row[2]))
-        return line_dir, line_dip, values
-
-    def parse_smallcircles(self, treestore, subset=None):
-        """
-        Parses small circle data. Data has 3 columns: Dip direction, dip and
-        opening angle.
-        """
-        line_dir = []
-        line_dip = []
-        angle = []
-        for key, row in enumerate(treestore):
-            if subset is not None and key not in subset:
-                continue
-            line_dir.append(float(row[0]))
-            line_dip.append(float(row[1]))
-            angle.append(float(row[2]))
-        return line_dir, line_dip, angle
-
-    def draw_plane(self, lyr_obj, dipdir, dip, highlight=False):
-        """
-        Function draws a great circle in the stereonet. It calls the formatting
-        from the layer object.
-        """
-        num_data = len(dipdir)
-        lbl = "{} ({})".format(lyr_obj.get_label(), num_data)
-
-        if highlight is False:
-            self.ax_stereo.plane(dipdir, dip, color=lyr_obj.get_line_color(),
-                    label=lbl,
-                    linewidth=lyr_obj.get_line_width(),
-                    linestyle=lyr_obj.get_line_style(),
-                    dash_capstyle=lyr_obj.get_capstyle(),
-                    alpha=lyr_obj.get_line_alpha(), clip_on=False)
-        else:
-            self.ax_stereo.plane(dipdir, dip, color=lyr_obj.get_line_color(),
-                    linewidth=lyr_obj.get_line_width() + 2,
-                    linestyle=lyr_obj.get_line_style(),
-                    dash_capstyle=lyr_obj.get_capstyle(),
-                    alpha=lyr_obj.get_line_alpha(), clip_on=False)
-
-    def draw_line(self, lyr_obj, dipdir, dip, highlight=False):
-        """
-        Function draws a linear element in the stereonet. It calls the
-        formatting from the layer object.
-        """
-        num_data = len(dipdir)
-        lbl = "{} ({})".format(lyr_obj.get_label(), num_data)
-
-        if highlight is False:
-        #ax.line takes dip first and then dipdir (as strike)
-            self.ax_stereo.line(dip, dipdir, marker=lyr_obj.get_marker_style(),
-                    markersize=lyr_obj.get_marker_size(),
-                    color=lyr_obj.get_marker_fill(),
-                    label=lbl,
-                    markeredgewidth=lyr_obj.get_marker_edge_width(),
-                    markeredgecolor=lyr_obj.get_marker_edge_color(),
-                    alpha=lyr_obj.get_marker_alpha(), clip_on=False)
-        else:
-            self.ax_stereo.line(dip, dipdir, marker=lyr_obj.get_marker_style(),
-                    markersize=lyr_obj.get_marker_size(),
-                    color=lyr_obj.get_marker_fill(),
-                    markeredgewidth=lyr_obj.get_marker_edge_width() + 2,
-                    markeredgecolor=lyr_obj.get_marker_edge_color(),
-                    alpha=lyr_obj.get_marker_alpha(), clip_on=False)
-
-    def draw_eigenvector(self, lyr_obj, dipdir, dip, values, highlight=False):
-        """
-        Draws the eigenvectors as lines and adds the eigenvalues to the legend.
-
-        This method is called from the redraw_plot method to draw a eigenvector
-        layer. It expects a layer object and arrays for dip-direction, dips and
-        values. The arrays are rounded and converted to strings for the legend.
+    def get_density_grid(self, lyr_obj, highlight, key, grid_args):
         """
-        dipdir = np.round(dipdir, 1).tolist()
-        dip = np.round(dip, 1).tolist()
-        values = np.round(values, 2).tolist()
-
-        dipdir_str = []
-        dip_str = []
-        values_str = []
-
-        for x in dipdir:
-            dipdir_str.append(str(x).rjust(5, "0"))
-
-        for y in dip:
-            dip_str.append(str(y).rjust(4, "0"))
-
-        for v in values:
-            values_str.append(str(v))
-
-        lbl = "{}   \n".format(lyr_obj.get_label())
-
-        for key, value in enumerate(dipdir):
-            lbl += "  {}/{}, {}\n".format(dipdir_str[key], dip_str[key],
-                                          values_str[key])
-
-        if highlight is False:
-            #ax.line takes dip first and then dipdir (as strike)
-            self.ax_stereo.line(dip, dipdir, marker=lyr_obj.get_marker_style(),
-                    markersize=lyr_obj.get_marker_size(),
-                    color=lyr_obj.get_marker_fill(),
-                    label=lbl,
-                    markeredgewidth=lyr_obj.get_marker_edge_width(),
-                    markeredgecolor=lyr_obj.get_marker_edge_color(),
-                    alpha=lyr_obj.get_marker_alpha(), clip_on=False)
-        else:
-            self.ax_stereo.line(dip, dipdir, marker=lyr_obj.get_marker_style(),
-                    markersize=lyr_obj.get_marker_size() + 2,
-                    color=lyr_obj.get_marker_fill(),
-                    markeredgewidth=lyr_obj.get_marker_edge_width(),
-                    markeredgecolor=lyr_obj.get_marker_edge_color(),
-                    alpha=lyr_obj.get_marker_alpha(), clip_on=False)
-
-    def draw_smallcircles(self, lyr_obj, dipdir, dip, angle, highlight=False):
-        """
-        Function draws small circles in the stereonet. It calls the formatting
-        from the layer object.
-        """
-        if highlight is False:
-        #ax.cone takes dip first and then dipdir!
-        #facecolor needs to be "None" because there is a bug with which side to fill
-            self.ax_stereo.cone(dip, dipdir, angle, facecolor="None",
-                    edgecolor=lyr_obj.get_line_color(),
-                    linewidth=lyr_obj.get_line_width(),
-                    label=lyr_obj.get_label(),
-                    linestyle=lyr_obj.get_line_style())
-        else:
-            self.ax_stereo.cone(dip, dipdir, angle, facecolor="None",
-                    edgecolor=lyr_obj.get_line_color(),
-                    linewidth=lyr_obj.get_line_width() + 2,
-                    label=lyr_obj.get_label(),
-                    linestyle=lyr_obj.get_line_style())
-
-        num_data = len(dipdir)
-        lbl = "{} ({})".format(lyr_obj.get_label(), num_data)
-
-        handler = Line2D([], [], color=lyr_obj.get_line_color(),
-                    linewidth=lyr_obj.get_line_width(),
-                    linestyle=lyr_obj.get_line_style(),
-                    dash_capstyle=lyr_obj.get_capstyle(),
-                    alpha=lyr_obj.get_line_alpha())
-        return handler, lbl
+        Requests a density grid that is not in the cache.
 
-    def draw_mean_vector(self, lyr_obj, dipdir, dip, highlight=False):
+        Outside of the tests the grid is calculated in the worker thread (see
+        request_density_grid) and None is returned, so the contours are drawn
+        when the grid is ready. The tests calculate the grid right away.
         """
-        Draws the mean vector of the current linear layer.
-        """
-        if len(dipdir) == 0:
-            return
-
-        vector, r_value = mplstereonet.find_mean_vector(dip, dipdir)
-        self.ax_stereo.line(vector[0], vector[1], marker="d",
-            markersize=8,
-            color="#ff0000",
-            markeredgewidth=1,
-            markeredgecolor="#000000",
-            clip_on=False)
+        if self.testing == True:
+            return LayerPlotter.get_density_grid(self, lyr_obj, highlight,
+                                                 key, grid_args)
+        self.request_density_grid(lyr_obj, highlight, key, grid_args)
+        return None
 
-    def draw_fisher_smallcircle(self, lyr_obj, dipdir, dip, highlight=False):
+    def request_density_grid(self, lyr_obj, highlight, key, grid_args):
         """
-        Draws the confidence small circle of the current linear layer.
-        """
-        if len(dipdir) == 0:
-            return
+        Calculates a density grid in the worker thread.
 
-        confidence = lyr_obj.get_fisher_conf()
-        vector, stats = mplstereonet.find_fisher_stats(dip, dipdir, conf=confidence)
-        self.ax_stereo.cone(vector[0], vector[1], stats[1], facecolor="None",
-                    color=lyr_obj.get_line_color(),
-                    linewidth=lyr_obj.get_line_width(),
-                    label=lyr_obj.get_label(),
-                    linestyle=lyr_obj.get_line_style())
-
-    def draw_poles(self, lyr_obj, dipdir, dip, highlight=False):
-        """
-        Function draws a plane pole in the stereonet. It calls the formatting
-        from the layer object.
-        """
-        num_data = len(dipdir)
-        lbl = "Poles of {} ({})".format(lyr_obj.get_label(), num_data)
-
-        if highlight is False:
-            self.ax_stereo.pole(dipdir, dip, marker=lyr_obj.get_pole_style(),
-                    markersize=lyr_obj.get_pole_size(),
-                    color=lyr_obj.get_pole_fill(),
-                    label=lbl,
-                    markeredgewidth=lyr_obj.get_pole_edge_width(),
-                    markeredgecolor=lyr_obj.get_pole_edge_color(),
-                    alpha=lyr_obj.get_pole_alpha(), clip_on=False)
-        else:
-            self.ax_stereo.pole(dipdir, dip, marker=lyr_obj.get_pole_style(),
-                    markersize=lyr_obj.get_pole_size() + 2,
-                    color=lyr_obj.get_pole_fill(),
-                    markeredgewidth=lyr_obj.get_pole_edge_width(),
-                    markeredgecolor=lyr_obj.get_pole_edge_color(),
-                    alpha=lyr_obj.get_pole_alpha(), clip_on=False)
-
-    def draw_contours(self, lyr_obj, dipdir, dips, measure_type):
-        """
-        MplStereonet accepts measurements as "poles" for planes and
-        "lines" for linear measurements.
+        Each layer (and its highlighted subset) has one slot for a density
+        calculation. A request for a different grid cancels the calculation
+        that is waiting in the slot, and the result of a calculation that is
+        already running is ignored. The same grid is not requested twice.
         """
-        if len(dipdir) == 0:
-            return None
-
-        if lyr_obj.get_manual_range() == True:
-            lower = lyr_obj.get_lower_limit()
-            upper = lyr_obj.get_upper_limit()
-            steps = lyr_obj.get_steps()
-            cont_interval = np.linspace(lower, upper, num=steps)
-        else:
-            cont_interval = None
-
-        #Implement hatches = (['-', '+', 'x', '\\', '*', 'o', 'O', '.'])
-        if lyr_obj.get_draw_contour_fills() == True:
-            cbar = self.ax_stereo.density_contourf(dipdir, dips,
-                              measurement=measure_type,
-                              method=lyr_obj.get_contour_method(),
-                              gridsize=lyr_obj.get_contour_resolution(),
-                              cmap=lyr_obj.get_colormap(),
-                              sigma=lyr_obj.get_contour_sigma(),
-                              levels=cont_interval)
-        else:
-            cbar = None
-
-        if lyr_obj.get_draw_contour_lines() == True:
-            if lyr_obj.get_use_line_color() == True:
-                clines = self.ax_stereo.density_contour(dipdir, dips,
-                                measurement=measure_type,
-                                method = lyr_obj.get_contour_method(),
-                                gridsize = lyr_obj.get_contour_resolution(),
-                                sigma = lyr_obj.get_contour_sigma(),
-                                colors = lyr_obj.get_contour_line_color(),
-                                linewidths = lyr_obj.get_contour_line_width(),
-                                linestyles = lyr_obj.get_contour_line_style(),
-                                levels=cont_interval)
-            else:
-                clines = self.ax_stereo.density_contour(dipdir, dips,
-                                measurement=measure_type,
-                                method = lyr_obj.get_contour_method(),
-                                gridsize = lyr_obj.get_contour_resolution(),
-                                sigma = lyr_obj.get_contour_sigma(),
-                                cmap = lyr_obj.get_colormap(),
-                                linewidths = lyr_obj.get_contour_line_width(),
-                                linestyles = lyr_obj.get_contour_line_style(),
-                                levels=cont_interval)                
-
-        if lyr_obj.get_draw_contour_labels() == True:
-            if clines is not None:
-                self.ax_stereo.clabel(clines,
-                                fontsize = lyr_obj.get_contour_label_size())
-
-        self.cbar.append(cbar)
-
-    def draw_angelier(self, values):
-        """
-        Draws the Angelier arrows for a fault plane layer.
-
-        Receives the data as a list. Iterates over arrow-position and the sense
-        and displays the resulting arrow.
-        """
-        lyr_obj, plane_dir, plane_dip, strikes, \
-                 line_dir, line_dip, lp_plane_dir, lp_plane_dip, sense = values
-        lon, lat = mplstereonet.line(line_dip, line_dir)
-
-        for x, y, sns in zip(lon, lat, sense):
-            mag = np.hypot(x, y)
-            u, v = x / mag, y / mag
-
-            if sns == "up":
-                self.ax_stereo.quiver(x, y, -u, -v, width=1.5, headwidth=4,
-                                               units="dots", pivot="middle",
-                                               color=lyr_obj.get_arrow_color())
-            elif sns == "dn":
-                self.ax_stereo.quiver(x, y, u, v, width=1.5, headwidth=4,
-                                               units="dots", pivot="middle",
-                                               color=lyr_obj.get_arrow_color())
-
-            elif sns == "sin":
-                pass
-
-            elif sns == "dex":
-                pass
-
-            else:
-                pass
-
-        return None
-
-    def draw_hoeppener(self, lyr_obj, plane_dir, plane_dip, line_dir,
-                        line_dip, lp_plane_dir, lp_plane_dip, sense):
-        """
-        Receives data from a faultplane and draws a Hoeppener arrow.
-
-        Triggered by the redraw_plot function.
-        Receives a plane (direction and dip), linear (direction and dip), and
-        the plane that connects them to each other (direction and dip). Finds
-        the closest index to the pole on the pole-linear-plane and uses that
-        index as the center of the arrow. The arrow connects the two points on
-        the pole-linear-plane that lie f = 2 indexes in either direction. The
-        length is corrected if it obviously crosses the stereonet (length > 1).
-        Then the start and end direction is determined by the shear sense. If
-        the datapoint has no shear sense no arrow is drawn. Unknown shear sense
-        is just a line. The arrow direction is determined like this:
-        -------------
-        "up" (overthrust) Arrow should point away from equator.
-        "dn" (downthrust) Arrow should point towards the equator.
-        "sin" (sinistral strike-slip) Arrows should point left.
-        "dex" (dextral strike-slip) Arrows should point right.
-        __!!__ Still has a bug. Some orientations are wrong!
-        """
-        if len(line_dir) == 0:
-            return
-
-        def find_nearest_point(plane_stack, point):
-            """
-            Finds the closest index to the pole on the pole-linear-plane.
-
-            The pole lies on the pole-linear plane. The index that is closest to
-            this point is returned and further used as the center of the arrow.
-            """
-            tree = spatial.cKDTree(plane_stack)
-            dist, index = tree.query(point)
-            return index
-
-        for k, x in enumerate(plane_dir):
-            plane_lons, plane_lats = mplstereonet.plane(lp_plane_dir[k],
-                                                        lp_plane_dip[k])
-            line_lons, line_lats = mplstereonet.pole(plane_dir[k] - 90,
-                                                     plane_dip[k])
-            plane_stack = np.dstack([plane_lons.ravel(), plane_lats.ravel()])[0]
-            point = np.array([line_lons, line_lats]).transpose()
-            i = find_nearest_point(plane_stack, point)
-
-            #This solution works well for short arrows. Longer arrows bypass
-            #the pole point. If length of arrow is a concern this needs to be
-            #redone in a different way.
-            f = 2
-
-            lon_start = plane_lons[i-f][0][0]
-            lat_start = plane_lats[i-f][0][0]
-            lon_end = plane_lons[i+f][0][0]
-            lat_end = plane_lats[i+f][0][0]
-            dlon = lon_end - lon_start
-            dlat = lat_end - lat_start
-            
-            #If the arrow crosses the stereonet, the arrow is moved so long
-            #until the closer point touches the edge of the stereonet
-            c = 0
-            while dlon > 1 or dlat > 1:
-                c = c + 1
-                if abs(lon_start) > abs(lon_end) or abs(lat_start) > (lat_end):
-                    lon_start = plane_lons[i-f+c][0][0]
-                    lat_start = plane_lats[i-f+c][0][0]
-                    lon_end = plane_lons[i+f+c][0][0]
-                    lat_end = plane_lats[i+f+c][0][0]
-                else:
-                    lon_start = plane_lons[i-f-c][0][0]
-                    lat_start = plane_lats[i-f-c][0][0]
-                    lon_end = plane_lons[i+f-c][0][0]
-                    lat_end = plane_lats[i+f-c][0][0]
-                
-                dlon = lon_end - lon_start
-                dlat = lat_end - lat_start
-
-            #Correct the direction of the arrow
-            if sense[k] == "up":
-                if abs(lon_start) > abs(lon_end):
-                    lon_start, lon_end = lon_end, lon_start
-                    lat_start, lat_end = lat_end, lat_start
-
-            elif sense[k] == "dn":
-                if abs(lon_start) < abs(lon_end):
-                    lon_start, lon_end = lon_end, lon_start
-                    lat_start, lat_end = lat_end, lat_start
-
-            elif sense[k] == "sin":
-                if lon_start > lon_end:
-                    lon_start, lon_end = lon_end, lon_start
-                    lat_start, lat_end = lat_end, lat_start
-
-            elif sense[k] == "dex":
-                if lon_start < lon_end:
-                    lon_start, lon_end = lon_end, lon_start
-                    lat_start, lat_end = lat_end, lat_start
-
-            #Draw line for "uk", nothing for "" and arrow for everything else
-            #__!!__ The arrows direction might not be determined by
-            #xy = start and xytext = end
-            if sense[k] == "uk":
-                self.ax_stereo.annotate("", xy = (lon_end, lat_end),
-                                        xytext = (lon_start, lat_start),
-                                        xycoords = "data",
-                                        textcoords = "data",
-                                        arrowprops = dict(arrowstyle = "-",
-                                                      connectionstyle = "arc3"))
-            elif sense[k] == "":
-                pass
-            else:
-                self.ax_stereo.annotate("", xy = (lon_end, lat_end),
-                                        xytext = (lon_start, lat_start),
-                                        xycoords = "data",
-                                        textcoords = "data",
-                                        arrowprops = dict(arrowstyle = "->",
-                                                      connectionstyle = "arc3"))
-
-    def plot_layer(self, lyr_obj, subset=None, highlight=False):
-        """
-        Plots a certain layer or subset of layer.
-
-        The method expect a layer-object which should be plotted. If only a
-        subset should be plotted, a list containing the row number sof the
-        subset has to be passed additionally. If the layer or subset should be
-        highlighted the method additionally expect a boolean keyword argument:
-        highlight = True. Each layer and subset is parsed and then passed to
-        the respective drawing functions.
-        """
-        if lyr_obj == None:
-            lyr_type = "group"
-        else:
-            lyr_type = lyr_obj.get_layer_type()
-            store = lyr_obj.get_data_treestore()
-
-        if lyr_type == "plane":
-            strike, dipdir, dip = self.parse_planes(store, subset)
-
-            if lyr_obj.get_draw_gcircles() == True:
-                self.draw_plane(lyr_obj, strike, dip, highlight=highlight)
-
-            if lyr_obj.get_draw_poles() == True:
-                self.draw_poles(lyr_obj, strike, dip, highlight=highlight)
-
-            self.draw_contours(lyr_obj, strike, dip, "poles")
-
-            if self.ax_rose is not None:
-                num_bins = 360 / lyr_obj.get_rose_spacing()
-                bin_width = 2 * np.pi / num_bins
-                dipdir = np.radians(dipdir)
-                values, bin_edges = np.histogram(dipdir, num_bins,
-                                                 range = (0, 2 * np.pi))
-                self.ax_rose.bar(left = bin_edges[:-1], height = values,
-                                     width = bin_width, alpha=0.5,
-                                     color = lyr_obj.get_line_color(),
-                                     edgecolor = lyr_obj.get_pole_edge_color(),
-                                     bottom = lyr_obj.get_rose_bottom())
-
-            if self.ax_drose is not None:
-                num_bins = 90 / lyr_obj.get_dip_rose_spacing()
-                bin_width = (np.pi / 2) / num_bins
-                dip = np.radians(dip)
-                values, bin_edges = np.histogram(dip, num_bins,
-                                                 range = (0, np.pi / 2))
-                self.ax_drose.bar(left = bin_edges[:-1], height = values,
-                                     width = bin_width, alpha=0.5,
-                                     color = lyr_obj.get_line_color(),
-                                     edgecolor = lyr_obj.get_pole_edge_color(),
-                                     bottom = lyr_obj.get_rose_bottom())
-
-        elif lyr_type == "line":
-            dipdir, dip, sense = self.parse_lines(store, subset)
-
-            if lyr_obj.get_draw_linears() == True:
-                self.draw_line(lyr_obj, dipdir, dip, highlight=highlight)
-
-            self.draw_contours(lyr_obj, dip, dipdir, "lines")
-
-            if self.ax_rose is not None:
-                num_bins = 360 / lyr_obj.get_rose_spacing()
-                bin_width = 2 * np.pi / num_bins
-                dipdir = np.radians(dipdir)
-                values, bin_edges = np.histogram(dipdir, num_bins,
-                                                 range = (0, 2 * np.pi))
-
-                self.ax_rose.bar(left = bin_edges[:-1], height = values,
-                                     width = bin_width, alpha=0.5,
-                                     color = lyr_obj.get_marker_fill(),
-                                     edgecolor = lyr_obj.get_marker_edge_color(),
-                                     bottom = lyr_obj.get_rose_bottom())
-
-            if self.ax_drose is not None:
-                num_bins = 90 / lyr_obj.get_dip_rose_spacing()
-                bin_width = (np.pi / 2) / num_bins
-                dip = np.radians(dip)
-                values, bin_edges = np.histogram(dip, num_bins,
-                                                 range = (0, np.pi / 2))
-                self.ax_drose.bar(left = bin_edges[:-1], height = values,
-                                     width = bin_width, alpha=0.5,
-                                     color = lyr_obj.get_marker_fill(),
-                                     edgecolor = lyr_obj.get_marker_edge_color(),
-                                     bottom = lyr_obj.get_rose_bottom())
-
-            if lyr_obj.get_draw_mean_vector() == True:
-                self.draw_mean_vector(lyr_obj, dipdir, dip)
-
-            if lyr_obj.get_draw_fisher_sc() == True:
-                self.draw_fisher_smallcircle(lyr_obj, dipdir, dip)
-
-        elif lyr_type == "faultplane":
-            strike, plane_dir, plane_dip, line_dir, line_dip, \
-                sense, line_sense_dir, line_sense_dip, \
-                lp_plane_dir, lp_plane_dip = (
-                self.parse_faultplanes(store, subset))
-
-            if lyr_obj.get_draw_gcircles() == True:
-                self.draw_plane(lyr_obj, strike, plane_dip, highlight=highlight)
-            if lyr_obj.get_draw_poles() == True:
-                self.draw_poles(lyr_obj, strike, plane_dip, highlight=highlight)
-            if lyr_obj.get_draw_linears() == True:
-                self.draw_line(lyr_obj, line_dir, line_dip, highlight=highlight)
-            if lyr_obj.get_draw_lp_plane() == True:
-                self.ax_stereo.plane(lp_plane_dir, lp_plane_dip,
-                                     linestyle="dotted",
-                                     color="#000000", highlight=highlight)
-            if lyr_obj.get_draw_hoeppener() == True:
-               self.draw_hoeppener(lyr_obj, plane_dir, plane_dip,
-                                   line_dir, line_dip, lp_plane_dir,
-                                   lp_plane_dip, sense)
-
-            if lyr_obj.get_draw_angelier() == True:
-               self.draw_angelier([lyr_obj, plane_dir, plane_dip, strike,
-                                   line_dir, line_dip, lp_plane_dir,
-                                   lp_plane_dip, sense])
-
-
-        elif lyr_type == "smallcircle":
-            dipdir, dip, angle = self.parse_smallcircles(store, subset)
-            handler, label = self.draw_smallcircles(lyr_obj, dipdir,
-                                                    dip, angle,
-                                                    highlight=highlight)
-            self.sc_labels.append(label)
-            self.sc_handlers.append(handler)
-
-        elif lyr_type == "eigenvector":
-            dipdir, dip, values = self.parse_lines(store, subset)
-            if lyr_obj.get_draw_linears() == True:
-                self.draw_eigenvector(lyr_obj, dipdir, dip, values,
-                                      highlight=highlight)
-
-            self.draw_contours(lyr_obj, dip, dipdir, "lines")
+        slot = (id(lyr_obj), highlight)
+        job = self.density_jobs.get(slot)
+        if job is not None:
+            if job[0] == key:
+                return
+            job[1].cancel()
+
+        #The columns are views of the layer data, which can change while
+        #the grid is calculated.
+        dipdir, dips = np.array(grid_args[0]), np.array(grid_args[1])
+        future = self.density_executor.submit(compute_grid, dipdir, dips,
+                                              *grid_args[2:])
+        self.density_jobs[slot] = (key, future)
+        future.add_done_callback(lambda future: GLib.idle_add(
+            self.on_density_grid_ready, lyr_obj, highlight, key, future))
+
+    def on_density_grid_ready(self, lyr_obj, highlight, key, future):
+        """
+        Adds a calculated density grid to the cache and redraws the plot.
+
+        Called in the main loop when the worker thread is done. Results of
+        cancelled or superseded calculations are discarded. Otherwise the
+        artists of the layer are removed, so the layer is drawn again with
+        the contours from the cache. Returns False so the idle callback is
+        only run once.
+        """
+        if future.cancelled():
+            return False
+
+        slot = (id(lyr_obj), highlight)
+        job = self.density_jobs.get(slot)
+        if job is None or job[0] != key:
+            return False
+
+        del self.density_jobs[slot]
+        self.density_cache.add_grid(key, future.result())
+        if highlight == False:
+            lyr_obj.remove_artists()
+        self.redraw_plot()
+        return False
 
     def highlight_selection(self, deselected):
         """
         Gets the current selection and highlights it in the plot.
 
         If only a layer is selected the layer is passed to the redrawing
-        function. If one or more data-rows are selected the row-numbers are
-        stored in a subset list and passed with the layer to the redrawing
+        function. If one or more data-rows are selected a boolean mask of
+        the selected rows is passed with the layer to the redrawing
         function.
         """
         selection = self.layer_view.get_selection()
@@ -2162,11 +1677,9 @@ class MainWindow(object):
 
                 self.plot_layer(lyr_obj, highlight=True)
 
-        def highlight_rows(lyr_obj, data_row_list):
-            row_list_ints = []
-            for row in data_row_list:
-                row_list_ints.append(row.get_indices()[0])
-            self.plot_layer(lyr_obj, row_list_ints, highlight=True)
+        def highlight_rows(lyr_obj, data_view):
+            self.plot_layer(lyr_obj, data_view.get_selected_mask(),
+                            highlight=True)
 
         if len(row_list) == 1:
             row = row_list[0]
@@ -2174,10 +1687,8 @@ class MainWindow(object):
             if lyr_obj == None:
                 return
             data_view = lyr_obj.get_data_treeview()
-            data_selection = data_view.get_selection()
-            data_model, data_row_list = data_selection.get_selected_rows()
-            if len(data_row_list) > 0:
-                highlight_rows(lyr_obj, data_row_list)
+            if data_view.get_selection().count_selected_rows() > 0:
+                highlight_rows(lyr_obj, data_view)
             else:
                 highlight_layers(deselected)
         elif len(row_list) == 0:
@@ -2185,40 +1696,225 @@ class MainWindow(object):
         else:
             highlight_layers(deselected)
 
+    def get_plot_children(self):
+        """
+        Returns the artists of all axes that layers are drawn into.
+
+        Layers are drawn into the stereonet and the rose diagrams. The
+        artists are compared before and after a layer is drawn, to find the
+        artists that belong to the layer.
+        """
+        children = []
+        for ax in (self.ax_stereo, self.ax_rose, self.ax_drose):
+            if ax is not None:
+                children.extend(ax.get_children())
+        return children
+
+    def draw_layer(self, lyr_obj, position):
+        """
+        Draws a layer or reuses the artists of the last drawing.
+
+        The key of the layer data and properties is compared with the key
+        of the current artists of the layer. If they differ, the old artists
+        are removed and the layer is plotted again. The new artists and
+        contour fills are stored in the layer object. Otherwise the stored
+        contour fills are added to the list of the current redraw, and the
+        stored artists are shown (they are hidden while the layer is
+        unchecked) and restyled if only style properties have changed. The
+        drawing order is set from the position of the layer. The key also
+        contains the number of vertices of the circles, which depends on the
+        size of the stereonet (see get_circle_segments).
+        """
+        key = (lyr_obj.get_plot_key(), self.plot_axes_key,
+               self.circle_segments)
+        if lyr_obj.get_artist_key() != key:
+            lyr_obj.remove_artists()
+            before = set(id(child) for child in self.get_plot_children())
+            n_cbar = len(self.cbar)
+            n_styled = len(self.styled_artists)
+            self.plot_layer(lyr_obj)
+            artists = [child for child in self.get_plot_children()
+                       if id(child) not in before]
+            lyr_obj.set_artists(artists, key, self.cbar[n_cbar:],
+                                self.styled_artists[n_styled:])
+        else:
+            self.cbar.extend(lyr_obj.get_mappables())
+            lyr_obj.set_artists_visible(True)
+            style_key = lyr_obj.get_style_key()
+            if lyr_obj.get_artist_style_key() != style_key:
+                self.restyle_artists(lyr_obj, lyr_obj.get_styled_artists())
+                lyr_obj.set_artist_style_key(style_key)
+        lyr_obj.set_artist_order(position)
+
+    def schedule_redraw(self, highlight_only=False):
+        """
+        Schedules a redraw of the plot for the next idle moment of the main loop.
+
+        Called by signals that can be emitted many times in a row, e.g. edits
+        in the data-view, toggling layers or changing the selection. Only
+        the first call adds a redraw to the main loop. All changes up to the
+        moment the redraw runs are drawn by this single redraw. Selection
+        changes pass highlight_only=True, and if no other change was
+        requested only the highlight overlay is redrawn (see
+        redraw_highlight). The number of requests and performed redraws is
+        counted (see get_saved_redraws).
+        """
+        self.redraw_requests += 1
+        if highlight_only == False:
+            self.full_redraw_scheduled = True
+        if self.redraw_scheduled == True:
+            return
+        self.redraw_scheduled = True
+        GLib.idle_add(self.on_scheduled_redraw)
+
+    def on_scheduled_redraw(self):
+        """
+        Runs the scheduled redraw. Returns False so it is only run once.
+        """
+        self.redraw_scheduled = False
+        self.scheduled_redraws += 1
+        if self.full_redraw_scheduled == True:
+            self.full_redraw_scheduled = False
+            self.redraw_plot()
+        else:
+            self.redraw_highlight()
+        return False
+
+    def draw_highlight(self):
+        """
+        Draws the highlighted selection as animated artists.
+
+        The previous highlight artists are removed. In highlight mode the
+        current selection is drawn (see highlight_selection). The artists
+        are animated and hidden, so they are not part of the full draw of
+        the canvas or of exported images (Matplotlib draws animated artists
+        when a figure is saved). They are only drawn on top of the cached
+        background by blit_highlight. If the canvas does not support
+        blitting, they are normal artists of the full draw.
+        The contour fills and styled artists of the highlight are not kept
+        in the lists of the redraw, because they are removed again with the
+        next selection.
+        """
+        for artist in self.highlight_artists:
+            if artist.axes is not None:
+                artist.remove()
+        self.highlight_artists = []
+        if self.settings.get_highlight() is not True:
+            return
+
+        before = set(id(child) for child in self.get_plot_children())
+        n_cbar = len(self.cbar)
+        n_styled = len(self.styled_artists)
+        self.highlight_selection(self.deselected)
+        del self.cbar[n_cbar:]
+        del self.styled_artists[n_styled:]
+        self.highlight_artists = [child for child in self.get_plot_children()
+                                  if id(child) not in before]
+        for artist in self.highlight_artists:
+            artist.set_animated(self.use_blit)
+            artist.set_visible(not self.use_blit)
+
+    def redraw_highlight(self):
+        """
+        Redraws only the highlight overlay.
+
+        Called when the selection changes in highlight mode. The layers are
+        not drawn again. The new highlight artists are blitted onto the
+        cached background.
+        """
+        self.draw_highlight()
+        self.blit_highlight()
+
+    def blit_highlight(self):
+        """
+        Draws the highlight artists onto the background.
+
+        The background is restored from the cached image and only the
+        animated highlight artists and the outline of a lasso or box
+        selection are drawn. If there is no background,
+        the canvas is drawn once, which caches it (see on_canvas_draw).
+        Without blitting the whole canvas is drawn.
+        """
+        if self.use_blit is False or self.background is None:
+            self.canvas.draw_idle()
+            return
+
+        self.canvas.restore_region(self.background)
+        overlay = [artist for artist in self.highlight_artists
+                   if artist.axes is not None]
+        if self.select_line is not None:
+            overlay.append(self.select_line)
+        for artist in overlay:
+            artist.set_visible(True)
+            artist.axes.draw_artist(artist)
+            artist.set_visible(False)
+        self.canvas.blit(self.fig.bbox)
+
+    def on_canvas_draw(self, event):
+        """
+        Caches the background after each full draw of the canvas.
+
+        A full draw happens after redraw_plot and when the window is
+        resized. The highlight artists are not part of the full draw and
+        are drawn on top of the new background. Draws of exported images
+        are skipped, so the highlight is not drawn into them.
+        """
+        if self.use_blit is False or self.canvas.is_saving():
+            return
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.blit_highlight()
+
+    def on_canvas_resize(self, event):
+        """
+        Schedules a redraw if the circles need another number of vertices.
+
+        The great and small circles are drawn with a number of vertices that
+        depends on the size of the stereonet (see get_circle_segments). When
+        the window is resized, the layers are drawn again if that number
+        changes. Otherwise the stored artists are only scaled.
+        """
+        if self.get_circle_segments() != self.circle_segments:
+            self.schedule_redraw()
+
+    def get_saved_redraws(self):
+        """
+        Returns how many redraws were saved by scheduling redraws.
+
+        This is the number of requested redraws minus the number of
+        scheduled redraws that were performed (see schedule_redraw).
+        """
+        return self.redraw_requests - self.scheduled_redraws
+
     def redraw_plot(self, checkout_canvas=False):
         """
         This function is called after any changes to the datasets or when
         adding or deleting layer. The plot is cleared and then redrawn.
         layer[3] = layer object
+
+        Each layer keeps the artists of its last drawing. Only layers whose
+        data or properties have changed are drawn again (see draw_layer).
+        Hidden layers keep their artists invisible, so showing them again
+        does not draw them again.
+        The axes are only cleared when the view or the canvas changes. The
+        canvas is drawn when the main loop is idle, so several redraws in a
+        row only render the figure once.
         """
         self.cbar = []
-        def inverted_transform_stereonet():
-            """
-            The inverted transform of the stereonet depends on the projection.
-
-            Equal area and equal angle projections have different tranformation
-            functions. The appropriate on has be set.
-            """
-            self.inv = self.settings.get_inverse_transform()
+        self.styled_artists = []
 
         if self.view_changed == True or checkout_canvas == True:
             self.view_changed = False
             if self.view_mode == "stereonet":
                 self.ax_stereo, self.ax_cbar = self.settings.get_stereonet()
-                inverted_transform_stereonet()
             elif self.view_mode == "stereo-rose":
                 self.ax_stereo, self.ax_rose, self.ax_cbar = self.settings.get_stereo_rose()
-                inverted_transform_stereonet()
             elif self.view_mode == "stereo-two-rose":
                 self.ax_stereo, self.ax_rose, self.ax_drose, self.ax_cbar = self.settings.get_stereo_two_rose()
-                inverted_transform_stereonet()
             elif self.view_mode == "rose":
                 self.ax_rose = self.settings.get_rose_diagram()
             elif self.view_mode == "pt":
-                self.inv = self.settings.get_inverse_transform()
                 self.ax_stereo, self.ax_fluc, self.ax_mohr = (
                                             self.settings.get_pt_view())
-                inverted_transform_stereonet()
 
         def clear_stereo():
             self.ax_stereo.cla()
@@ -2240,43 +1936,41 @@ class MainWindow(object):
             self.ax_mohr.cla()
             self.ax_mohr.set_title("ax_mohr", visible=False)
 
-        if self.view_mode == "stereonet":
-            clear_stereo()
-        elif self.view_mode == "stereo-rose":
-            clear_stereo()
-            clear_rose()
-        elif self.view_mode == "stereo-two-rose":
-            clear_stereo()
-            clear_rose()
-            clear_drose()
-        elif self.view_mode == "rose":
-            clear_rose()
-        elif self.view_mode == "pt":
-            clear_stereo()
-            clear_fluc()
-            clear_mohr()
-
-        if self.settings.get_draw_grid_state() == True:
-            self.ax_stereo.grid(linestyle = self.settings.get_grid_linestyle(),
-                                color = self.settings.get_grid_color(),
-                                linewidth = self.settings.get_grid_width())
-
-        if self.settings.get_show_cross() == True:
-            self.ax_stereo.annotate("", xy = (-0.03, 0),
-                                    xytext = (0.03, 0),
-                                    xycoords = "data",
-                                    arrowprops = dict(arrowstyle = "-",
-                                                      connectionstyle = "arc3"))
-            self.ax_stereo.annotate("", xy = (0, -0.03),
-                                    xytext = (0, 0.03),
-                                    xycoords = "data",
-                                    arrowprops = dict(arrowstyle = "-",
-                                                      connectionstyle = "arc3"))
-
-        if self.settings.get_show_north() == True:
-            self.ax_stereo.set_azimuth_ticks([0], labels=['N'])
+        plot_axes_key = (id(self.ax_stereo), id(self.ax_rose),
+                         id(self.ax_drose), self.view_mode)
+        if plot_axes_key != self.plot_axes_key:
+            self.plot_axes_key = plot_axes_key
+            for lyr_obj in self.drawn_layers:
+                lyr_obj.clear_artists()
+            self.drawn_layers = []
+            self.highlight_artists = []
+
+            if self.view_mode == "stereonet":
+                clear_stereo()
+            elif self.view_mode == "stereo-rose":
+                clear_stereo()
+                clear_rose()
+            elif self.view_mode == "stereo-two-rose":
+                clear_stereo()
+                clear_rose()
+                clear_drose()
+            elif self.view_mode == "rose":
+                clear_rose()
+            elif self.view_mode == "pt":
+                clear_stereo()
+                clear_fluc()
+                clear_mohr()
+
+            self.draw_stereonet_decorations()
+
+        self.background = None
+        legend = self.ax_stereo.get_legend()
+        if legend is not None:
+            legend.remove()
 
         self.deselected = []
+        layers = []
+        hidden = []
         def iterate_over_rows(model, path, itr):
             lyr_obj = model[path][3]
             if lyr_obj is not None:
@@ -2288,6 +1982,8 @@ class MainWindow(object):
 
             if model[path][0] == False:
                 self.deselected.append(str(path))
+                if lyr_obj is not None:
+                    hidden.append(lyr_obj)
                 return
             
             draw = True
@@ -2296,47 +1992,40 @@ class MainWindow(object):
                     draw = False
 
             if draw == False:
+                if lyr_obj is not None:
+                    hidden.append(lyr_obj)
                 return
 
-            self.plot_layer(lyr_obj)
+            if lyr_obj is not None:
+                layers.append(lyr_obj)
 
-        self.sc_labels = []
-        self.sc_handlers = []
         self.layer_store.foreach(iterate_over_rows)
 
-        one_cbar = False
-        for cbar in self.cbar:
-            if cbar is not None:
-                self.ax_cbar.axis("on")
-                cb = self.fig.colorbar(cbar, cax=self.ax_cbar)
-                one_cbar = True
-                break
+        self.circle_segments = self.get_circle_segments()
+        for position, lyr_obj in enumerate(layers):
+            self.draw_layer(lyr_obj, position)
+
+        #Layers that were hidden since the last redraw keep their artists,
+        #layers that were deleted are removed from the plot.
+        for lyr_obj in self.drawn_layers:
+            if any(lyr_obj is drawn for drawn in layers):
+                continue
+            elif any(lyr_obj is hidden_lyr for hidden_lyr in hidden):
+                lyr_obj.set_artists_visible(False)
+            else:
+                lyr_obj.remove_artists()
+        self.drawn_layers = layers + [lyr_obj for lyr_obj in hidden
+                                      if len(lyr_obj.get_artists()) > 0]
 
-        if one_cbar == False:
-            self.ax_cbar.cla()
-            self.ax_cbar.axis("off")
+        self.feature_index.build([(lyr_obj, points) for lyr_obj in layers
+                                  for points in self.get_visible_points(lyr_obj)])
 
-        if self.settings.get_highlight() is True:
-            self.highlight_selection(self.deselected)
+        self.draw_colorbar()
+        self.draw_highlight()
 
         if self.settings.get_draw_legend() == True:
-            handles, labels = self.ax_stereo.get_legend_handles_labels()
-            newLabels, newHandles = [], []
-            for handle, label in zip(handles, labels):
-                if label not in newLabels:
-                    newLabels.append(label)
-                    newHandles.append(handle)
-
-            for handle, label in zip(self.sc_handlers, self.sc_labels):
-                if label not in newLabels:
-                    newLabels.append(label)
-                    newHandles.append(handle)
-
-            if len(newHandles) is not 0:
-                self.ax_stereo.legend(newHandles, newLabels,
-                                      bbox_to_anchor=(1.5, 1.1), borderpad=1,
-                                      numpoints=1)
-        self.canvas.draw()
+            self.draw_legend(layers)
+        self.canvas.draw_idle()
 
     def on_toolbutton_create_group_layer_clicked(self, widget):
         """
@@ -2414,7 +2103,7 @@ class MainWindow(object):
         if lyr_obj is not None:
             lyr_obj.set_label(new_label)
 
-        self.redraw_plot()
+        self.schedule_redraw()
 
     def on_menuitem_about_activate(self, widget):
         """
@@ -2435,8 +2124,9 @@ class MainWindow(object):
     def on_main_window_destroy(self, widget):
         """
         Triggered when the main window is closed with the x-Button.
-        Terminates the Gtk main loop
+        Terminates the Gtk main loop and the density worker thread.
         """
+        self.density_executor.shutdown(wait=False)
         Gtk.main_quit()
 
     def on_toolbutton_remove_feature_clicked(self, widget):
@@ -2464,27 +2154,79 @@ class MainWindow(object):
 
     def convert_xy_to_dirdip(self, event):
         """
-        Converts xy-coordinates of a matplotlib-event into dip-direction/dip
-        by using the inverse transformation of mplstereonet. Returns floats in
-        degree.
+        Converts the pixel position of a matplotlib-event into
+        dip-direction/dip.
+
+        The position is taken relative to the center of the stereonet and
+        scaled by its radius. The closed-form inverse of the projection
+        (see xy_to_dirdip) needs no arrays or transforms, so it is cheap
+        enough for every motion event. Returns floats in degree.
         """
-        alpha = np.arctan2(event.xdata, event.ydata)
-        alpha_deg = np.degrees(alpha)
-        if alpha_deg < 0:
-            alpha_deg += 360
+        bbox = self.ax_stereo.bbox
+        radius = 0.5 * min(bbox.width, bbox.height)
+        x = (event.x - 0.5 * (bbox.x0 + bbox.x1)) / radius
+        y = (event.y - 0.5 * (bbox.y0 + bbox.y1)) / radius
+        return xy_to_dirdip(x, y,
+                            self.ax_stereo.name == "equal_area_stereonet")
 
-        xy = np.array([[event.xdata, event.ydata]])
-        xy_trans = self.inv.transform(xy)
+    def pick_feature(self, event, radius=5):
+        """
+        Returns the layer and row of the point under the cursor.
 
-        x = float(xy_trans[0,0:1])
-        y = float(xy_trans[0,1:2])
+        The position of the matplotlib-event is converted into the
+        coordinates of the stereonet projection, together with the radius
+        in pixels. The nearest pole or linear of the visible layers within
+        that radius is found in the FeatureIndex. Returns a tuple of the
+        layer object and the row number, or None.
+        """
+        trans = (self.ax_stereo.transAffine +
+                 self.ax_stereo.transAxes).inverted()
+        (x, y), (x_r, y_r) = trans.transform([[event.x, event.y],
+                                              [event.x + radius, event.y]])
+        return self.feature_index.query(x, y, abs(x_r - x))
 
-        array = mplstereonet.stereonet_math._rotate(np.degrees(x),
-                    np.degrees(y), (-1)*alpha_deg)
+    def get_feature_text(self, lyr_obj, row):
+        """
+        Returns the label of the layer, the row number and the values of a
+        row for the statusbar. Numbers are rounded to one decimal place.
+        """
+        values = []
+        for value in lyr_obj.get_data().get_row(row):
+            if isinstance(value, float):
+                values.append(str(round(value, 1)))
+            elif value != "":
+                values.append(str(value))
+        return "{0} #{1}: {2}".format(lyr_obj.get_label(), row + 1,
+                                      " / ".join(values))
+
+    def select_feature(self, lyr_obj, row):
+        """
+        Selects a layer in the layer-view and one of its rows in the
+        data-view.
 
-        gamma = float(array[1])
-        gamma_deg = 90 - np.degrees(gamma)
-        return alpha_deg, gamma_deg
+        Called when a point of a layer is clicked in the stereonet.
+        """
+        layer_paths = []
+        def find_layer(model, path, itr):
+            if model[path][3] is lyr_obj:
+                layer_paths.append(str(path))
+                return True
+
+        self.layer_store.foreach(find_layer)
+        if len(layer_paths) == 0:
+            return
+
+        self.layer_view.expand_to_path(
+                                Gtk.TreePath.new_from_string(layer_paths[0]))
+        selection = self.layer_view.get_selection()
+        selection.unselect_all()
+        selection.select_path(layer_paths[0])
+
+        data_view = lyr_obj.get_data_treeview()
+        data_selection = data_view.get_selection()
+        data_selection.unselect_all()
+        data_selection.select_path(row)
+        data_view.scroll_to_cell(row, None, False, 0, 0)
 
     def add_planar_feature(self, datastore, dip_direct=0, dip=0, sense=""):
         """
@@ -2574,6 +2316,25 @@ class MainWindow(object):
         if layer_type == "eigenvector":
             itr = self.add_eigenvector_feature(store, *args)
 
+    def add_features(self, lyr_obj, columns):
+        """
+        Adds many features to a layer at once.
+
+        Expects a layer object and a list with one array or list per column.
+        The dip-directions and dips are moved into the normal range as
+        arrays, like the add-feature methods do for single rows (see
+        normalize_columns). The rows are added to the store of the layer in
+        one pass while its data-view is detached.
+        """
+        if len(columns) == 0 or len(columns[0]) == 0:
+            return
+        columns = normalize_columns(lyr_obj.get_layer_type(), columns)
+        store = lyr_obj.get_data_treestore()
+        view = lyr_obj.get_data_treeview()
+        view.set_model(None)
+        store.extend(columns)
+        view.set_model(store)
+
     def on_toolbutton_add_feature_clicked(self, widget):
         """
         Adds an empty row to the currently selected data layer.
@@ -2607,15 +2368,26 @@ class MainWindow(object):
 
     def mpl_canvas_clicked(self, event):
         """
-        If the edit mode is off, clicking anywhere on the mpl canvas should
-        deselect the layer treeview.
+        If the edit mode is off, clicking a pole or linear in the stereonet
+        selects its layer and row (see select_feature). Clicking anywhere
+        else on the mpl canvas should deselect the layer treeview.
         If the edit mode is on the layer should stay selected and each
         click should draw a feature.
         """
+        if self.select_mode is not None and event.inaxes is self.ax_stereo:
+            self.start_selection(event)
+            return
+
         selection = self.layer_view.get_selection()
         if event.inaxes is not None:
             if self.draw_features == False:
-                selection.unselect_all()
+                picked = None
+                if event.inaxes is self.ax_stereo:
+                    picked = self.pick_feature(event)
+                if picked is not None:
+                    self.select_feature(*picked)
+                else:
+                    selection.unselect_all()
                 return
 
             selection = self.layer_view.get_selection()
@@ -2658,9 +2430,38 @@ class MainWindow(object):
         """
         Catches motion events on the mpl canvas and plots.
 
-        Updates the StatusBar.
+        Updates the StatusBar. While a lasso or box selection is drawn, the
+        outline follows the cursor.
+
+        The StatusBar is updated at most once per frame of the display. The
+        latest event is stored and the update runs in a tick callback of the
+        canvas, so events that arrive faster than the display refreshes are
+        skipped.
+        """
+        if self.select_line is not None:
+            self.update_selection(mpl_event)
+
+        self.motion_event = mpl_event
+        if self.statusbar_scheduled == True:
+            return
+        self.statusbar_scheduled = True
+        self.canvas.add_tick_callback(self.on_statusbar_tick)
+
+    def on_statusbar_tick(self, widget, frame_clock):
+        """
+        Updates the StatusBar with the latest motion event. Returns False so
+        the tick callback is only run once.
+        """
+        self.statusbar_scheduled = False
+        self.update_statusbar(self.motion_event)
+        return False
+
+    def mpl_canvas_released(self, event):
+        """
+        Finishes a lasso or box selection when the mouse button is released.
         """
-        self.update_statusbar(mpl_event)
+        if self.select_line is not None:
+            self.finish_selection()
 
     def eventbox_motion(self, widget, event):
         """
@@ -2677,7 +2478,9 @@ class MainWindow(object):
     def update_statusbar(self, mpl_event=None, *args, **kwargs):
         """
         When the mouse cursor hovers inside the plot, the position of the
-        mpl_event is pushed to the statusbar at the bottom of the GUI. Also
+        mpl_event is pushed to the statusbar at the bottom of the GUI. If the
+        cursor is over a pole or linear, its layer, row and values are shown
+        as well (see pick_feature). Also
         called by a few buttons, to push messages to the statusbar.
         """
         selection = self.layer_view.get_selection()
@@ -2718,7 +2521,12 @@ class MainWindow(object):
             #Ensure 000/00 formatting
             alpha_deg = str(alpha_deg).rjust(3, "0")
             gamma_deg = str(gamma_deg).rjust(2, "0")
-            self.statbar.push(1, ("{0} / {1}".format(alpha_deg, gamma_deg)))
+            text = "{0} / {1}".format(alpha_deg, gamma_deg)
+            picked = self.pick_feature(mpl_event)
+            if picked is not None:
+                text = "{0}    {1}".format(text,
+                                           self.get_feature_text(*picked))
+            self.statbar.push(1, text)
 
         def push_rose_coordinates(mpl_event):
             self.statbar.push(1, (_("Rose Diagram")))
@@ -2777,9 +2585,7 @@ class MainWindow(object):
             row = row_list[0]
             lyr_obj = model[row][3]
             fp = FileParseDialog(text_file, lyr_obj, self.redraw_plot,
-                                 self.add_planar_feature,
-                                 self.add_linear_feature,
-                                 self.add_faultplane_feature, self.main_window)
+                                 self.main_window)
             fp.run()
 
     def on_toolbutton_export_clicked(self, toolbutton):
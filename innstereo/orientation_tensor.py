@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+
+"""
+This module contains the OrientationTensor-class that sums up a layer.
+
+The eigenvectors, the best-fit girdle and the mean vector of a set of
+measurements only depend on the orientation tensor (the sum of the outer
+products of the direction cosines) and on the resultant vector (the sum of
+the direction cosines). Each layer keeps these sums and its LayerData updates
+them when rows are added, edited or removed. The statistics of several
+layers are calculated from the sum of their 3x3 tensors, without gathering
+the measurements of all rows.
+"""
+
+import numpy as np
+from mplstereonet import stereonet_math
+
+
+class OrientationTensor(object):
+
+    """
+    Keeps the orientation tensor and resultant vector of a set of
+    measurements.
+
+    The measurements are either poles of planes ("poles") or lines
+    ("lines"). They are read from the first two columns of a LayerData
+    (dip-direction and dip). The results match the functions of
+    mplstereonet, which use the antipodes of the measurements as well, so
+    the covariance matrix is 2T / (2N - 1).
+    """
+
+    def __init__(self, measurement):
+        """
+        Initializes empty sums for poles ("poles") or lines ("lines").
+        """
+        self.measurement = measurement
+        self.count = 0
+        self.tensor = np.zeros((3, 3))
+        self.resultant = np.zeros(3)
+
+    def reset(self):
+        """
+        Sets the sums back to zero.
+        """
+        self.count = 0
+        self.tensor = np.zeros((3, 3))
+        self.resultant = np.zeros(3)
+
+    def get_vectors(self, dipdir, dip):
+        """
+        Returns the direction cosines of measurements as an (N, 3) array.
+
+        Poles are calculated like mplstereonet.pole and lines like
+        mplstereonet.line.
+        """
+        if self.measurement == "poles":
+            lon, lat = stereonet_math.pole(np.asarray(dipdir) - 90,
+                                           np.array(dip, dtype=float))
+        else:
+            lon, lat = stereonet_math.line(dip, dipdir)
+        return np.column_stack(stereonet_math.sph2cart(lon, lat))
+
+    def update(self, layer_data, start, stop, sign=1):
+        """
+        Adds (sign=1) or subtracts (sign=-1) rows of a LayerData.
+
+        Called by the LayerData before rows are removed or changed and after
+        rows are added or changed (see LayerData.set_orientation_tensor).
+        """
+        if stop <= start:
+            return
+        vectors = self.get_vectors(layer_data.get_column(0)[start:stop],
+                                   layer_data.get_column(1)[start:stop])
+        self.count += sign * len(vectors)
+        self.tensor += sign * np.dot(vectors.T, vectors)
+        self.resultant += sign * vectors.sum(axis=0)
+
+    def combine(self, others):
+        """
+        Returns a new OrientationTensor with the sums of this and other
+        tensors.
+        """
+        total = OrientationTensor(self.measurement)
+        for tensor in [self] + list(others):
+            total.count += tensor.count
+            total.tensor += tensor.tensor
+            total.resultant += tensor.resultant
+        return total
+
+    def get_count(self):
+        """
+        Returns the number of measurements.
+        """
+        return self.count
+
+    def get_eigen(self):
+        """
+        Returns the eigenvalues and eigenvectors of the covariance matrix.
+
+        The values and vectors (columns) are sorted from the smallest to
+        the largest eigenvalue, like mplstereonet.analysis.cov_eig.
+        """
+        cov = 2 * self.tensor / (2 * self.count - 1)
+        eigvals, eigvecs = np.linalg.eigh(cov)
+        order = eigvals.argsort()
+        return eigvals[order], eigvecs[:, order]
+
+    def eigenvectors(self):
+        """
+        Returns the plunges, bearings and values of the eigenvectors.
+
+        The largest eigenvalue comes first, like mplstereonet.eigenvectors.
+        """
+        vals, vecs = self.get_eigen()
+        lon, lat = stereonet_math.cart2sph(*vecs)
+        plunges, bearings = stereonet_math.geographic2plunge_bearing(lon, lat)
+        return plunges[::-1], bearings[::-1], vals[::-1]
+
+    def fit_girdle(self):
+        """
+        Returns the strike and dip of the best-fit plane (girdle).
+
+        The pole of the plane is the eigenvector of the smallest eigenvalue,
+        like mplstereonet.fit_girdle.
+        """
+        vals, vecs = self.get_eigen()
+        x, y, z = vecs[:, 0]
+        strike, dip = stereonet_math.geographic2pole(
+                                    *stereonet_math.cart2sph(x, y, z))
+        return strike[0], dip[0]
+
+    def mean_vector(self):
+        """
+        Returns the plunge and bearing of the mean vector and its length.
+
+        The length (r-value) is between 0 and 1, like
+        mplstereonet.find_mean_vector.
+        """
+        mean_vec = self.resultant / self.count
+        r_value = np.linalg.norm(mean_vec)
+        lon, lat = stereonet_math.cart2sph(*mean_vec)
+        plunge, bearing = stereonet_math.geographic2plunge_bearing(lon, lat)
+        return (plunge[0], bearing[0]), r_value
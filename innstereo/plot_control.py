@@ -12,7 +12,11 @@ of the stereonet, and will return the correct one for either the Schmidt- or
 Wulff-Net.
 """
 
-from gi.repository import Gtk, Gdk, Gio
+try:
+    from gi.repository import Gtk, Gdk, Gio
+except ImportError:
+    #The headless renderer (see render-module) does not need Gtk.
+    Gtk = Gdk = Gio = None
 from matplotlib.figure import Figure
 from matplotlib.gridspec import GridSpec
 import mplstereonet
@@ -32,15 +36,20 @@ class PlotSettings(object):
     one for either the Schmidt- or Wulff-Net.
     """
 
-    def __init__(self, testing):
+    def __init__(self, testing, headless=False):
         """
         Initalizes the default values, colors and the matplotlib-figure.
 
         Initializes and stores the default settings. Initializes the
         matplotlib-figure, a folder-icon for the group-layers of the layer-view.
+        The headless renderer passes headless=True. It has no layer-view, so
+        no icon is loaded, and the Gio.Settings of the GUI are not applied.
         """
-        self.folder_icon = Gtk.IconTheme.get_default().load_icon(
-            "folder", 16, 0)
+        if headless == True:
+            self.folder_icon = None
+        else:
+            self.folder_icon = Gtk.IconTheme.get_default().load_icon(
+                "folder", 16, 0)
         self.props = OrderedDict(sorted({"draw_grid": True,
                       "equal_area_projection": True,
                       "minor_grid_spacing": 2,
@@ -58,7 +67,7 @@ class PlotSettings(object):
                       }.items()))
         self.night_mode = False
         self.fig = Figure(dpi=self.props["pixel_density"])
-        if testing == False:
+        if testing == False and headless == False:
             try:
                 self.g_settings = Gio.Settings.new("org.gtk.innstereo")
                 self.get_defaults()
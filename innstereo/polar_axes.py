@@ -20,6 +20,12 @@ from matplotlib.patches import Wedge
 import matplotlib.spines as mspines
 
 
+#Matplotlib 2.1 and newer set the origin, direction and limits of theta in
+#the PolarAxes itself. The custom transforms below are written for the older
+#PolarAxes and are only used with those versions.
+THETA_LIMITS = hasattr(PolarAxes, "set_thetamin")
+
+
 class NorthPolarAxes(PolarAxes):
     # pylint: disable=no-init
 
@@ -34,6 +40,17 @@ class NorthPolarAxes(PolarAxes):
 
     name = "northpolar"
 
+    def __init__(self, *args, **kwargs):
+        """
+        Puts theta 0 in the north, counting clockwise, for newer Matplotlib.
+
+        The defaults are kept when the axes are cleared.
+        """
+        if THETA_LIMITS:
+            kwargs.setdefault("theta_offset", np.pi / 2)
+            kwargs.setdefault("theta_direction", -1)
+        PolarAxes.__init__(self, *args, **kwargs)
+
     class NorthPolarTransform(PolarAxes.PolarTransform):
         # pylint: disable=no-init
 
@@ -53,7 +70,7 @@ class NorthPolarAxes(PolarAxes):
             This method overrides the same method in the PolarTransform-class.
             The new tranformation is North-up and counts clockwise positive.
             """
-            xy = np.zeros(tr.shape, np.float_)
+            xy = np.zeros(tr.shape, np.float64)
             t = tr[:, 0:1]  # pylint: disable=invalid-name
             r = tr[:, 1:2]  # pylint: disable=invalid-name
             x = xy[:, 0:1]  # pylint: disable=invalid-name
@@ -118,6 +135,8 @@ class NorthPolarAxes(PolarAxes):
         that the limits and label placement fit the north-polar projection.
         """
         PolarAxes._set_lim_and_transforms(self)
+        if THETA_LIMITS:
+            return
         self.transProjection = self.NorthPolarTransform()
         # pylint: attribute-defined-outside-init,invalid-name
         self.transData = (
@@ -150,14 +169,29 @@ class DipPolarAxes(PolarAxes):
 
     name = "dippolar"
 
+    def __init__(self, *args, **kwargs):
+        if THETA_LIMITS:
+            kwargs.setdefault("theta_direction", -1)
+        PolarAxes.__init__(self, *args, **kwargs)
+        if THETA_LIMITS:
+            self.set_thetamin(0)
+            self.set_thetamax(90)
+
     def cla(self):
         PolarAxes.cla(self)
+        if THETA_LIMITS:
+            self.set_thetamin(0)
+            self.set_thetamax(90)
         self.set_thetagrids([0, 15, 30, 45, 60, 75, 90])
 
     def _gen_axes_patch(self):
+        if THETA_LIMITS:
+            return PolarAxes._gen_axes_patch(self)
         return Wedge((0.5, 0.5), 0.5, 270, 360)
 
     def _gen_axes_spines(self):
+        if THETA_LIMITS:
+            return PolarAxes._gen_axes_spines(self)
         path = Wedge((0, 0), 1.0, 270, 360).get_path()
         spine = mspines.Spine(self, 'circle', path)
         spine.set_patch_circle((0.5, 0.5), 0.5)
@@ -173,7 +207,7 @@ class DipPolarAxes(PolarAxes):
             # pylint: disable=no-self-use,invalid-name
             """
             """
-            xy = np.zeros(tr.shape, np.float_)
+            xy = np.zeros(tr.shape, np.float64)
             t = tr[:, 0:1]  # pylint: disable=invalid-name
             r = tr[:, 1:2]  # pylint: disable=invalid-name
             x = xy[:, 0:1]  # pylint: disable=invalid-name
@@ -216,6 +250,8 @@ class DipPolarAxes(PolarAxes):
         """
         """
         PolarAxes._set_lim_and_transforms(self)
+        if THETA_LIMITS:
+            return
         self.transProjection = self.DipPolarTransform()
         # pylint: attribute-defined-outside-init,invalid-name
         self.transData = (
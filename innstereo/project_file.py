@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+
+"""
+This module reads and writes InnStereo project files.
+
+A project is saved as a zip-archive that contains a JSON manifest with the
+plot settings and the properties of each layer, and one NumPy .npy file for
+each column of each layer. The archive is not compressed, so the columns can
+be memory-mapped when the project is opened. The data of a layer is only read
+from the disk when it is used. The older projects that store all data in a
+single JSON file can still be read.
+"""
+
+import json
+import os
+import struct
+import zipfile
+from collections import OrderedDict
+import numpy as np
+
+
+PROJECT_FILETYPE = "InnStereo project 2.0"
+JSON_FILETYPE = "InnStereo data file 1.0"
+MANIFEST = "manifest.json"
+
+
+def column_file(layer_number, column_number):
+    """
+    Returns the name of the .npy file of a column in the archive.
+    """
+    return "layer_{}/column_{}.npy".format(layer_number, column_number)
+
+
+def write_project(file_name, settings, layers):
+    """
+    Writes a project archive.
+
+    Expects the plot settings and a list of [path, properties, columns] for
+    each layer, where columns is a list of arrays (empty for folders). Text
+    columns are stored as unicode arrays. The archive is written to a
+    temporary file first and then replaces the old file. On Windows a file
+    that is still memory-mapped cannot be replaced, so the columns of layers
+    that were opened from the file have to be copied into memory before
+    (see LayerData.release_mapping). The temporary file is removed if the
+    old file cannot be replaced.
+    """
+    manifest = OrderedDict([("filetype", PROJECT_FILETYPE),
+                            ("settings", settings), ("layers", [])])
+    tmp_name = file_name + ".tmp"
+    with zipfile.ZipFile(tmp_name, "w", zipfile.ZIP_STORED,
+                         allowZip64=True) as archive:
+        for k, (path, props, columns) in enumerate(layers):
+            files = []
+            for i, column in enumerate(columns):
+                column = np.asarray(column)
+                if column.dtype == object:
+                    column = column.astype(str)
+                name = column_file(k, i)
+                with archive.open(name, "w", force_zip64=True) as npy_file:
+                    np.lib.format.write_array(npy_file, column,
+                                              allow_pickle=False)
+                files.append(name)
+            manifest["layers"].append([path, props, files])
+        archive.writestr(MANIFEST, json.dumps(manifest))
+    try:
+        os.replace(tmp_name, file_name)
+    except OSError:
+        os.remove(tmp_name)
+        raise
+
+
+def map_member(file_name, info):
+    """
+    Memory-maps an uncompressed .npy file in a zip-archive.
+
+    The offset of the data is read from the local header of the member. The
+    array is mapped copy-on-write, so changes are kept in memory and the
+    file is not modified. Empty arrays are returned as normal arrays.
+    """
+    with open(file_name, "rb") as archive:
+        archive.seek(info.header_offset)
+        header = archive.read(30)
+        name_length, extra_length = struct.unpack("<2H", header[26:30])
+        offset = info.header_offset + 30 + name_length + extra_length
+        archive.seek(offset)
+        version = np.lib.format.read_magic(archive)
+        if version == (1, 0):
+            shape, fortran_order, dtype = \
+                np.lib.format.read_array_header_1_0(archive)
+        else:
+            shape, fortran_order, dtype = \
+                np.lib.format.read_array_header_2_0(archive)
+        data_offset = archive.tell()
+
+    if int(np.prod(shape)) == 0:
+        return np.empty(shape, dtype=dtype)
+    order = "F" if fortran_order else "C"
+    return np.memmap(file_name, dtype=dtype, mode="c", offset=data_offset,
+                     shape=shape, order=order)
+
+
+def read_project(file_name):
+    """
+    Reads a project and returns the plot settings and the layers.
+
+    Returns the settings and a list of [path, properties, columns] for each
+    layer. For project archives the columns are memory-mapped arrays, which
+    are read from the disk when they are used. For the older JSON files the
+    columns are lists. Raises a ValueError if the file is not a project.
+    """
+    if zipfile.is_zipfile(file_name):
+        with zipfile.ZipFile(file_name, "r") as archive:
+            manifest = json.loads(archive.read(MANIFEST).decode("utf-8"))
+            if manifest.get("filetype") != PROJECT_FILETYPE:
+                raise ValueError("Not a valid InnStereo project: {}".format(
+                                                                    file_name))
+            layers = []
+            for path, props, files in manifest["layers"]:
+                columns = [map_member(file_name, archive.getinfo(name))
+                           for name in files]
+                layers.append([path, props, columns])
+        return manifest["settings"], layers
+
+    with open(file_name, "r") as prj_file:
+        parse = json.load(prj_file)
+    if parse.get("filetype") != JSON_FILETYPE:
+        raise ValueError("Not a valid InnStereo data file: {}".format(
+                                                                file_name))
+    layers = []
+    for path, props, features in parse["layers"]:
+        columns = [list(col) for col in zip(*features)]
+        layers.append([path, props, columns])
+    return parse["settings"], layers
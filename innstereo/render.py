@@ -0,0 +1,268 @@
+#!/usr/bin/python3
+
+"""
+This module renders InnStereo project files without the GUI.
+
+The ProjectRenderer-class loads a saved project without Gtk and draws it into
+an Agg-figure, using the same drawing methods (LayerPlotter) and plot settings
+(PlotSettings) as the main window. Many files can be rendered in parallel by
+a pool of processes. The module can be run from the command line:
+
+    python3 -m innstereo.render project.innstereo -f png pdf -j 4
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+#Registers the northpolar and dippolar projections of the rose diagrams.
+from . import polar_axes
+from .layer_data import LayerData
+from .layer_types import (PlaneLayer, FaultPlaneLayer, LineLayer,
+                         SmallCircleLayer, EigenVectorLayer)
+from .layer_plotter import LayerPlotter
+from .plot_control import PlotSettings
+from .density_cache import DensityCache
+from .stereo_math import normalize_columns
+from .project_file import read_project
+
+
+#The layer class and column types of each layer type. The columns are the
+#same as in the DataStore of the MainWindow.create_layer method.
+LAYER_TYPES = {"plane": (PlaneLayer, (float, float, str)),
+               "faultplane": (FaultPlaneLayer, (float, float, float, float, str)),
+               "line": (LineLayer, (float, float, str)),
+               "smallcircle": (SmallCircleLayer, (float, float, float)),
+               "eigenvector": (EigenVectorLayer, (float, float, float))}
+
+VIEW_MODES = ["stereonet", "stereo-rose", "stereo-two-rose"]
+
+
+class LayerStore(object):
+
+    """
+    Holds the LayerData of a layer in place of the DataStore of the GUI.
+
+    The layer objects only need the get_data method of their data store for
+    plotting, so no Gtk.ListStore is created.
+    """
+
+    def __init__(self, *column_types):
+        """
+        Initializes an empty LayerData with the column types.
+        """
+        self.layer_data = LayerData(*column_types)
+
+    def get_data(self):
+        """
+        Returns the LayerData of the layer.
+        """
+        return self.layer_data
+
+
+def load_layer(lyr_dict, columns):
+    """
+    Creates a layer object from the saved properties and columns.
+
+    The columns are added at once. Dip-directions and dips of planes, lines
+    and eigenvectors are moved into the normal range, like the add-feature
+    methods of the MainWindow do. Returns None for folders.
+    """
+    if lyr_dict["type"] not in LAYER_TYPES:
+        return None
+
+    lyr_class, column_types = LAYER_TYPES[lyr_dict["type"]]
+    store = LayerStore(*column_types)
+    lyr_obj = lyr_class(store, None)
+    lyr_obj.set_properties(lyr_dict)
+
+    if len(columns) > 0:
+        store.get_data().extend(normalize_columns(lyr_dict["type"], columns))
+    return lyr_obj
+
+
+def load_project(project_file):
+    """
+    Reads a project file and returns the plot settings and layers.
+
+    Project archives and the older JSON files are read with read_project.
+    Returns the saved properties of the plot and a list of the layer objects
+    in the order of the layer view. Folders are skipped. Raises a ValueError
+    if the file is not an InnStereo project.
+    """
+    settings, project_layers = read_project(project_file)
+    layers = []
+    for path, lyr_dict, columns in project_layers:
+        lyr_obj = load_layer(lyr_dict, columns)
+        if lyr_obj is not None:
+            layers.append(lyr_obj)
+    return settings, layers
+
+
+class ProjectRenderer(LayerPlotter):
+
+    """
+    The ProjectRenderer-class draws a project into an Agg-figure.
+
+    The class sets up the same axes as the main window for a view and draws
+    all layers of a project with the methods of the LayerPlotter. Density
+    grids are calculated right away instead of in a worker thread.
+    """
+
+    def __init__(self, view_mode="stereonet"):
+        """
+        Initializes the plot settings, the figure and its Agg-canvas.
+
+        The view mode is one of the stereonet views of the main window
+        (stereonet, stereo-rose or stereo-two-rose).
+        """
+        self.view_mode = view_mode
+        self.settings = PlotSettings(testing=True, headless=True)
+        self.fig = self.settings.get_fig()
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.density_cache = DensityCache()
+        self.ax_stereo = None
+        self.ax_rose = None
+        self.ax_drose = None
+        self.ax_cbar = None
+        self.cbar = []
+        self.styled_artists = []
+
+    def draw_project(self, settings, layers):
+        """
+        Draws the layers into a new set of axes.
+
+        Expects the saved plot properties and the layer objects of a project.
+        The axes of the view are created from the settings, then the
+        decorations, layers, colorbar and legend are drawn like in the
+        redraw of the main window.
+        """
+        self.settings.set_properties(settings)
+        self.ax_rose = None
+        self.ax_drose = None
+        if self.view_mode == "stereonet":
+            self.ax_stereo, self.ax_cbar = self.settings.get_stereonet()
+        elif self.view_mode == "stereo-rose":
+            self.ax_stereo, self.ax_rose, self.ax_cbar = \
+                self.settings.get_stereo_rose()
+        elif self.view_mode == "stereo-two-rose":
+            self.ax_stereo, self.ax_rose, self.ax_drose, self.ax_cbar = \
+                self.settings.get_stereo_two_rose()
+
+        self.draw_stereonet_decorations()
+        self.cbar = []
+        self.styled_artists = []
+        for lyr_obj in layers:
+            self.plot_layer(lyr_obj)
+
+        self.draw_colorbar()
+        if self.settings.get_draw_legend() == True:
+            self.draw_legend(layers)
+
+    def render(self, project_file, out_files, size=None, dpi=None):
+        """
+        Renders a project file into one or more image files.
+
+        The format of each output file is taken from its extension (e.g.
+        png, pdf or svg). The size of the figure is given in inches and the
+        dpi defaults to the pixel density of the project. The image is
+        cropped to the drawn artists, so the legend is not cut off.
+        """
+        settings, layers = load_project(project_file)
+        self.draw_project(settings, layers)
+        if size is not None:
+            self.fig.set_size_inches(size)
+        for out_file in out_files:
+            self.fig.savefig(out_file, dpi=dpi, bbox_inches="tight",
+                             facecolor=self.fig.get_facecolor())
+
+
+def render_project(project_file, out_dir, formats, view_mode="stereonet",
+                   size=None, dpi=None):
+    """
+    Renders one project file. Runs in the processes of the pool.
+
+    The output files are named after the project file and written to the
+    output directory (or next to the project file). Returns the list of
+    written files.
+    """
+    if out_dir is None:
+        out_dir = os.path.dirname(os.path.abspath(project_file))
+    name = os.path.splitext(os.path.basename(project_file))[0]
+    out_files = [os.path.join(out_dir, "{}.{}".format(name, fmt))
+                 for fmt in formats]
+    renderer = ProjectRenderer(view_mode)
+    renderer.render(project_file, out_files, size=size, dpi=dpi)
+    return out_files
+
+
+def render_projects(project_files, out_dir, formats, view_mode="stereonet",
+                    size=None, dpi=None, jobs=None):
+    """
+    Renders many project files in parallel.
+
+    Each file is rendered in a process of the pool (jobs defaults to the
+    number of processors). Returns a list of (project_file, result) pairs.
+    The result is the list of written files or the exception that was
+    raised while rendering the file.
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(render_project, project_file, out_dir,
+                                   formats, view_mode, size, dpi)
+                   for project_file in project_files]
+        for project_file, future in zip(project_files, futures):
+            try:
+                results.append((project_file, future.result()))
+            except Exception as error:
+                results.append((project_file, error))
+    return results
+
+
+def main(argv=None):
+    """
+    Parses the command line and renders the project files.
+
+    Returns 0 if all files were rendered and 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="innstereo.render",
+                description="Renders InnStereo project files without the GUI.")
+    parser.add_argument("project_files", nargs="+", metavar="PROJECT",
+                        help="InnStereo project files (.innstereo or .json)")
+    parser.add_argument("-o", "--output-dir", default=None,
+                        help="directory of the images (default: next to "
+                             "each project file)")
+    parser.add_argument("-f", "--format", nargs="+", default=["png"],
+                        dest="formats", help="image formats, e.g. png pdf svg")
+    parser.add_argument("-v", "--view", default="stereonet",
+                        choices=VIEW_MODES, help="layout of the figure")
+    parser.add_argument("-s", "--size", nargs=2, type=float, default=None,
+                        metavar=("WIDTH", "HEIGHT"),
+                        help="size of the figure in inches")
+    parser.add_argument("-d", "--dpi", type=float, default=None,
+                        help="resolution of raster images")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="number of processes (default: all processors)")
+    args = parser.parse_args(argv)
+
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    results = render_projects(args.project_files, args.output_dir,
+                              args.formats, args.view, args.size, args.dpi,
+                              args.jobs)
+    failed = False
+    for project_file, result in results:
+        if isinstance(result, Exception):
+            failed = True
+            print("{}: {}".format(project_file, result), file=sys.stderr)
+        else:
+            for out_file in result:
+                print(out_file)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,15 +7,18 @@ The module contains only the RotationDialog class. It controls the behaviour
 of the data-rotation dialog.
 """
 
-from gi.repository import Gtk
+from gi.repository import Gtk, GLib
 from matplotlib.figure import Figure
 from matplotlib.gridspec import GridSpec
-from matplotlib.backends.backend_gtk3cairo import (FigureCanvasGTK3Cairo
-                                                   as FigureCanvas)
+from matplotlib.backends.backend_gtk3agg import (FigureCanvasGTK3Agg
+                                                 as FigureCanvas)
 import numpy as np
 import mplstereonet
 import os, sys
 from .i18n import i18n, translate_gui
+from .stereo_math import (line_vectors, rotate_lines, rotation_matrix,
+                          rotate_vectors, vectors_to_lines)
+from .layer_plotter import small_circle_collection
 
 
 class RotationDialog(object):
@@ -49,7 +52,6 @@ class RotationDialog(object):
         self.dialog.set_transient_for(main_window)
         self.settings = settings
         self.data = data
-        self.trans = self.settings.get_transform()
         self.add_layer_dataset = add_layer_dataset
         self.add_feature = add_feature
         self.redraw_main = redraw_main
@@ -78,6 +80,14 @@ class RotationDialog(object):
         self.rotated_ax = self.fig.add_subplot(rotated_sp,
                                          projection=self.settings.get_projection())
 
+        self.preview_size = 2000
+        self.preview = self.prepare_preview()
+        self.rotated_artists = []
+        self.background = None
+        self.redraw_queued = False
+        self.draw_original()
+        self.canvas.mpl_connect("draw_event", self.on_canvas_draw)
+
         self.canvas.draw()
         self.redraw_plot()
         self.dialog.show_all()
@@ -124,11 +134,11 @@ class RotationDialog(object):
 
         for lyr_obj in self.data:
             lyr_type = lyr_obj.get_layer_type()
-            lyr_store = lyr_obj.get_data_treestore()
+            layer_data = lyr_obj.get_data()
 
             if lyr_type == "plane":
                 dipdir_org, dips_org, dipdir_lst, dips_lst, strat, dipdir_az = \
-                    self.parse_plane(lyr_store, raxis, raxis_angle)
+                    self.parse_plane(layer_data, raxis, raxis_angle)
 
                 store, new_lyr_obj = self.add_layer_dataset("plane")
                 for dipdir, dip, strt in zip(dipdir_az, dips_lst, strat):
@@ -136,7 +146,7 @@ class RotationDialog(object):
 
             elif lyr_type == "line":
                 ldipdir_org, ldips_org, ldipdir_lst, ldips_lst, sense = \
-                    self.parse_line(lyr_store, raxis, raxis_angle)
+                    self.parse_line(layer_data, raxis, raxis_angle)
 
                 store, new_lyr_obj = self.add_layer_dataset("line")
 
@@ -145,14 +155,14 @@ class RotationDialog(object):
 
             elif lyr_type == "smallcircle":
                 ldipdir_org, ldips_org, ldipdir_lst, ldips_lst, angle = \
-                    self.parse_line(lyr_store, raxis, raxis_angle)
+                    self.parse_line(layer_data, raxis, raxis_angle)
 
                 store, new_lyr_obj = self.add_layer_dataset("smallcircle")
                 for dipdir, dip, ang in zip(ldipdir_lst, ldips_lst, angle):
                     self.add_feature("smallcircle", store, dipdir, dip, ang)
 
             elif lyr_type == "faultplane":
-                rtrn = self.parse_faultplane(lyr_store, raxis, raxis_angle)
+                rtrn = self.parse_faultplane(layer_data, raxis, raxis_angle)
                 dipdir_org, dips_org, dipdir_lst, dips_lst, ldipdir_org, \
                 ldips_org, ldipdir_lst, ldips_lst, sense, dipdir_az = rtrn[0], \
                 rtrn[1], rtrn[2], rtrn[3], rtrn[4], rtrn[5], rtrn[6], rtrn[7], \
@@ -172,331 +182,306 @@ class RotationDialog(object):
         """
         Redraws the plot.
 
-        When the value of the spinbutton is changed, the redraw_plot method
-        is called, which rotates the data according to the new setting.
+        When the value of the spinbutton is changed, a redraw is queued,
+        which rotates the data according to the new setting.
         """
-        self.redraw_plot()
+        self.queue_redraw()
 
     def on_spinbutton_rotation_dip_value_changed(self, spinbutton):
         """
         Redraws the plot.
 
-        When the value of the spinbutton is changed, the redraw_plot method
-        is called, which rotates the data according to the new setting.
+        When the value of the spinbutton is changed, a redraw is queued,
+        which rotates the data according to the new setting.
         """
-        self.redraw_plot()
+        self.queue_redraw()
 
     def on_spinbutton_rotation_angle_value_changed(self, spinbutton):
         """
         Redraws the plot.
 
-        When the value of the spinbutton is changed, the redraw_plot method
-        is called, which rotates the data according to the new setting.
+        When the value of the spinbutton is changed, a redraw is queued,
+        which rotates the data according to the new setting.
         """
-        self.redraw_plot()
+        self.queue_redraw()
 
     def convert_lonlat_to_dipdir(self, lon, lat):
         """
         Converts lat-lon data to dip-direction and dip.
 
-        Expects a longitude and a latitude value. The measurment is forward
-        transformed into stereonet-space. Then the azimut (dip-direction) and
-        diping angle are calculated. Returns two values: dip-direction and dip.
-        """
-        #The longitude and latitude have to be forward-transformed to get
-        #the corect azimuth angle
-        xy = np.array([[lon, lat]])
-        xy_trans = self.trans.transform(xy)
-        x = float(xy_trans[0,0:1])
-        y = float(xy_trans[0,1:2])
-        alpha = np.arctan2(x, y)
-        alpha_deg = np.degrees(alpha)
-        if alpha_deg < 0:
-            alpha_deg += 360
-
-        #Longitude and Latitude don't need to be converted for rotation.
-        #The correct dip is the array[1] value once the vector has been
-        #rotated in north-south position.
-        array = mplstereonet.stereonet_math._rotate(np.degrees(lon),
-                                                    np.degrees(lat),
-                                                    alpha_deg * (-1))
-        gamma = float(array[1])
-        gamma_deg = 90 - np.degrees(gamma)
-
-        #If the longitude is larger or small than pi/2 the measurment lies
-        #on the upper hemisphere and needs to be corrected.
-        if lon > (np.pi / 2) or lon < (-np.pi / 2):
-            alpha_deg = alpha_deg + 180
-
-        return alpha_deg, gamma_deg
+        Expects longitude and latitude values or arrays. The measurements
+        are converted into direction cosines and returned as dip-direction
+        and dip. Measurements on the upper hemisphere are flipped to the
+        lower hemisphere.
+        """
+        dip, dipdir = mplstereonet.geographic2plunge_bearing(lon, lat)
+        return dipdir, dip
 
     def rotate_data(self, raxis, raxis_angle, dipdir, dip):
         """
-        Rotates a measurment around a rotation axis a set number of degrees.
-
-        Expects a rotation-axis, a rotation-angle, a dip-direction and a
-        dip angle. The measurement is converted to latlot and then passed
-        to the mplstereonet rotate function.
-        """
-        lonlat = mplstereonet.line(dip, dipdir)
-
-        #Rotation around x-axis until rotation-axis azimuth is east-west
-        rot1 = (90 - raxis[0])
-        lon1 = np.degrees(lonlat[0])
-        lat1 = np.degrees(lonlat[1])
-        lon_rot1, lat_rot1 = mplstereonet.stereonet_math._rotate(lon1, lat1,
-                                                      theta=rot1, axis="x")
-
-        #Rotation around z-axis until rotation-axis dip is east-west
-        rot2 = -(90 - raxis[1])
-        lon2 = np.degrees(lon_rot1)
-        lat2 = np.degrees(lat_rot1)
-        lon_rot2, lat_rot2 = mplstereonet.stereonet_math._rotate(lon2, lat2,
-                                                           theta=rot2, axis="z")
-            
-        #Rotate around the x-axis for the specified rotation:
-        rot3 = raxis_angle
-        lon3 = np.degrees(lon_rot2)
-        lat3 = np.degrees(lat_rot2)
-        lon_rot3, lat_rot3 = mplstereonet.stereonet_math._rotate(lon3, lat3,
-                                                           theta=rot3, axis="x")
-
-        #Undo the z-axis rotation
-        rot4 = -rot2
-        lon4 = np.degrees(lon_rot3)
-        lat4 = np.degrees(lat_rot3)
-        lon_rot4, lat_rot4 = mplstereonet.stereonet_math._rotate(lon4, lat4,
-                                                           theta=rot4, axis="z")
-
-        #Undo the x-axis rotation
-        rot5 = -rot1
-        lon5 = np.degrees(lon_rot4)
-        lat5 = np.degrees(lat_rot4)
-        lon_rot5, lat_rot5 = mplstereonet.stereonet_math._rotate(lon5, lat5,
-                                                           theta=rot5, axis="x")
-        dipdir5, dip5 = self.convert_lonlat_to_dipdir(lon_rot5, lat_rot5)
-        return dipdir5, dip5
-
-    def parse_plane(self, lyr_store, raxis, raxis_angle):
+        Rotates measurements around a rotation axis a set number of degrees.
+
+        Expects a rotation-axis, a rotation-angle, and arrays of
+        dip-directions and dips. All measurements are rotated with one
+        rotation matrix (see stereo_math.rotate_lines). Returns arrays of
+        the rotated dip-directions and dips.
+        """
+        return rotate_lines(raxis, raxis_angle, dipdir, dip)
+
+    def parse_plane(self, layer_data, raxis, raxis_angle):
         """
         Parses and rotates data of a plane layer.
 
-        Expects a TreeStore of a layer, the rotation axis and the
-        angle of rotation. The method returns each column unrotated and rotated.        
+        Expects the LayerData of a layer, the rotation axis and the
+        angle of rotation. The method returns each column unrotated and rotated.
         """
-        dipdir_org = []
-        dips_org = []
-        dipdir_lst = []
-        dips_lst = []
-        dipdir_az = []
-        strat = []
+        dipdir, dips, strat = layer_data.get_columns()
+        #Planes and faultplanes are rotated using their poles
+        rot_dipdir, rot_dip = self.rotate_data(raxis, raxis_angle,
+                                               dipdir + 180, 90 - dips)
+        return (dipdir - 90, dips, rot_dipdir + 90, 90 - rot_dip, strat,
+                rot_dipdir + 180)
+
+    def parse_line(self, layer_data, raxis, raxis_angle):
+        """
+        Parses and rotates data of a linear or smallcircle layer.
 
-        for row in lyr_store:
-            dipdir_org.append(row[0] - 90)
-            dips_org.append(row[1])
-            #Planes and faultplanes are rotated using their poles
-            dipdir, dip = self.rotate_data(raxis, raxis_angle, row[0] + 180,
-                                           90 - row[1])
-            dipdir_lst.append(dipdir + 90)
-            dipdir_az.append(dipdir + 180)
-            dips_lst.append(90 - dip)
-            strat.append(row[2])
+        Expects the LayerData of a layer, the rotation axis and the
+        angle of rotation. The method returns each column unrotated and rotated.
+        """
+        ldipdir, ldips, third_col = layer_data.get_columns()
+        rot_ldipdir, rot_ldip = self.rotate_data(raxis, raxis_angle,
+                                                 ldipdir, ldips)
+        return ldipdir, ldips, rot_ldipdir, rot_ldip, third_col
 
-        return dipdir_org, dips_org, dipdir_lst, dips_lst, strat, dipdir_az
+    def parse_faultplane(self, layer_data, raxis, raxis_angle):
+        """
+        Parses and rotates data of a faultplane layer.
 
-    def parse_line(self, lyr_store, raxis, raxis_angle):
+        Expects the LayerData of a faultplane layer, the rotation axis and the
+        angle of rotation. The method returns each column unrotated and rotated.
         """
-        Parses and rotates data of a linear or smallcircle layer.
+        dipdir, dips, ldipdir, ldips, sense = layer_data.get_columns()
+        #Planes and faultplanes are rotated using their poles
+        rot_dipdir, rot_dip = self.rotate_data(raxis, raxis_angle,
+                                               dipdir + 180, 90 - dips)
+        rot_ldipdir, rot_ldip = self.rotate_data(raxis, raxis_angle,
+                                                 ldipdir, ldips)
+        return (dipdir - 90, dips, rot_dipdir + 90, 90 - rot_dip, ldipdir,
+                ldips, rot_ldipdir, rot_ldip, sense, rot_dipdir + 270)
+
+    def prepare_preview(self):
+        """
+        Caches the data and unit vectors of the layers for the preview.
+
+        Called once when the dialog is initialized. For each layer the
+        columns are retrieved and the poles and linears are converted into
+        direction cosines, so changing the rotation only needs one matrix
+        product per layer. Layers with more than preview_size features are
+        represented by an evenly spaced subsample. The full dataset is only
+        rotated when the rotation is applied. Returns a list with one
+        [lyr_obj, columns, poles, lines] entry per layer.
+        """
+        preview = []
+        for lyr_obj in self.data:
+            lyr_type = lyr_obj.get_layer_type()
+            layer_data = lyr_obj.get_data()
+            n_rows = len(layer_data)
+            subset = None
+            if n_rows > self.preview_size:
+                subset = np.linspace(0, n_rows - 1,
+                                     self.preview_size).astype(np.intp)
+            columns = layer_data.get_columns(subset)
+            poles = None
+            lines = None
+
+            if lyr_type == "plane" or lyr_type == "faultplane":
+                poles = line_vectors(columns[0] + 180, 90 - columns[1])
+            if lyr_type == "line" or lyr_type == "smallcircle":
+                lines = line_vectors(columns[0], columns[1])
+            elif lyr_type == "faultplane":
+                lines = line_vectors(columns[2], columns[3])
+            preview.append([lyr_obj, columns, poles, lines])
+        return preview
 
-        Expects a TreeStore of a layer, the rotation axis and the
-        angle of rotation. The method returns each column unrotated and rotated.        
+    def draw_annotations(self, ax):
         """
-        ldipdir_org = []
-        ldips_org = []
-        ldipdir_lst = []
-        ldips_lst = []
-        third_col = []
+        Sets up an axis of the dialog and draws the center cross.
+        """
+        ax.grid(False)
+        ax.set_azimuth_ticks([0], labels=["N"])
 
-        for row in lyr_store:
-            ldipdir_org.append(row[0])
-            ldips_org.append(row[1])
-            ldipdir, ldip = self.rotate_data(raxis, raxis_angle, row[0], row[1])
-            ldipdir_lst.append(ldipdir)
-            ldips_lst.append(ldip)
-            third_col.append(row[2])
+        bar = 0.05
+        ax.annotate("", xy = (-bar, 0),
+                        xytext = (bar, 0),
+                        xycoords = "data",
+                        arrowprops = dict(arrowstyle = "-",
+                                          connectionstyle = "arc3"))
+        ax.annotate("", xy = (0, -bar),
+                        xytext = (0, bar),
+                        xycoords = "data",
+                        arrowprops = dict(arrowstyle = "-",
+                                          connectionstyle = "arc3"))
+
+    def draw_layer(self, ax, lyr_obj, strikes, dips, ldipdir, ldips, angles,
+                   animated=False):
+        """
+        Draws the features of a layer into an axis.
 
-        return ldipdir_org, ldips_org, ldipdir_lst, ldips_lst, third_col
+        Expects the axis, the layer object and the planes (strikes and
+        dips), the linears (dip-directions and dips) and for smallcircles
+        the opening angles. Unused arguments can be None. Returns a list of
+        the created artists. Animated artists are not drawn with the rest
+        of the figure, which allows the rotated axis to be blitted.
+        """
+        lyr_type = lyr_obj.get_layer_type()
+        artists = []
+
+        if lyr_type == "plane" or lyr_type == "faultplane":
+            artists.extend(ax.plane(strikes, dips,
+                                    color=lyr_obj.get_line_color(),
+                                    linewidth=lyr_obj.get_line_width(),
+                                    linestyle=lyr_obj.get_line_style(),
+                                    dash_capstyle=lyr_obj.get_capstyle(),
+                                    alpha=lyr_obj.get_line_alpha(),
+                                    clip_on=False, animated=animated))
+
+        if lyr_type == "line" or lyr_type == "faultplane":
+            artists.extend(ax.line(ldips, ldipdir,
+                            marker=lyr_obj.get_marker_style(),
+                            markersize=lyr_obj.get_marker_size(),
+                            color=lyr_obj.get_marker_fill(),
+                            markeredgewidth=lyr_obj.get_marker_edge_width(),
+                            markeredgecolor=lyr_obj.get_marker_edge_color(),
+                            alpha=lyr_obj.get_marker_alpha(), clip_on=False,
+                            animated=animated))
+
+        elif lyr_type == "smallcircle":
+            circles = small_circle_collection(ax, ldips, ldipdir, angles,
+                                   colors=lyr_obj.get_line_color(),
+                                   linewidths=lyr_obj.get_line_width(),
+                                   label=lyr_obj.get_label(),
+                                   linestyles=lyr_obj.get_line_style(),
+                                   animated=animated)
+            if circles is not None:
+                artists.append(circles)
+        return artists
+
+    def draw_original(self):
+        """
+        Draws the original data and the empty rotated stereonet.
 
-    def parse_faultplane(self, lyr_store, raxis, raxis_angle):
+        The original data does not change while the dialog is open, so it
+        is only drawn once. The rotated data and the rotation-axis are
+        animated artists, which are drawn on top of the cached background
+        by redraw_plot.
         """
-        Parses and rotates data of a faultplane layer.
+        self.draw_annotations(self.original_ax)
+        self.draw_annotations(self.rotated_ax)
+
+        for lyr_obj, columns, poles, lines in self.preview:
+            lyr_type = lyr_obj.get_layer_type()
+            if lyr_type == "plane":
+                self.draw_layer(self.original_ax, lyr_obj, columns[0] - 90,
+                                columns[1], None, None, None)
+            elif lyr_type == "faultplane":
+                self.draw_layer(self.original_ax, lyr_obj, columns[0] - 90,
+                                columns[1], columns[2], columns[3], None)
+            else:
+                self.draw_layer(self.original_ax, lyr_obj, None, None,
+                                columns[0], columns[1], columns[2])
+
+        #Plot rotation axis
+        self.raxis_marker, = self.original_ax.line(0, 0, marker="o",
+                    markersize=10, color="#ff0000",
+                    markeredgewidth=1, markeredgecolor="#000000",
+                    alpha=1, clip_on=False, animated=True)
 
-        Expects a TreeStore of a faultplane layer, the rotation axis and the
-        angle of rotation. The method returns each column unrotated and rotated.        
-        """
-        dipdir_org = []
-        dips_org = []
-        dipdir_lst = []
-        dips_lst = []
-        ldipdir_org = []
-        ldips_org = []
-        ldipdir_lst = []
-        ldips_lst = []
-        dipdir_az = []
-        sense = []
-
-        for row in lyr_store:
-            dipdir_org.append(row[0] - 90)
-            dips_org.append(row[1])
-            #Planes and faultplanes are rotated using their poles
-            dipdir, dip = self.rotate_data(raxis, raxis_angle, row[0] + 180,
-                                           90 - row[1])
-            dipdir_lst.append(dipdir + 90)
-            dipdir_az.append(dipdir + 270)
-            dips_lst.append(90 - dip)
-
-            ldipdir_org.append(row[2])
-            ldips_org.append(row[3])
-            ldipdir, ldip = self.rotate_data(raxis, raxis_angle, row[2], row[3])
-            ldipdir_lst.append(ldipdir)
-            ldips_lst.append(ldip)
-            sense.append(row[4])
-
-        return (dipdir_org, dips_org, dipdir_lst, dips_lst, ldipdir_org,
-                ldips_org, ldipdir_lst, ldips_lst, sense, dipdir_az)
-       
     def redraw_plot(self):
         """
-        Redraws the plot using the current settings of the dialog's spinbuttons.
+        Redraws the rotated data using the current settings of the spinbuttons.
 
-        This method clears the two axes and adds the annotations. The current
-        values of the rotation axis and rotation angle spinbuttons are
-        retrieved. The data is parsed, and the features are then drawn.
-        In addition the rotation-axis is drawn.
+        The current values of the rotation axis and rotation angle
+        spinbuttons are retrieved. The cached unit vectors of each layer are
+        rotated with a single rotation matrix and the rotated features
+        replace the previous ones. The rotation-axis marker is moved. Only
+        these artists are drawn on top of the cached background.
         """
-        self.original_ax.cla()
-        self.rotated_ax.cla()
-        self.original_ax.grid(False)
-        self.rotated_ax.grid(False)
-        self.original_ax.set_azimuth_ticks([0], labels=["N"])
-        self.rotated_ax.set_azimuth_ticks([0], labels=["N"])
-
-        bar = 0.05
-        self.original_ax.annotate("", xy = (-bar, 0),
-                                    xytext = (bar, 0),
-                                    xycoords = "data",
-                                    arrowprops = dict(arrowstyle = "-",
-                                                      connectionstyle = "arc3"))
-        self.original_ax.annotate("", xy = (0, -bar),
-                                    xytext = (0, bar),
-                                    xycoords = "data",
-                                    arrowprops = dict(arrowstyle = "-",
-                                                      connectionstyle = "arc3"))
-        self.rotated_ax.annotate("", xy = (-bar, 0),
-                                    xytext = (bar, 0),
-                                    xycoords = "data",
-                                    arrowprops = dict(arrowstyle = "-",
-                                                      connectionstyle = "arc3"))
-        self.rotated_ax.annotate("", xy = (0, -bar),
-                                    xytext = (0, bar),
-                                    xycoords = "data",
-                                    arrowprops = dict(arrowstyle = "-",
-                                                      connectionstyle = "arc3"))
-
         raxis_dipdir = self.spinbutton_rotation_dipdir.get_value()
         raxis_dip = self.spinbutton_rotation_dip.get_value()
         raxis = [raxis_dipdir, raxis_dip]
         raxis_angle = self.spinbutton_rotation_angle.get_value()
+        matrix = rotation_matrix(raxis, raxis_angle)
+
+        for artist in self.rotated_artists:
+            artist.remove()
+        self.rotated_artists = []
+
+        for lyr_obj, columns, poles, lines in self.preview:
+            strikes, dips, ldipdir, ldips, angles = None, None, None, None, None
+            if poles is not None:
+                dipdir, dip = vectors_to_lines(rotate_vectors(matrix, poles))
+                strikes, dips = dipdir + 90, 90 - dip
+            if lines is not None:
+                ldipdir, ldips = vectors_to_lines(rotate_vectors(matrix,
+                                                                 lines))
+            if lyr_obj.get_layer_type() == "smallcircle":
+                angles = columns[2]
+            self.rotated_artists.extend(self.draw_layer(self.rotated_ax,
+                                        lyr_obj, strikes, dips, ldipdir,
+                                        ldips, angles, animated=True))
+
+        lon, lat = mplstereonet.line(raxis_dip, raxis_dipdir)
+        self.raxis_marker.set_data(lon, lat)
+        self.blit_rotated()
+
+    def blit_rotated(self):
+        """
+        Draws the rotated data and the rotation-axis onto the background.
 
-        for lyr_obj in self.data:
-            lyr_type = lyr_obj.get_layer_type()
-            lyr_store = lyr_obj.get_data_treestore()
+        The background is restored from the cached image and only the
+        animated artists are drawn. If there is no background yet, the
+        canvas is drawn once, which caches it (see on_canvas_draw).
+        """
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
 
-            if lyr_type == "plane":
-                dipdir_org, dips_org, dipdir_lst, dips_lst, strat, dipdir_az = \
-                    self.parse_plane(lyr_store, raxis, raxis_angle)
-
-                self.original_ax.plane(dipdir_org, dips_org, color=lyr_obj.get_line_color(),
-                    linewidth=lyr_obj.get_line_width(),
-                    linestyle=lyr_obj.get_line_style(),
-                    dash_capstyle=lyr_obj.get_capstyle(),
-                    alpha=lyr_obj.get_line_alpha(), clip_on=False)
-                self.rotated_ax.plane(dipdir_lst, dips_lst, color=lyr_obj.get_line_color(),
-                    linewidth=lyr_obj.get_line_width(),
-                    linestyle=lyr_obj.get_line_style(),
-                    dash_capstyle=lyr_obj.get_capstyle(),
-                    alpha=lyr_obj.get_line_alpha(), clip_on=False)
+        self.canvas.restore_region(self.background)
+        for artist in self.rotated_artists:
+            self.rotated_ax.draw_artist(artist)
+        self.original_ax.draw_artist(self.raxis_marker)
+        self.canvas.blit(self.fig.bbox)
 
-            elif lyr_type == "line":
-                ldipdir_org, ldips_org, ldipdir_lst, ldips_lst, sense = \
-                    self.parse_line(lyr_store, raxis, raxis_angle)
-
-                self.original_ax.line(ldips_org, ldipdir_org,
-                    marker=lyr_obj.get_marker_style(),
-                    markersize=lyr_obj.get_marker_size(),
-                    color=lyr_obj.get_marker_fill(),
-                    markeredgewidth=lyr_obj.get_marker_edge_width(),
-                    markeredgecolor=lyr_obj.get_marker_edge_color(),
-                    alpha=lyr_obj.get_marker_alpha(), clip_on=False)
-                self.rotated_ax.line(ldips_lst, ldipdir_lst,
-                    marker=lyr_obj.get_marker_style(),
-                    markersize=lyr_obj.get_marker_size(),
-                    color=lyr_obj.get_marker_fill(),
-                    markeredgewidth=lyr_obj.get_marker_edge_width(),
-                    markeredgecolor=lyr_obj.get_marker_edge_color(),
-                    alpha=lyr_obj.get_marker_alpha(), clip_on=False)
+    def on_canvas_draw(self, event):
+        """
+        Caches the background after each full draw of the canvas.
 
-            elif lyr_type == "smallcircle":
-                ldipdir_org, ldips_org, ldipdir_lst, ldips_lst, angle = \
-                    self.parse_line(lyr_store, raxis, raxis_angle)
-
-                self.original_ax.cone(ldips_org, ldipdir_org, angle, facecolor="None",
-                            color=lyr_obj.get_line_color(),
-                            linewidth=lyr_obj.get_line_width(),
-                            label=lyr_obj.get_label(),
-                            linestyle=lyr_obj.get_line_style())
-                self.rotated_ax.cone(ldips_lst, ldipdir_lst, angle, facecolor="None",
-                            color=lyr_obj.get_line_color(),
-                            linewidth=lyr_obj.get_line_width(),
-                            label=lyr_obj.get_label(),
-                            linestyle=lyr_obj.get_line_style())
+        A full draw happens on the first draw and when the dialog is
+        resized. The animated artists are not part of the full draw and are
+        drawn on top of the new background.
+        """
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.blit_rotated()
 
-            elif lyr_type == "faultplane":
-                rtrn = self.parse_faultplane(lyr_store, raxis, raxis_angle)
-                dipdir_org, dips_org, dipdir_lst, dips_lst, ldipdir_org, \
-                ldips_org, ldipdir_lst, ldips_lst, sense = rtrn[0], rtrn[1], \
-                rtrn[2], rtrn[3], rtrn[4], rtrn[5], rtrn[6], rtrn[7], rtrn[8]
-
-                self.original_ax.plane(dipdir_org, dips_org, color=lyr_obj.get_line_color(),
-                                        linewidth=lyr_obj.get_line_width(),
-                                        linestyle=lyr_obj.get_line_style(),
-                                        dash_capstyle=lyr_obj.get_capstyle(),
-                                        alpha=lyr_obj.get_line_alpha(), clip_on=False)
-                self.rotated_ax.plane(dipdir_lst, dips_lst, color=lyr_obj.get_line_color(),
-                                        linewidth=lyr_obj.get_line_width(),
-                                        linestyle=lyr_obj.get_line_style(),
-                                        dash_capstyle=lyr_obj.get_capstyle(),
-                                        alpha=lyr_obj.get_line_alpha(), clip_on=False)
-
-                self.original_ax.line(ldips_org, ldipdir_org,
-                                    marker=lyr_obj.get_marker_style(),
-                                    markersize=lyr_obj.get_marker_size(),
-                                    color=lyr_obj.get_marker_fill(),
-                                    markeredgewidth=lyr_obj.get_marker_edge_width(),
-                                    markeredgecolor=lyr_obj.get_marker_edge_color(),
-                                    alpha=lyr_obj.get_marker_alpha(), clip_on=False)
-                self.rotated_ax.line(ldips_lst, ldipdir_lst,
-                                    marker=lyr_obj.get_marker_style(),
-                                    markersize=lyr_obj.get_marker_size(),
-                                    color=lyr_obj.get_marker_fill(),
-                                    markeredgewidth=lyr_obj.get_marker_edge_width(),
-                                    markeredgecolor=lyr_obj.get_marker_edge_color(),
-                                    alpha=lyr_obj.get_marker_alpha(), clip_on=False)
+    def queue_redraw(self):
+        """
+        Queues a redraw of the rotated data.
 
-        #Plot rotation axis
-        self.original_ax.line(raxis_dip, raxis_dipdir, marker="o",
-                    markersize=10, color="#ff0000",
-                    markeredgewidth=1, markeredgecolor="#000000",
-                    alpha=1, clip_on=False)
+        Spinbuttons emit many signals when their value is changed quickly.
+        Only the first signal adds the redraw to the main loop. The redraw
+        uses the values the spinbuttons have when it runs, so all changes
+        up to that point are handled by one redraw.
+        """
+        if self.redraw_queued:
+            return
+        self.redraw_queued = True
+        GLib.idle_add(self.on_queued_redraw)
 
-        self.canvas.draw()
+    def on_queued_redraw(self):
+        """
+        Runs the queued redraw. Returns False so it is only run once.
+        """
+        self.redraw_queued = False
+        self.redraw_plot()
+        return False
@@ -0,0 +1,342 @@
+#!/usr/bin/python3
+
+"""
+This module contains vectorized calculations for orientation data.
+
+The functions in this module work on whole columns of a layer at once. They
+convert the measurements into direction cosines and use array operations
+instead of calling mplstereonet once per measurement. The module does not
+depend on Gtk, so it can be used by the dialogs and the main window alike.
+"""
+
+import math
+import numpy as np
+import mplstereonet
+from mplstereonet import stereonet_math
+
+
+def line_vectors(dipdir, dip):
+    """
+    Converts linear measurements into unit vectors.
+
+    Expects arrays of dip-directions (trends) and dips (plunges) in degrees.
+    Returns an (N, 3) array of the cartesian coordinates that mplstereonet
+    uses for lon/lat.
+    """
+    lon, lat = stereonet_math.line(np.atleast_1d(dip), np.atleast_1d(dipdir))
+    return np.column_stack(stereonet_math.sph2cart(lon, lat))
+
+
+def lp_planes(plane_dir, plane_dip, line_dir, line_dip):
+    """
+    Calculates the pole-linear-planes of faultplanes.
+
+    Expects arrays of the plane dip-direction and dip and of the linear
+    dip-direction and dip. The pole-linear-plane contains the pole of the
+    faultplane and the linear. Its pole is the cross product of the two
+    direction cosines, which is what mplstereonet.fit_girdle finds for two
+    lines. Rows where the pole and linear are (anti)parallel, or where the
+    resulting plane is vertical, are passed to fit_girdle, so the strikes and
+    dips match the per-row calculation. Returns arrays of strikes and dips.
+    """
+    plane_dir = np.atleast_1d(np.asarray(plane_dir, dtype=np.float64))
+    plane_dip = np.atleast_1d(np.asarray(plane_dip, dtype=np.float64))
+    line_dir = np.atleast_1d(np.asarray(line_dir, dtype=np.float64))
+    line_dip = np.atleast_1d(np.asarray(line_dip, dtype=np.float64))
+
+    if len(plane_dir) == 0:
+        return np.array([]), np.array([])
+
+    lin = line_vectors(line_dir, line_dip)
+    pole = line_vectors(plane_dir + 180, 90 - plane_dip)
+    normal = np.cross(lin, pole)
+    length = np.sqrt(np.einsum("ij,ij->i", normal, normal))
+
+    degenerate = length < 1e-10
+    normal[degenerate] = [0, 0, 1]
+    lon, lat = stereonet_math.cart2sph(normal[:, 0], normal[:, 1],
+                                       normal[:, 2])
+    strike, dip = stereonet_math.geographic2pole(lon, lat)
+
+    #The orientation of vertical planes depends on the sign of the
+    #eigenvector in fit_girdle, so these rows are calculated the same way.
+    fallback = np.nonzero(degenerate | (dip > 90 - 1e-9))[0]
+    for k in fallback:
+        strike[k], dip[k] = mplstereonet.fit_girdle(
+                                [line_dip[k], 90 - plane_dip[k]],
+                                [line_dir[k], plane_dir[k] + 180],
+                                measurement="lines")
+    return strike, dip
+
+
+def _rotation_x(angle):
+    """
+    Returns the matrix of a rotation around the x-axis.
+
+    The angle is given in degrees. The sense of rotation is the same as in
+    mplstereonet.stereonet_math._rotate. An array of angles returns an
+    (N, 3, 3) array of matrices.
+    """
+    angle = np.radians(angle)
+    c, s = np.cos(angle), np.sin(angle)
+    one, zero = np.ones_like(c), np.zeros_like(c)
+    matrix = np.array([[one, zero, zero], [zero, c, s], [zero, -s, c]])
+    return np.moveaxis(matrix, (0, 1), (-2, -1))
+
+
+def _rotation_z(angle):
+    """
+    Returns the matrix of a rotation around the z-axis.
+
+    The angle is given in degrees. The sense of rotation is the same as in
+    mplstereonet.stereonet_math._rotate. An array of angles returns an
+    (N, 3, 3) array of matrices.
+    """
+    angle = np.radians(angle)
+    c, s = np.cos(angle), np.sin(angle)
+    one, zero = np.ones_like(c), np.zeros_like(c)
+    matrix = np.array([[c, -s, zero], [s, c, zero], [zero, zero, one]])
+    return np.moveaxis(matrix, (0, 1), (-2, -1))
+
+
+def rotation_matrix(raxis, raxis_angle):
+    """
+    Returns the 3x3 matrix of a rotation around an arbitrary axis.
+
+    Expects the rotation axis as [dip-direction, dip] and the angle of
+    rotation in degrees. The matrix is composed of the same five rotations
+    that were previously applied to each measurement: The axis is moved to
+    the x-axis, the data is rotated around the x-axis and the axis is moved
+    back into its original position. If the axis and angle are arrays, an
+    (N, 3, 3) array with one matrix per row is returned.
+    """
+    rot1 = 90 - np.asarray(raxis[0], dtype=np.float64)
+    rot2 = - (90 - np.asarray(raxis[1], dtype=np.float64))
+    rot3 = np.asarray(raxis_angle, dtype=np.float64)
+    return np.matmul(np.matmul(np.matmul(np.matmul(
+        _rotation_x(-rot1), _rotation_z(-rot2)), _rotation_x(rot3)),
+        _rotation_z(rot2)), _rotation_x(rot1))
+
+
+def rotate_vectors(matrix, vectors):
+    """
+    Applies a rotation matrix to an (N, 3) array of vectors.
+
+    The matrix is either a single 3x3 matrix that is applied to all vectors
+    or an (N, 3, 3) array with one matrix per vector.
+    """
+    if np.ndim(matrix) == 2:
+        return np.dot(vectors, np.transpose(matrix))
+    else:
+        return np.einsum("nij,nj->ni", matrix, vectors)
+
+
+def vectors_to_lines(vectors):
+    """
+    Converts unit vectors into linear measurements.
+
+    Returns arrays of dip-directions (trends) and dips (plunges) in degrees.
+    Vectors pointing into the upper hemisphere are flipped to the lower
+    hemisphere.
+    """
+    lon, lat = stereonet_math.cart2sph(vectors[:, 0], vectors[:, 1],
+                                       vectors[:, 2])
+    dip, dipdir = stereonet_math.geographic2plunge_bearing(lon, lat)
+    return dipdir, dip
+
+
+def rotate_lines(raxis, raxis_angle, dipdir, dip):
+    """
+    Rotates linear measurements around an axis.
+
+    Expects the rotation axis as [dip-direction, dip], the angle of rotation
+    and arrays of dip-directions and dips in degrees. All measurements are
+    rotated with a single matrix product. The axis and angle can also be
+    arrays with one rotation per measurement. Returns arrays of the rotated
+    dip-directions and dips.
+    """
+    dipdir = np.atleast_1d(np.asarray(dipdir, dtype=np.float64))
+    dip = np.atleast_1d(np.asarray(dip, dtype=np.float64))
+    if len(dipdir) == 0:
+        return np.array([]), np.array([])
+    vectors = line_vectors(dipdir, dip)
+    matrix = rotation_matrix(raxis, raxis_angle)
+    return vectors_to_lines(rotate_vectors(matrix, vectors))
+
+
+def wrap_angles(values, limit):
+    """
+    Moves angles into the range from 0 to the limit.
+
+    The limit is added to or subtracted from each value until it lies in the
+    range, which is what the add-feature methods of the MainWindow do for
+    single rows (360 for dip-directions, 90 for dips). Returns a new array.
+    """
+    values = np.array(values, dtype=np.float64)
+    over = values > limit
+    values[over] -= limit * np.ceil(values[over] / limit - 1)
+    under = values < 0
+    values[under] += limit * np.ceil(-values[under] / limit)
+    return values
+
+
+def normalize_columns(layer_type, columns):
+    """
+    Moves the dip-directions and dips of a layer into the normal range.
+
+    Expects the layer type and a list with one array or list per column.
+    The first two columns of planes, lines and eigenvectors are wrapped
+    like the add-feature methods of the MainWindow do for single rows (see
+    wrap_angles). Returns a new list of columns.
+    """
+    columns = list(columns)
+    if layer_type in ("plane", "line", "eigenvector") and len(columns) > 1:
+        columns[0] = wrap_angles(columns[0], 360)
+        columns[1] = wrap_angles(columns[1], 90)
+    return columns
+
+
+def great_circles(strikes, dips, segments=100):
+    """
+    Calculates the vertices of great circles in longitude and latitude.
+
+    Expects arrays of strikes and dips in degrees and the number of vertices
+    of a horizontal great circle (half of the primitive circle). Steeper
+    circles are less curved in the projection and get fewer vertices, down
+    to 2 for vertical planes, which are straight lines. The vertices are
+    calculated like in mplstereonet.stereonet_math.plane, but for all
+    circles in one array. Returns an (M, 2) array of the vertices of all
+    circles, one circle after the other, and an array with the number of
+    vertices of each circle.
+    """
+    strikes = np.atleast_1d(np.asarray(strikes, dtype=np.float64))
+    dips = np.atleast_1d(np.asarray(dips, dtype=np.float64))
+    curvature = 1 - np.clip(dips, 0, 90) / 90
+    counts = np.maximum(2, np.ceil(segments * curvature)).astype(np.intp)
+
+    #Each circle is a line of constant longitude that is rotated around the
+    #x-axis by the strike.
+    circle = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    position = np.arange(counts.sum()) - starts[circle]
+    lat = np.radians(180 * position / (counts[circle] - 1) - 90)
+    lon = np.radians(90 - dips[circle])
+    theta = np.radians(strikes[circle])
+
+    x, y, z = stereonet_math.sph2cart(lon, lat)
+    y, z = (y * np.cos(theta) + z * np.sin(theta),
+            -y * np.sin(theta) + z * np.cos(theta))
+    lon, lat = stereonet_math.cart2sph(x, y, z)
+    return np.column_stack([lon, lat]), counts
+
+
+def small_circles(plunges, bearings, angles, segments=100):
+    """
+    Calculates the vertices of small circles in longitude and latitude.
+
+    Expects arrays of the plunges and bearings of the axes and the opening
+    angles in degrees. The vertices are calculated like in
+    mplstereonet.stereonet_math.cone, but for all circles in one array: a
+    circle of constant latitude is rotated around the y-axis by the plunge
+    and around the x-axis by the bearing. Returns two (N, segments) arrays
+    of longitudes and latitudes.
+    """
+    plunges, bearings, angles = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(plunges, dtype=np.float64)),
+        np.atleast_1d(np.asarray(bearings, dtype=np.float64)),
+        np.atleast_1d(np.asarray(angles, dtype=np.float64)))
+
+    lon = np.radians(np.linspace(-180, 180, segments))[np.newaxis, :]
+    lat = np.radians(90 - angles)[:, np.newaxis]
+    x, y, z = stereonet_math.sph2cart(lon, lat)
+
+    theta = np.radians(-plunges)[:, np.newaxis]
+    x, z = (x * np.cos(theta) - z * np.sin(theta),
+            x * np.sin(theta) + z * np.cos(theta))
+    theta = np.radians(bearings)[:, np.newaxis]
+    y, z = (y * np.cos(theta) + z * np.sin(theta),
+            -y * np.sin(theta) + z * np.cos(theta))
+    return stereonet_math.cart2sph(x, y, z)
+
+
+def hoeppener_arrows(plane_dir, plane_dip, lp_strike, lp_dip, sense,
+                     half_length=360 / 99):
+    """
+    Calculates the start and end points of Hoeppener arrows.
+
+    Expects arrays of the faultplane dip-directions and dips, of the strikes
+    and dips of the pole-linear-planes and of the senses. Each arrow lies on
+    the pole-linear-plane and is centered on the pole of the faultplane. It
+    spans half_length degrees to either side of the pole, which is the
+    length of 2 segments of a great circle drawn by mplstereonet. Arrows
+    that would leave the lower hemisphere are moved along the plane until
+    they end on the primitive. The start and end are swapped according to
+    the sense:
+    -------------
+    "up" (overthrust) Arrow points away from the center line (lon = 0).
+    "dn" (downthrust) Arrow points towards the center line.
+    "sin" (sinistral strike-slip) Arrow points left.
+    "dex" (dextral strike-slip) Arrow points right.
+    Returns arrays of the start longitudes and latitudes and of the end
+    longitudes and latitudes. Rows where the plane is not defined are NaN.
+    """
+    plane_dir = np.atleast_1d(np.asarray(plane_dir, dtype=np.float64))
+    plane_dip = np.atleast_1d(np.asarray(plane_dip, dtype=np.float64))
+    sense = np.atleast_1d(np.asarray(sense, dtype=object))
+    if len(plane_dir) == 0:
+        return np.array([]), np.array([]), np.array([]), np.array([])
+
+    #The arrow is an arc of the great circle through the pole (p) in the
+    #direction of the tangent (t), which lies in the pole-linear-plane.
+    pole = line_vectors(plane_dir + 180, 90 - plane_dip)
+    normal = line_vectors(np.asarray(lp_strike) - 90, 90 - np.asarray(lp_dip))
+    tangent = np.cross(normal, pole)
+    length = np.sqrt(np.einsum("ij,ij->i", tangent, tangent))
+    length[length < 1e-10] = np.nan
+    tangent = tangent / length[:, np.newaxis]
+
+    #The lower hemisphere is x >= 0, which is the half of the circle within
+    #90 degrees of phi. The center of the arc is kept inside that half.
+    delta = np.radians(half_length)
+    phi = np.arctan2(tangent[:, 0], pole[:, 0])
+    center = np.clip(0, phi - np.pi / 2 + delta, phi + np.pi / 2 - delta)
+
+    def arc_point(theta):
+        xyz = (pole * np.cos(theta)[:, np.newaxis] +
+               tangent * np.sin(theta)[:, np.newaxis])
+        return stereonet_math.cart2sph(xyz[:, 0], xyz[:, 1], xyz[:, 2])
+
+    lon_start, lat_start = arc_point(center - delta)
+    lon_end, lat_end = arc_point(center + delta)
+
+    swap = np.select([sense == "up", sense == "dn", sense == "sin",
+                      sense == "dex"],
+                     [np.abs(lon_start) > np.abs(lon_end),
+                      np.abs(lon_start) < np.abs(lon_end),
+                      lon_start > lon_end, lon_start < lon_end], False)
+    lon_start, lon_end = (np.where(swap, lon_end, lon_start),
+                          np.where(swap, lon_start, lon_end))
+    lat_start, lat_end = (np.where(swap, lat_end, lat_start),
+                          np.where(swap, lat_start, lat_end))
+    return lon_start, lat_start, lon_end, lat_end
+
+
+def xy_to_dirdip(x, y, equal_area=True):
+    """
+    Converts a point of the stereonet into the dip-direction and dip of a
+    line.
+
+    Expects the coordinates relative to the center of the stereonet, scaled
+    so the primitive circle has a radius of 1 and north points up. The
+    distance from the center is inverted with the closed-form equal-area
+    (Lambert) or equal-angle (stereographic) projection. Points outside of
+    the primitive circle are moved onto it. Works on single floats with the
+    math-module, so it does not allocate arrays. Returns floats in degrees.
+    """
+    dipdir = math.degrees(math.atan2(x, y)) % 360
+    rho = min(math.hypot(x, y), 1.0)
+    if equal_area == True:
+        angle = 2 * math.asin(rho / math.sqrt(2))
+    else:
+        angle = 2 * math.atan(rho)
+    return dipdir, 90 - math.degrees(angle)
@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+
+import numpy as np
+import mplstereonet
+from innstereo.density_cache import DensityCache
+
+
+def test_density_cache_reuses_grid():
+    """
+    Requests the same grid twice and asserts that it is only calculated once.
+    """
+    cache = DensityCache()
+    rng = np.random.RandomState(3)
+    strikes = rng.uniform(0, 360, 50)
+    dips = rng.uniform(0, 90, 50)
+
+    lon, lat, totals = cache.get_grid(strikes, dips, "poles",
+                                      "exponential_kamb", 2, 40)
+    grid = cache.get_grid(strikes.copy(), dips.copy(), "poles",
+                          "exponential_kamb", 2, 40)
+    assert cache.misses == 1
+    assert cache.hits == 1
+    assert grid[2] is totals
+
+    exp_lon, exp_lat, exp_totals = mplstereonet.density_grid(strikes, dips,
+                                        measurement="poles",
+                                        method="exponential_kamb",
+                                        sigma=2, gridsize=40)
+    assert np.allclose(totals, exp_totals)
+
+    cache.get_grid(strikes, dips, "poles", "kamb", 2, 40)
+    assert cache.misses == 2
+
+
+def test_density_cache_evicts_least_recently_used():
+    """
+    Fills a small cache and asserts that the oldest grid is removed.
+    """
+    #Room for two grids of 3 arrays with 20 x 20 float64 values
+    cache = DensityCache(max_bytes=2 * 3 * 20 * 20 * 8)
+    strikes = np.array([10.0, 20.0, 30.0])
+    dips = np.array([40.0, 50.0, 60.0])
+
+    cache.get_grid(strikes, dips, "poles", "kamb", 3, 20)
+    cache.get_grid(strikes, dips, "poles", "schmidt", 3, 20)
+    cache.get_grid(strikes, dips, "poles", "kamb", 3, 20)
+    cache.get_grid(strikes, dips, "poles", "linear_kamb", 3, 20)
+    assert len(cache.grids) == 2
+    assert cache.n_bytes <= cache.max_bytes
+    methods = [key[2] for key in cache.grids]
+    assert methods == ["kamb", "linear_kamb"]
@@ -0,0 +1,25 @@
+#!/usr/bin/python3
+
+import numpy as np
+from innstereo.feature_index import FeatureIndex
+
+
+def test_feature_index_finds_nearest_point():
+    """
+    Builds an index over the points of two layers and asserts that the
+    nearest point within the distance is returned with its layer and row.
+    """
+    index = FeatureIndex()
+    assert index.query(0, 0, 1) is None
+
+    poles = np.array([[0.0, 0.0], [0.5, 0.5]])
+    linears = np.array([[-0.5, 0.2], [0.1, -0.3], [0.9, 0.0]])
+    index.build([("planes", poles), ("empty", np.empty((0, 2))),
+                 ("lines", linears)])
+    assert index.query(0.49, 0.52, 0.05) == ("planes", 1)
+    assert index.query(0.12, -0.28, 0.05) == ("lines", 1)
+    assert index.query(0.88, 0.01, 0.05) == ("lines", 2)
+    assert index.query(0.3, 0.3, 0.05) is None
+
+    index.build([("empty", np.empty((0, 2)))])
+    assert index.query(0, 0, 1) is None
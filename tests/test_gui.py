@@ -1,6 +1,10 @@
 #!/usr/bin/python3
 
+import io
 import pytest
+import numpy as np
+import mplstereonet
+from matplotlib.backend_bases import MouseEvent, ResizeEvent
 import innstereo
 
 gui = innstereo.startup(testing=True)
@@ -255,6 +259,37 @@ def test_mean_vector():
     data = gui.on_toolbutton_save_clicked(widget=None, testing=True)
     assert data == lyr_copy
 
+def test_best_fit_plane_skips_faultplanes(monkeypatch):
+    """
+    Calculates the best-fit-plane of a linear and a faultplane layer.
+    Asserts that the faultplane layer is skipped and that the statusbar
+    tells the user.
+    """
+    messages = []
+    monkeypatch.setattr(gui.statbar, "push",
+                        lambda context, text: messages.append(text))
+    reset_project()
+    store, line_lyr = gui.on_toolbutton_create_line_dataset_clicked(widget=None)
+    gui.add_linear_feature(store, 250, 30, "")
+    gui.add_linear_feature(store, 140, 20, "")
+    store, fault_lyr = gui.on_toolbutton_create_faultplane_dataset_clicked(widget=None)
+    gui.add_faultplane_feature(store, 120, 40, 170, 35, "up")
+    selection = gui.layer_view.get_selection()
+    selection.select_all()
+    gui.on_toolbutton_best_plane_clicked(widget=None)
+    assert messages == ["Skipped 1 layer(s) that do not contain linears."]
+    lyr_obj = gui.layer_store[2][3]
+    assert lyr_obj.get_layer_type() == "plane"
+    strike, dip = line_lyr.get_orientation_tensor().fit_girdle()
+    assert np.allclose(lyr_obj.get_data().get_row(0)[:2], [strike + 90, dip])
+
+    del messages[:]
+    selection.unselect_all()
+    selection.select_path(1)
+    gui.on_toolbutton_best_plane_clicked(widget=None)
+    assert messages == ["The selected layers contain no linears."]
+    assert len(gui.layer_store) == 3
+
 def plane_input(inp, inp_type):
     """
     Tests different data inputs into a plane layer. Called from test-functions.
@@ -524,3 +559,324 @@ def test_fp_sense_input():
         value = faultplane_input(case, "sense")
         assert value == sense_cases[case]
 
+
+def test_layer_data_in_sync():
+    """
+    Adds, edits and removes rows and asserts the columns of the layer data.
+    """
+    reset_project()
+    store, lyr_obj_new = gui.on_toolbutton_create_plane_dataset_clicked(widget=None)
+    gui.add_planar_feature(store, 120, 30, "")
+    gui.add_planar_feature(store, 200, 45, "")
+    gui.add_planar_feature(store, 310, 80, "")
+    store[1][0] = 210
+    store.remove(store.get_iter(0))
+    layer_data = lyr_obj_new.get_data()
+    assert len(layer_data) == 2
+    assert layer_data.get_column(0).tolist() == [210.0, 310.0]
+    assert layer_data.get_column(1).tolist() == [45.0, 80.0]
+    assert lyr_obj_new.return_data() == [[210.0, 45.0, ""], [310.0, 80.0, ""]]
+
+def test_unchanged_layers_keep_artists():
+    """
+    Edits one layer and asserts that only this layer is drawn again.
+    """
+    reset_project()
+    plane_store, plane_lyr = gui.on_toolbutton_create_plane_dataset_clicked(widget=None)
+    line_store, line_lyr = gui.on_toolbutton_create_line_dataset_clicked(widget=None)
+    gui.add_planar_feature(plane_store, 120, 30, "")
+    gui.add_linear_feature(line_store, 200, 45, "")
+    gui.redraw_plot()
+    plane_artists = plane_lyr.get_artists()
+    line_artists = line_lyr.get_artists()
+    line_store[0][0] = 210
+    gui.redraw_plot()
+    assert plane_lyr.get_artists() is plane_artists
+    assert line_lyr.get_artists() is not line_artists
+    assert all(artist.axes is None for artist in line_artists)
+
+def test_redraws_are_coalesced():
+    """
+    Toggles and renames a layer and asserts that one redraw is performed.
+    """
+    reset_project()
+    gui.on_toolbutton_create_plane_dataset_clicked(widget=None)
+    saved = gui.get_saved_redraws()
+    gui.on_layer_toggled(widget=None, path="0")
+    gui.on_layer_toggled(widget=None, path="0")
+    gui.layer_name_edited(widget=None, path="0", new_label="Coalesced")
+    assert gui.redraw_scheduled == True
+    gui.on_scheduled_redraw()
+    assert gui.redraw_scheduled == False
+    assert gui.get_saved_redraws() == saved + 2
+
+def test_project_archive_is_loaded_lazily(tmpdir):
+    """
+    Saves and opens a project archive and asserts that the rows are only
+    added to the data-view when the layer store is requested.
+    """
+    reset_project()
+    store, lyr_obj_new = gui.on_toolbutton_create_faultplane_dataset_clicked(widget=None)
+    gui.add_faultplane_feature(store, 120, 30, 150, 20, "up")
+    gui.add_faultplane_feature(store, 200, 45, 230, 40, "")
+    project_file = str(tmpdir.join("project.innstereo"))
+    gui.save_project(project_file)
+    reset_project()
+    gui.open_project(project_file)
+    opened = gui.layer_store[0][3]
+    data_store = opened.data_treestore
+    assert len(data_store) == 0
+    assert len(opened.get_data()) == 2
+    assert len(data_store) == 0
+    assert len(opened.get_data_treestore()) == 2
+    assert opened.return_data() == [[120.0, 30.0, 150.0, 20.0, "up"],
+                                    [200.0, 45.0, 230.0, 40.0, ""]]
+
+def test_hidden_and_restyled_layers_keep_artists():
+    """
+    Hides, shows and restyles a layer and asserts that its artists are
+    kept and changed in place.
+    """
+    reset_project()
+    plane_store, plane_lyr = gui.on_toolbutton_create_plane_dataset_clicked(widget=None)
+    gui.add_planar_feature(plane_store, 120, 30, "")
+    gui.redraw_plot()
+    artists = plane_lyr.get_artists()
+    gui.on_layer_toggled(widget=None, path="0")
+    gui.on_scheduled_redraw()
+    assert plane_lyr.get_artists() is artists
+    assert all(artist.get_visible() == False for artist in artists)
+    assert gui.ax_stereo.get_legend() is None
+
+    gui.on_layer_toggled(widget=None, path="0")
+    gui.on_scheduled_redraw()
+    assert plane_lyr.get_artists() is artists
+    assert all(artist.get_visible() == True for artist in artists)
+
+    plane_lyr.set_line_color("#ff0000")
+    plane_lyr.set_line_width(3.0)
+    gui.redraw_plot()
+    assert plane_lyr.get_artists() is artists
+    style, circles = plane_lyr.get_styled_artists()[0]
+    assert circles[0].get_linewidth()[0] == 3.0
+    assert tuple(circles[0].get_color()[0]) == (1.0, 0.0, 0.0, 1.0)
+
+
+def test_selection_redraws_only_highlight():
+    """
+    Selects a layer in highlight mode and asserts that only the highlight
+    overlay is redrawn, while the layers keep their artists.
+    """
+    reset_project()
+    plane_store, plane_lyr = gui.on_toolbutton_create_plane_dataset_clicked(widget=None)
+    gui.add_planar_feature(plane_store, 120, 30, "")
+    gui.settings.set_highlight(True)
+    gui.redraw_plot()
+    artists = plane_lyr.get_artists()
+    selection = gui.layer_view.get_selection()
+    selection.unselect_all()
+    n_cbar = len(gui.cbar)
+    n_styled = len(gui.styled_artists)
+    for i in range(3):
+        selection.select_path(0)
+        gui.schedule_redraw(highlight_only=True)
+        gui.on_scheduled_redraw()
+    gui.settings.set_highlight(False)
+    assert plane_lyr.get_artists() is artists
+    assert len(gui.cbar) == n_cbar
+    assert len(gui.styled_artists) == n_styled
+    assert len(gui.highlight_artists) > 0
+    assert all(artist.get_animated() for artist in gui.highlight_artists)
+
+
+def test_highlighted_row_is_drawn():
+    """
+    Selects a data row in highlight mode and asserts that the highlight
+    changes the pixels of the canvas, but not the exported image.
+    """
+    reset_project()
+    plane_store, plane_lyr = gui.on_toolbutton_create_plane_dataset_clicked(widget=None)
+    gui.add_planar_feature(plane_store, 120, 30, "")
+    gui.add_planar_feature(plane_store, 300, 60, "")
+    selection = gui.layer_view.get_selection()
+    selection.unselect_all()
+    selection.select_path(0)
+    gui.redraw_plot()
+    gui.canvas.draw()
+    plain = np.array(gui.canvas.buffer_rgba())
+
+    gui.settings.set_highlight(True)
+    plane_lyr.get_data_treeview().get_selection().select_path(0)
+    gui.redraw_plot()
+    gui.canvas.draw()
+    highlighted = np.array(gui.canvas.buffer_rgba())
+    gui.fig.savefig(io.BytesIO(), format="raw", dpi=gui.fig.dpi)
+    exported = np.array(gui.canvas.buffer_rgba())
+    gui.settings.set_highlight(False)
+    gui.redraw_plot()
+
+    assert (highlighted != plain).any(axis=2).sum() > 100
+    np.testing.assert_array_equal(exported, plain)
+
+
+def test_resize_redraws_circles_with_more_vertices():
+    """
+    Enlarges the figure and asserts that the great circles are drawn again
+    with more vertices, while a resize that keeps the number of vertices
+    does not redraw the layers.
+    """
+    reset_project()
+    plane_store, plane_lyr = gui.on_toolbutton_create_plane_dataset_clicked(widget=None)
+    gui.add_planar_feature(plane_store, 120, 30, "")
+    size = gui.fig.get_size_inches()
+    gui.fig.set_size_inches(2, 2)
+    gui.redraw_plot()
+    artists = plane_lyr.get_artists()
+    n_vertices = len(plane_lyr.get_styled_artists()[0][1][0].get_segments()[0])
+
+    gui.redraw_scheduled = False
+    ResizeEvent("resize_event", gui.canvas)._process()
+    assert gui.redraw_scheduled == False
+
+    gui.fig.set_size_inches(8, 8)
+    ResizeEvent("resize_event", gui.canvas)._process()
+    assert gui.redraw_scheduled == True
+    gui.on_scheduled_redraw()
+    assert plane_lyr.get_artists() is not artists
+    assert len(plane_lyr.get_styled_artists()[0][1][0].get_segments()[0]) > \
+        n_vertices
+    gui.fig.set_size_inches(size)
+    gui.redraw_plot()
+
+
+def test_selected_rows_are_a_mask():
+    """
+    Selects data rows and asserts that the selection is passed to the
+    parse functions as a boolean mask.
+    """
+    reset_project()
+    plane_store, plane_lyr = gui.on_toolbutton_create_plane_dataset_clicked(widget=None)
+    gui.add_planar_feature(plane_store, 120, 30, "")
+    gui.add_planar_feature(plane_store, 200, 40, "")
+    gui.add_planar_feature(plane_store, 300, 50, "")
+    data_selection = plane_lyr.get_data_treeview().get_selection()
+    data_selection.select_path(0)
+    data_selection.select_path(2)
+    mask = plane_lyr.get_data_treeview().get_selected_mask()
+    assert mask.tolist() == [True, False, True]
+    strike, dipdir, dip = gui.parse_planes(plane_store.get_data(), mask)
+    assert dipdir.tolist() == [120.0, 300.0]
+    assert dip.tolist() == [30.0, 50.0]
+
+
+def test_hover_and_click_pick_feature():
+    """
+    Moves the cursor over a linear and clicks it. Asserts that the
+    statusbar shows the row and that the row is selected.
+    """
+    reset_project()
+    line_store, line_lyr = gui.on_toolbutton_create_line_dataset_clicked(widget=None)
+    gui.add_linear_feature(line_store, 120, 30, "")
+    gui.add_linear_feature(line_store, 250, 60, "up")
+    gui.redraw_plot()
+    gui.canvas.draw()
+    points = gui.get_projected_points(line_lyr, "linears")
+    x, y = (gui.ax_stereo.transAffine +
+            gui.ax_stereo.transAxes).transform(points[1])
+
+    class Event(object):
+        pass
+    event = Event()
+    event.x, event.y = x + 2, y - 1
+    event.inaxes = gui.ax_stereo
+    assert gui.pick_feature(event) == (line_lyr, 1)
+    assert gui.get_feature_text(line_lyr, 1) == "Linear Layer #2: 250.0 / 60.0 / up"
+
+    draw_features = gui.draw_features
+    gui.draw_features = False
+    gui.layer_view.get_selection().unselect_all()
+    gui.mpl_canvas_clicked(event)
+    gui.draw_features = draw_features
+    model, row_list = gui.layer_view.get_selection().get_selected_rows()
+    assert model[row_list[0]][3] is line_lyr
+    data_model, data_rows = line_lyr.get_data_treeview().get_selection().get_selected_rows()
+    assert [row.get_indices()[0] for row in data_rows] == [1]
+
+    event.x += 20
+    assert gui.pick_feature(event) is None
+
+
+def test_lasso_and_box_select_rows():
+    """
+    Draws a box and a lasso around linears and asserts that the outline is
+    drawn and that the rows inside are selected in the data-view.
+    """
+    reset_project()
+    line_store, line_lyr = gui.on_toolbutton_create_line_dataset_clicked(widget=None)
+    for dipdir, dip in [(120, 30), (250, 60), (125, 35), (300, 10), (118, 28)]:
+        gui.add_linear_feature(line_store, dipdir, dip, "")
+    gui.redraw_plot()
+    gui.canvas.draw()
+    selection = gui.layer_view.get_selection()
+    selection.unselect_all()
+    selection.select_path(0)
+    trans = gui.ax_stereo.transAffine + gui.ax_stereo.transAxes
+    points = trans.transform(gui.get_projected_points(line_lyr, "linears"))
+    x_min, y_min = points[[0, 2, 4]].min(axis=0) - 5
+    x_max, y_max = points[[0, 2, 4]].max(axis=0) + 5
+
+    def event_at(x, y):
+        return MouseEvent("motion_notify_event", gui.canvas, x, y)
+
+    def selected_rows():
+        data_selection = line_lyr.get_data_treeview().get_selection()
+        model, rows = data_selection.get_selected_rows()
+        return [row.get_indices()[0] for row in rows]
+
+    gui.set_select_mode("box", True)
+    background = np.array(gui.canvas.buffer_rgba())
+    gui.mpl_canvas_clicked(event_at(x_min, y_min))
+    gui.mpl_motion_event(event_at(x_max, y_max))
+    assert gui.select_line.get_animated() == True
+    #The outline is drawn onto the canvas while dragging.
+    outline = (np.array(gui.canvas.buffer_rgba()) != background).any(axis=2)
+    assert outline.sum() > 2 * (x_max - x_min)
+    gui.mpl_canvas_released(event_at(x_max, y_max))
+    assert gui.select_line is None
+    assert selected_rows() == [0, 2, 4]
+
+    gui.set_select_mode("lasso", True)
+    assert gui.select_mode == "lasso"
+    x, y = points[1]
+    gui.mpl_canvas_clicked(event_at(x - 5, y - 5))
+    gui.mpl_motion_event(event_at(x + 5, y - 5))
+    gui.mpl_motion_event(event_at(x + 5, y + 5))
+    gui.mpl_motion_event(event_at(x - 5, y + 5))
+    gui.mpl_canvas_released(event_at(x - 5, y + 5))
+    assert selected_rows() == [1]
+    gui.set_select_mode("lasso", False)
+    assert gui.select_mode is None
+
+
+def test_motion_events_update_statusbar_once_per_frame():
+    """
+    Sends two motion events before the next frame and asserts that the
+    statusbar is updated once with the position of the latest event.
+    """
+    reset_project()
+    gui.redraw_plot()
+    gui.canvas.draw()
+    lon, lat = mplstereonet.line(30, 120)
+    x, y = gui.ax_stereo.transData.transform([[lon[0], lat[0]]])[0]
+    first = MouseEvent("motion_notify_event", gui.canvas, 10, 10)
+    latest = MouseEvent("motion_notify_event", gui.canvas, x, y)
+
+    gui.statusbar_scheduled = False
+    gui.mpl_motion_event(first)
+    gui.mpl_motion_event(latest)
+    assert gui.statusbar_scheduled == True
+    assert gui.motion_event is latest
+    assert gui.on_statusbar_tick(gui.canvas, None) == False
+    assert gui.statusbar_scheduled == False
+    #Events have integer pixel positions
+    assert np.allclose(gui.convert_xy_to_dirdip(latest), (120, 30), atol=1)
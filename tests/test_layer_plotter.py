@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+
+import numpy as np
+import mplstereonet
+from matplotlib.quiver import Quiver
+from matplotlib.collections import LineCollection
+from innstereo.render import ProjectRenderer, load_layer
+
+
+def draw_faults(rows, **props):
+    """
+    Draws a faultplane layer into the stereonet of a ProjectRenderer.
+
+    Only the drawing options that are passed as keyword arguments are
+    switched on. Returns the renderer.
+    """
+    lyr_dict = {"type": "faultplane", "label": "Faults",
+                "draw_gcircles": False, "draw_linears": False,
+                "draw_angelier": False, "draw_hoeppener": False}
+    lyr_dict.update(props)
+    lyr_obj = load_layer(lyr_dict, [list(col) for col in zip(*rows)])
+    renderer = ProjectRenderer()
+    renderer.ax_stereo, renderer.ax_cbar = renderer.settings.get_stereonet()
+    renderer.plot_layer(lyr_obj)
+    return renderer
+
+
+def test_angelier_one_quiver_per_sense():
+    """
+    Draws Angelier arrows and checks that each sense is one quiver with
+    arrows that point towards (up) or away from (dn) the center.
+    """
+    rows = [[120, 40, 170, 35, "up"], [200, 60, 250, 50, "dn"],
+            [10, 30, 40, 20, "up"], [300, 80, 310, 70, "sin"],
+            [60, 20, 80, 15, ""]]
+    renderer = draw_faults(rows, draw_angelier=True)
+    quivers = [child for child in renderer.ax_stereo.get_children()
+               if isinstance(child, Quiver)]
+    assert [len(q.U) for q in quivers] == [2, 1]
+
+    for quiver, rows_sense, direction in zip(quivers, [[0, 2], [1]],
+                                             [-1, 1]):
+        lon, lat = mplstereonet.line([rows[k][3] for k in rows_sense],
+                                     [rows[k][2] for k in rows_sense])
+        assert np.allclose(quiver.X, lon)
+        assert np.allclose(quiver.Y, lat)
+        mag = np.hypot(lon, lat)
+        assert np.allclose(quiver.U, direction * lon / mag)
+        assert np.allclose(quiver.V, direction * lat / mag)
+
+
+def test_hoeppener_shafts_and_heads():
+    """
+    Draws Hoeppener arrows and checks that they are two LineCollections with
+    a shaft for each row with a sense and a head for each known sense.
+    """
+    rows = [[120, 40, 170, 35, "up"], [200, 60, 250, 50, "dn"],
+            [10, 30, 40, 20, "uk"], [300, 50, 340, 30, "sin"],
+            [60, 20, 80, 15, ""]]
+    renderer = draw_faults(rows, draw_hoeppener=True)
+    collections = [child for child in renderer.ax_stereo.get_children()
+                   if isinstance(child, LineCollection)]
+    assert len(collections) == 2
+    shafts, heads = collections
+    assert [len(segment) for segment in shafts.get_segments()] == [2] * 4
+    assert [len(segment) for segment in heads.get_segments()] == [3] * 3
+
+
+def test_hoeppener_head_size_is_fixed():
+    """
+    Draws Hoeppener arrows with different shaft lengths and checks that all
+    heads have the size of the "->" arrowstyle in points, and that the heads
+    sit at the ends of the shafts.
+    """
+    rows = [[120, 40, 170, 35, "up"], [200, 85, 250, 5, "dn"],
+            [300, 50, 340, 30, "sin"]]
+    renderer = draw_faults(rows, draw_hoeppener=True)
+    shafts, heads = [child for child in renderer.ax_stereo.get_children()
+                     if isinstance(child, LineCollection)]
+    ends = np.array(shafts.get_segments())
+    lengths = np.hypot(*(ends[:, 1] - ends[:, 0]).T)
+    assert lengths.max() > 1.3 * lengths.min()
+
+    vertices = np.array(heads.get_segments())
+    assert np.allclose(vertices[:, 1], 0)
+    arms = np.hypot(vertices[:, [0, 2], 0], vertices[:, [0, 2], 1])
+    assert np.allclose(arms, np.hypot(4, 2))
+    assert np.allclose(heads.get_offsets(), ends[:, 1])
+    assert np.allclose(heads.get_transform().transform([[72, 0]]),
+                       [[renderer.fig.dpi, 0]])
+
+
+def test_projected_points_are_cached():
+    """
+    Draws the linears and poles of faultplanes and checks that the points
+    are projected once per data version and match mplstereonet.
+    """
+    rows = [[120, 40, 170, 35, "up"], [200, 60, 250, 50, "dn"],
+            [10, 30, 40, 20, ""]]
+    renderer = draw_faults(rows, draw_linears=True, draw_poles=True)
+    lyr_obj = load_layer({"type": "faultplane"},
+                         [list(col) for col in zip(*rows)])
+    linears = renderer.get_projected_points(lyr_obj, "linears")
+    poles = renderer.get_projected_points(lyr_obj, "poles")
+    projection = renderer.ax_stereo.transProjection
+    lon, lat = mplstereonet.line([35, 50, 20], [170, 250, 40])
+    assert np.allclose(linears, projection.transform(np.column_stack([lon,
+                                                                      lat])))
+    lon, lat = mplstereonet.pole([30, 110, -80], [40, 60, 30])
+    assert np.allclose(poles, projection.transform(np.column_stack([lon,
+                                                                    lat])))
+
+    assert renderer.get_projected_points(lyr_obj, "linears") is linears
+    subset = renderer.get_projected_points(lyr_obj, "linears",
+                                           [False, True, True])
+    assert np.array_equal(subset, linears[1:])
+
+    lyr_obj.get_data().append([0, 10, 0, 10, ""])
+    assert len(renderer.get_projected_points(lyr_obj, "linears")) == 4
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+
+import numpy as np
+import pytest
+from innstereo.line_index import LineIndex, read_columns
+
+
+def write_lines(tmpdir, n_lines):
+    """
+    Writes a csv-file with one numbered row per line.
+    """
+    path = tmpdir.join("data.csv")
+    path.write("".join("{};{}\r\n".format(k, k * 2) for k in range(n_lines)))
+    return str(path)
+
+
+def test_get_lines_seeks_to_start_line(tmpdir):
+    """
+    Reads windows of lines and asserts that only the needed part is indexed.
+    """
+    index = LineIndex(write_lines(tmpdir, 100), stride=8)
+    assert index.get_lines(0, 3) == ["0;0", "1;2", "2;4"]
+    assert index.is_complete() == False
+
+    assert index.get_lines(50, 2) == ["50;100", "51;102"]
+    assert len(index.offsets) == 7
+    assert index.get_lines(17, 1) == ["17;34"]
+    assert len(index.offsets) == 7
+
+    assert index.get_lines(98, 5) == ["98;196", "99;198"]
+    assert index.get_lines(100, 5) == []
+    assert index.get_lines(250, 5) == []
+    assert index.get_n_lines() == 100
+
+
+def test_iter_lines(tmpdir):
+    """
+    Iterates from a start line to the end of files with and without a
+    partial last block.
+    """
+    for n_lines in [0, 16, 21]:
+        index = LineIndex(write_lines(tmpdir, n_lines), stride=8)
+        lines = list(index.iter_lines(5))
+        assert lines == ["{};{}".format(k, k * 2)
+                         for k in range(5, n_lines)]
+        assert index.get_n_lines() == n_lines
+
+
+def test_read_columns(tmpdir):
+    """
+    Reads selected columns in small chunks and asserts the arrays.
+    """
+    path = tmpdir.join("data.csv")
+    path.write("dipdir,dip,sense\n120;40,up\n 10.5,5 ,dn\n300;80\n")
+    index = LineIndex(str(path), stride=2)
+    dipdir, dip, sense, empty, zeros = read_columns(index, 1,
+                                [(0, float), (1, float), (2, str), (-1, str),
+                                 (-1, float)], chunk_size=2)
+    assert dipdir.dtype == np.float64
+    assert np.array_equal(dipdir, [120, 10.5, 300])
+    assert np.array_equal(dip, [40, 5, 80])
+    assert sense.tolist() == ["up", "dn", ""]
+    assert empty.tolist() == ["", "", ""]
+    assert np.array_equal(zeros, [0, 0, 0])
+
+    with pytest.raises(ValueError):
+        read_columns(index, 0, [(0, float)])
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+
+import numpy as np
+import mplstereonet
+from innstereo.layer_data import LayerData
+from innstereo.orientation_tensor import OrientationTensor
+
+
+def random_layer(seed, n_rows):
+    """
+    Returns a LayerData with random dip-directions and dips.
+    """
+    rng = np.random.RandomState(seed)
+    layer_data = LayerData(float, float, str)
+    layer_data.extend([rng.uniform(0, 360, n_rows), rng.uniform(0, 90, n_rows),
+                       [""] * n_rows])
+    return layer_data
+
+
+def test_orientation_tensor_matches_mplstereonet():
+    """
+    Sums up two layers and asserts that the eigenvectors, best-fit girdle
+    and mean vector are the same as the ones of mplstereonet.
+    """
+    first = random_layer(1, 30)
+    second = random_layer(2, 20)
+    dipdir = np.concatenate([first.get_column(0), second.get_column(0)])
+    dip = np.concatenate([first.get_column(1), second.get_column(1)])
+
+    poles = []
+    lines = []
+    for layer_data in (first, second):
+        tensor = OrientationTensor("poles")
+        layer_data.set_orientation_tensor(tensor)
+        poles.append(tensor)
+        lines.append(OrientationTensor("lines"))
+        lines[-1].update(layer_data, 0, len(layer_data))
+    poles = poles[0].combine(poles[1:])
+    lines = lines[0].combine(lines[1:])
+    assert poles.get_count() == 50
+
+    expected = mplstereonet.eigenvectors(dipdir - 90, dip)
+    for result, value in zip(poles.eigenvectors(), expected):
+        np.testing.assert_allclose(result, value)
+    expected = mplstereonet.eigenvectors(dip, dipdir, measurement="lines")
+    for result, value in zip(lines.eigenvectors(), expected):
+        np.testing.assert_allclose(result, value)
+
+    np.testing.assert_allclose(lines.fit_girdle(), mplstereonet.fit_girdle(
+                                        dip, dipdir, measurement="lines"))
+    np.testing.assert_allclose(poles.fit_girdle(),
+                               mplstereonet.fit_girdle(dipdir - 90, dip))
+
+    vector, r_value = lines.mean_vector()
+    expected, expected_r = mplstereonet.find_mean_vector(dip, dipdir)
+    np.testing.assert_allclose(vector, expected)
+    np.testing.assert_allclose(r_value, expected_r)
+
+
+def test_orientation_tensor_follows_layer_data():
+    """
+    Adds, edits and removes rows and asserts that the tensor is the same as
+    one that is calculated from all rows again.
+    """
+    layer_data = random_layer(3, 10)
+    tensor = OrientationTensor("lines")
+    layer_data.set_orientation_tensor(tensor)
+
+    layer_data.append([120, 30, ""])
+    layer_data.insert(2, [40, 80, ""])
+    layer_data.extend([[10, 20], [5, 15], ["", ""]])
+    layer_data.set_value(4, 1, 55)
+    layer_data.set_value(5, 0, 200)
+    layer_data.remove(0)
+    layer_data.remove(7)
+
+    expected = OrientationTensor("lines")
+    expected.update(layer_data, 0, len(layer_data))
+    assert tensor.get_count() == len(layer_data) == 12
+    np.testing.assert_allclose(tensor.tensor, expected.tensor)
+    np.testing.assert_allclose(tensor.resultant, expected.resultant,
+                               atol=1e-12)
+
+    layer_data.set_columns([[1, 2], [3, 4], ["", ""]])
+    assert tensor.get_count() == 2
+    layer_data.clear()
+    assert tensor.get_count() == 0
+    np.testing.assert_array_equal(tensor.tensor, np.zeros((3, 3)))
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+
+import json
+import numpy as np
+import pytest
+from innstereo import project_file as project_module
+from innstereo.layer_data import LayerData, is_mapped
+from innstereo.project_file import write_project, read_project
+
+
+def test_project_archive_round_trip(tmpdir):
+    """
+    Writes a project archive and asserts the memory-mapped columns.
+    """
+    project_file = str(tmpdir.join("project.innstereo"))
+    columns = [np.array([120.0, 200.0]), np.array([30.0, 45.0]),
+               np.array(["up", ""], dtype=object)]
+    empty = [np.zeros(0), np.zeros(0), np.zeros(0)]
+    write_project(project_file, {"draw_grid": False},
+                  [["0", {"type": "folder", "label": "Folder"}, []],
+                   ["0:0", {"type": "line", "label": "Lines"}, columns],
+                   ["1", {"type": "smallcircle", "label": "Empty"}, empty]])
+
+    settings, layers = read_project(project_file)
+    assert settings == {"draw_grid": False}
+    assert [layer[0] for layer in layers] == ["0", "0:0", "1"]
+    assert layers[0][2] == []
+    dipdir, dip, sense = layers[1][2]
+    assert isinstance(dipdir, np.memmap)
+    assert dipdir.tolist() == [120.0, 200.0]
+    assert dip.tolist() == [30.0, 45.0]
+    assert sense.tolist() == ["up", ""]
+    assert [len(col) for col in layers[2][2]] == [0, 0, 0]
+
+    #Changes to mapped columns are not written to the file.
+    dipdir[0] = 10
+    assert read_project(project_file)[1][1][2][0][0] == 120.0
+
+    #Saving again replaces the file while the old columns are mapped.
+    write_project(project_file, settings, [layers[1]])
+    assert read_project(project_file)[1][0][2][0].tolist() == [10.0, 200.0]
+
+
+def test_save_opened_project_to_same_file(tmpdir, monkeypatch):
+    """
+    Opens a project, edits a layer and saves it back to the same file. The
+    LayerData holds the mapped columns until the save, but none of them may
+    be mapped from the file when it is replaced (not allowed on Windows).
+    """
+    project_file = str(tmpdir.join("project.innstereo"))
+    write_project(project_file, {}, [["0", {"type": "plane"},
+                  [np.array([120.0, 200.0]), np.array([30.0, 45.0]),
+                   np.array(["a", "b"], dtype=object)]]])
+
+    settings, layers = read_project(project_file)
+    path, props, columns = layers[0]
+    layer_data = LayerData(float, float, str)
+    layer_data.set_columns(columns)
+    del layers, columns
+    assert is_mapped(layer_data.columns[0], project_file)
+    layer_data.set_value(1, 1, 50)
+    version = layer_data.get_version()
+
+    replace = project_module.os.replace
+
+    def checked_replace(src, dst):
+        assert not any(is_mapped(column, project_file)
+                       for column in layer_data.columns)
+        replace(src, dst)
+
+    monkeypatch.setattr(project_module.os, "replace", checked_replace)
+    layer_data.release_mapping(project_file)
+    assert layer_data.get_version() == version
+    write_project(project_file, settings,
+                  [[path, props, layer_data.get_columns()]])
+
+    dipdir, dip, strat = read_project(project_file)[1][0][2]
+    assert dipdir.tolist() == [120.0, 200.0]
+    assert dip.tolist() == [30.0, 50.0]
+    assert strat.tolist() == ["a", "b"]
+    assert not tmpdir.join("project.innstereo.tmp").check()
+
+
+def test_failed_replace_removes_temporary_file(tmpdir, monkeypatch):
+    """
+    Asserts that the temporary file is removed if the project file cannot
+    be replaced.
+    """
+    project_file = str(tmpdir.join("project.innstereo"))
+
+    def failed_replace(src, dst):
+        raise PermissionError(dst)
+
+    monkeypatch.setattr(project_module.os, "replace", failed_replace)
+    with pytest.raises(PermissionError):
+        write_project(project_file, {}, [])
+    assert tmpdir.listdir() == []
+
+
+def test_read_json_project(tmpdir):
+    """
+    Reads an older JSON project and asserts the columns.
+    """
+    project_file = tmpdir.join("project.json")
+    project_file.write(json.dumps({"filetype": "InnStereo data file 1.0",
+                            "settings": {},
+                            "layers": [["0", {"type": "plane"},
+                                        [[120, 30, ""], [200, 45, "x"]]]]}))
+    settings, layers = read_project(str(project_file))
+    assert layers[0][2] == [[120, 200], [30, 45], ["", "x"]]
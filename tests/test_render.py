@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+
+import json
+import numpy as np
+import pytest
+from innstereo.render import load_project, main, VIEW_MODES
+
+
+def write_project(path):
+    """
+    Writes a project with a plane and a faultplane layer inside a folder.
+    """
+    project = {"filetype": "InnStereo data file 1.0",
+               "settings": {"draw_legend": True},
+               "layers": [["0", {"type": "folder", "label": "Folder"}, []],
+                          ["0:0", {"type": "plane", "label": "Planes",
+                                   "draw_contour_fills": True},
+                           [[370, 40, ""], [-20, 95, ""], [120, 10, "x"]]],
+                          ["0:1", {"type": "faultplane", "label": "Faults"},
+                           [[120, 40, 170, 35, "up"]]]]}
+    with open(path, "w") as prj_file:
+        json.dump(project, prj_file)
+
+
+def test_load_project(tmpdir):
+    """
+    Loads a project and asserts the layers and the normalized angles.
+    """
+    prj = str(tmpdir.join("project.json"))
+    write_project(prj)
+    settings, layers = load_project(prj)
+    assert settings == {"draw_legend": True}
+    assert [lyr.get_label() for lyr in layers] == ["Planes", "Faults"]
+
+    dipdir, dip, sense = layers[0].get_data().get_columns()
+    assert np.allclose(dipdir, [10, 340, 120])
+    assert np.allclose(dip, [40, 5, 10])
+    assert sense.tolist() == ["", "", "x"]
+    assert layers[1].get_data().get_row(0) == [120, 40, 170, 35, "up"]
+
+
+def test_render_projects(tmpdir):
+    """
+    Renders two projects into png and svg files with two processes.
+    """
+    prj_files = [str(tmpdir.join("a.json")), str(tmpdir.join("b.json"))]
+    for prj in prj_files:
+        write_project(prj)
+    out_dir = tmpdir.join("out")
+    assert main(prj_files + ["-o", str(out_dir), "-f", "png", "svg",
+                             "-j", "2"]) == 0
+    for name in ["a.png", "a.svg", "b.png", "b.svg"]:
+        assert out_dir.join(name).size() > 0
+
+    assert main([str(tmpdir.join("missing.json"))]) == 1
+
+
+@pytest.mark.parametrize("view_mode", VIEW_MODES)
+def test_render_view_modes(tmpdir, view_mode):
+    """
+    Renders a project in each view mode and asserts the image file.
+    """
+    prj = str(tmpdir.join("project.json"))
+    write_project(prj)
+    assert main([prj, "-o", str(tmpdir), "-v", view_mode, "-j", "1"]) == 0
+    assert tmpdir.join("project.png").size() > 0
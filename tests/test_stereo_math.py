@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+
+import pytest
+import numpy as np
+import mplstereonet
+import matplotlib.pyplot as plt
+from mplstereonet import stereonet_math
+from innstereo.stereo_math import (lp_planes, rotate_lines, great_circles,
+                                   small_circles, line_vectors,
+                                   hoeppener_arrows, xy_to_dirdip)
+
+
+def test_lp_planes_match_fit_girdle():
+    """
+    Compares the vectorized pole-linear-planes with fit_girdle for each row.
+    """
+    rng = np.random.RandomState(1)
+    plane_dir = np.append(rng.uniform(0, 360, 200), [0, 90, 45, 115])
+    plane_dip = np.append(rng.uniform(0, 90, 200), [0, 90, 30, 12])
+    line_dir = np.append(rng.uniform(0, 360, 200), [0, 90, 225, 115])
+    line_dip = np.append(rng.uniform(0, 90, 200), [0, 0, 60, 12])
+
+    strike, dip = lp_planes(plane_dir, plane_dip, line_dir, line_dip)
+
+    for k in range(len(plane_dir)):
+        fit_strike, fit_dip = mplstereonet.fit_girdle(
+                                [line_dip[k], 90 - plane_dip[k]],
+                                [line_dir[k], plane_dir[k] + 180],
+                                measurement="lines")
+        assert strike[k] == pytest.approx(fit_strike, abs=1e-8)
+        assert dip[k] == pytest.approx(fit_dip, abs=1e-8)
+
+
+def test_rotate_lines_match_stepwise_rotation():
+    """
+    Compares the single rotation matrix with the five stepwise rotations.
+    """
+    rng = np.random.RandomState(2)
+    dipdir = rng.uniform(0, 360, 200)
+    dip = rng.uniform(0, 90, 200)
+    raxis = [rng.uniform(0, 360), rng.uniform(0, 90)]
+    raxis_angle = rng.uniform(-180, 180)
+
+    rot1 = 90 - raxis[0]
+    rot2 = - (90 - raxis[1])
+    lon, lat = mplstereonet.line(dip, dipdir)
+    for theta, axis in [(rot1, "x"), (rot2, "z"), (raxis_angle, "x"),
+                        (-rot2, "z"), (-rot1, "x")]:
+        lon, lat = stereonet_math._rotate(np.degrees(lon), np.degrees(lat),
+                                          theta, axis)
+    step_dip, step_dipdir = stereonet_math.geographic2plunge_bearing(lon, lat)
+
+    rot_dipdir, rot_dip = rotate_lines(raxis, raxis_angle, dipdir, dip)
+    assert rot_dipdir == pytest.approx(step_dipdir, abs=1e-8)
+    assert rot_dip == pytest.approx(step_dip, abs=1e-8)
+
+    #One rotation per row gives the same result as the rows one at a time.
+    angles = rng.uniform(-180, 180, 200)
+    rot_dipdir, rot_dip = rotate_lines([np.full(200, raxis[0]),
+                                        np.full(200, raxis[1])],
+                                       angles, dipdir, dip)
+    for k in range(len(dipdir)):
+        single_dipdir, single_dip = rotate_lines(raxis, angles[k],
+                                                 dipdir[k], dip[k])
+        assert rot_dipdir[k] == pytest.approx(single_dipdir[0], abs=1e-8)
+        assert rot_dip[k] == pytest.approx(single_dip[0], abs=1e-8)
+
+
+def test_great_circles_match_mplstereonet():
+    """
+    Compares the great circle vertices with mplstereonet and tests that
+    steeper planes have fewer vertices.
+    """
+    strikes = np.array([0, 45, 120, 300, 10])
+    dips = np.array([0, 30, 60, 89.5, 90])
+    vertices, counts = great_circles(strikes, dips, segments=100)
+
+    assert counts[0] == 100
+    assert list(counts) == sorted(counts, reverse=True)
+    assert counts[-1] == 2
+    assert len(vertices) == counts.sum()
+
+    circles = np.split(vertices, np.cumsum(counts)[:-1])
+    for strike, dip, circle in zip(strikes, dips, circles):
+        lon, lat = stereonet_math.plane(strike, dip, segments=len(circle))
+        assert np.allclose(circle[:, 0], lon[:, 0])
+        assert np.allclose(circle[:, 1], lat[:, 0])
+
+
+def test_small_circles_match_mplstereonet():
+    """
+    Compares the vectorized small circles with mplstereonet's cone.
+    """
+    rng = np.random.RandomState(3)
+    plunges = np.append(rng.uniform(0, 90, 50), [0, 90])
+    bearings = np.append(rng.uniform(0, 360, 50), [0, 270])
+    angles = np.append(rng.uniform(1, 90, 50), [45, 10])
+
+    lon, lat = small_circles(plunges, bearings, angles, segments=60)
+    cone_lon, cone_lat = stereonet_math.cone(plunges, bearings, angles,
+                                             segments=60)
+    assert lon.shape == (52, 60)
+    assert np.allclose(lon, cone_lon)
+    assert np.allclose(lat, cone_lat)
+
+
+def test_hoeppener_arrows_are_centered_on_poles():
+    """
+    Tests that the Hoeppener arrows lie on the pole-linear-planes, are
+    centered on the poles and point in the direction of the sense.
+    """
+    plane_dir = np.array([120, 200, 10, 300, 45])
+    plane_dip = np.array([40, 60, 30, 50, 20])
+    line_dir = np.array([170, 250, 40, 340, 100])
+    line_dip = np.array([35, 50, 20, 30, 5])
+    sense = np.array(["up", "dn", "sin", "dex", "uk"], dtype=object)
+    lp_strike, lp_dip = lp_planes(plane_dir, plane_dip, line_dir, line_dip)
+    lon_start, lat_start, lon_end, lat_end = hoeppener_arrows(
+                            plane_dir, plane_dip, lp_strike, lp_dip, sense)
+
+    start = np.column_stack(stereonet_math.sph2cart(lon_start, lat_start))
+    end = np.column_stack(stereonet_math.sph2cart(lon_end, lat_end))
+    pole = line_vectors(plane_dir + 180, 90 - plane_dip)
+    normal = line_vectors(lp_strike - 90, 90 - lp_dip)
+    assert np.allclose(np.einsum("ij,ij->i", start, normal), 0)
+    assert np.allclose(np.einsum("ij,ij->i", end, normal), 0)
+    middle = (start + end) / np.linalg.norm(start + end, axis=1)[:, None]
+    assert np.allclose(middle, pole)
+    angle = np.degrees(np.arccos(np.einsum("ij,ij->i", start, end)))
+    assert np.allclose(angle, 2 * 360 / 99)
+
+    assert abs(lon_start[0]) < abs(lon_end[0])
+    assert abs(lon_start[1]) > abs(lon_end[1])
+    assert lon_start[2] < lon_end[2]
+    assert lon_start[3] > lon_end[3]
+
+
+def test_xy_to_dirdip_inverts_projections():
+    """
+    Projects lines with mplstereonet and converts the points back with the
+    closed-form inverse of both projections.
+    """
+    dipdir = np.array([0, 45, 120, 250, 300, 10])
+    dip = np.array([0, 10, 30, 60, 80, 90])
+    lon, lat = mplstereonet.line(dip, dipdir)
+    for name, equal_area in [("equal_area_stereonet", True),
+                             ("equal_angle_stereonet", False)]:
+        fig = plt.figure()
+        ax = fig.add_subplot(111, projection=name)
+        #Projected coordinates in units of the radius of the stereonet
+        xy = ax.transProjection.transform(np.column_stack([lon, lat]))
+        xy = xy / ax.transProjection.transform(np.array([[np.pi / 2, 0]]))[0, 0]
+        for (x, y), exp_dipdir, exp_dip in zip(xy, dipdir, dip):
+            result = xy_to_dirdip(x, y, equal_area)
+            assert np.isclose(result[1], exp_dip)
+            if exp_dip < 90:
+                assert np.isclose(result[0], exp_dipdir)
+        plt.close(fig)
+    assert np.allclose(xy_to_dirdip(2.0, 0.0), (90, 0))